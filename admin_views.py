@@ -0,0 +1,405 @@
+"""
+SQLAdmin views for the dashboard
+Imported on the first /admin request so app startup does not pay for sqladmin
+"""
+from fastapi import Request
+from fastapi.responses import RedirectResponse
+from sqladmin import Admin, ModelView, BaseView
+from sqladmin import expose
+from sqladmin.ajax import QueryAjaxModelLoader
+from sqlalchemy import or_, inspect
+
+from models import Video, Music, Style, Work, Streaming, Version, Creator, Role
+from services.count_service import ExactCount
+from services.name_index_service import NameIndexService
+
+
+class CountStrategyMixin:
+    """Pagination counts go through a pluggable strategy (exact, cached or estimated)"""
+    count_strategy = ExactCount()
+    
+    async def count(self, request: Request, stmt=None) -> int:
+        filtered = stmt is not None
+        if stmt is None:
+            stmt = self.count_query(request)
+        dialect = self.session_maker.kw['bind'].dialect.name
+        count, estimated = await self.count_strategy.count(
+            stmt, self._run_query, self.model.__tablename__, dialect, filtered
+        )
+        # list.html prefixes estimated totals with "~"
+        request.state.count_estimated = estimated
+        return count
+
+
+class IndexedAjaxLoader(QueryAjaxModelLoader):
+    """form_ajax_refs loader answering from the in-memory name index (LIKE query until it is built)"""
+    index_service: NameIndexService = None
+    
+    def get_index(self):
+        if self.index_service is None:
+            return None
+        return self.index_service.index_for(self.model, self.fields)
+    
+    async def get_list(self, term: str) -> list:
+        index = self.get_index()
+        if index is None or not index.ready:
+            return await super().get_list(term)
+        return index.search(term, self.limit)
+    
+    def format(self, model) -> dict:
+        if isinstance(model, tuple):
+            pk, label = model
+            return {"id": str(pk), "text": label}
+        return super().format(model)
+
+
+class IndexedAjaxRefsMixin:
+    """Swaps SQLAdmin's form_ajax_refs loaders for IndexedAjaxLoader"""
+    
+    def __init__(self):
+        super().__init__()
+        for name, options in self.form_ajax_refs.items():
+            remote_model = inspect(self.model).relationships[name].mapper.class_
+            self._form_ajax_refs[name] = IndexedAjaxLoader(name, remote_model, self, **options)
+
+
+# Add navigation links at the top with category
+class DashboardLink(BaseView):
+    name = "Dashboard 首頁"
+    icon = "fa-solid fa-home"
+    category = "🚀 快速導航"
+    
+    @expose("/redirect-home", methods=["GET"])
+    async def redirect_home(self, request: Request):
+        return RedirectResponse(url="/")
+
+
+class VideoSyncLink(BaseView):
+    name = "Video Sync Manager"
+    icon = "fa-solid fa-sync-alt"
+    category = "🚀 快速導航"
+    
+    @expose("/redirect-video", methods=["GET"])
+    async def redirect_video(self, request: Request):
+        return RedirectResponse(url="/video")
+
+
+# Add all data management views with category
+class WorkAdmin(CountStrategyMixin, ModelView, model=Work):
+    name = "Work"
+    name_plural = "Works"
+    icon = "fa-solid fa-book"
+    category = "📊 資料管理"
+    
+    column_list = [Work.WorkID, Work.Type, Work.JaName, Work.ZhHantName, Work.EnName]
+    column_searchable_list = [Work.JaName, Work.ZhHantName, Work.EnName]
+    column_sortable_list = [Work.WorkID, Work.Type]
+    column_default_sort = (Work.WorkID, True)
+
+
+class MusicAdmin(CountStrategyMixin, ModelView, model=Music):
+    name = "Music"
+    name_plural = "Music"
+    icon = "fa-solid fa-music"
+    category = "📊 資料管理"
+    
+    column_list = [
+        Music.MusicID,
+        Music.WorkID,
+        Music.JaName,
+        Music.ZhHantName,
+        Music.EnName,
+        Music.ThemeType
+    ]
+    
+    column_searchable_list = [Music.JaName, Music.ZhHantName, Music.EnName]
+    column_sortable_list = [Music.MusicID, Music.WorkID]
+    column_default_sort = (Music.MusicID, True)
+    
+    # Show relationships
+    column_details_exclude_list = []
+    can_view_details = True
+
+
+class VideoAdmin(CountStrategyMixin, ModelView, model=Video):
+    name = "Video"
+    name_plural = "Videos"
+    icon = "fa-solid fa-video"
+    category = "📊 資料管理"
+    
+    column_list = [
+        Video.VideoID, 
+        Video.JaTitle,
+        Video.YouTubeLink,
+        Video.UploadTime,
+        Video.Length
+    ]
+    
+    # 格式化欄位顯示
+    column_formatters = {
+        Video.JaTitle: lambda m, a: (m.JaTitle or m.ZhHantTitle or m.EnTitle or '(未設定)')[:35] + ('...' if (m.JaTitle or m.ZhHantTitle or m.EnTitle or '') and len(m.JaTitle or m.ZhHantTitle or m.EnTitle or '') > 35 else '')
+    }
+    
+    column_searchable_list = [Video.ZhHantTitle, Video.JaTitle, Video.EnTitle, Video.YouTubeLink]
+    column_sortable_list = [Video.VideoID, Video.UploadTime, Video.Length]
+    column_default_sort = [(Video.VideoID, True)]
+    
+    # Enable details view
+    can_view_details = True
+    can_create = True
+    can_edit = True
+    can_delete = True
+    
+    # Group form fields
+    form_columns = [
+        Video.YouTubeLink,
+        Video.UploadTime,
+        Video.ZhHantTitle,
+        Video.JaTitle,
+        Video.EnTitle,
+        Video.ZhHantDescription,
+        Video.JaDescription,
+        Video.EnDescription,
+        Video.ZhHantSubSource,
+        Video.JaSubSource,
+        Video.EnSubSource,
+        Video.Instrumental,
+        Video.Sheet,
+        Video.InstrumentalType,
+        Video.SubtitleType,
+        Video.GumroadSheet,
+        Video.Length
+    ]
+
+
+class StyleAdmin(IndexedAjaxRefsMixin, CountStrategyMixin, ModelView, model=Style):
+    name = "Style"
+    name_plural = "Styles (Video-Music Link)"
+    icon = "fa-solid fa-link"
+    category = "🔗 關聯資料"
+    
+    column_list = [Style.ID, 'video', 'music', Style.Style]
+    column_sortable_list = [Style.ID]
+    column_default_sort = [(Style.ID, True)]
+    column_searchable_list = ["Style"]
+    
+    # 表單使用 AJAX 搜尋（Video 和 Music）
+    form_ajax_refs = {
+        'video': {
+            'fields': ('VideoID', 'JaTitle', 'ZhHantTitle'),
+            'order_by': Video.VideoID,
+        },
+        'music': {
+            'fields': ('MusicID', 'JaName', 'ZhHantName'),
+            'order_by': Music.MusicID,
+        }
+    }
+    
+    # Style 欄位配置
+    form_args = {
+        'Style': {
+            'default': 'Cover',
+            'description': '常用選項：Cover, ShortCover, Collection, ShortMeme, ShortLife'
+        }
+    }
+
+    def search_query(self, stmt, term):
+        if not term:
+            return stmt
+        like_term = f"%{term}%"
+        return (
+            stmt.join(Style.video)
+                .join(Style.music)
+                .where(
+                    or_(
+                        Style.Style.ilike(like_term),
+                        Video.JaTitle.ilike(like_term),
+                        Video.ZhHantTitle.ilike(like_term),
+                        Video.EnTitle.ilike(like_term),
+                        Music.JaName.ilike(like_term),
+                        Music.ZhHantName.ilike(like_term),
+                        Music.EnName.ilike(like_term),
+                    )
+                )
+        )
+
+
+class StreamingAdmin(CountStrategyMixin, ModelView, model=Streaming):
+    name = "Streaming"
+    name_plural = "Streaming Releases"
+    icon = "fa-solid fa-compact-disc"
+    category = "📊 資料管理"
+    
+    column_list = [
+        Streaming.StreamingID,
+        Streaming.JaTitle,
+        Streaming.ZhHantTitle,
+        Streaming.EnTitle,
+        Streaming.InstrumentalType,
+        Streaming.SmartLink
+    ]
+    
+    column_searchable_list = [Streaming.JaTitle, Streaming.ZhHantTitle, Streaming.EnTitle]
+    column_sortable_list = [Streaming.StreamingID]
+    column_default_sort = (Streaming.StreamingID, True)
+    can_view_details = True
+
+
+class VersionAdmin(IndexedAjaxRefsMixin, CountStrategyMixin, ModelView, model=Version):
+    name = "Version"
+    name_plural = "Versions (Streaming-Music Link)"
+    icon = "fa-solid fa-code-branch"
+    category = "🔗 關聯資料"
+    
+    column_list = [Version.ID, 'streaming', 'music', Version.Version]
+    column_sortable_list = [Version.ID]
+    column_default_sort = [(Version.ID, True)]
+    column_searchable_list = ["Version"]
+    
+    # 表單使用 AJAX 搜尋
+    form_ajax_refs = {
+        'streaming': {
+            'fields': ('JaTitle', 'EnTitle', 'ZhHantTitle', 'ZhHansTitle'),
+            'order_by': Streaming.StreamingID,
+        },
+        'music': {
+            'fields': ('JaName', 'EnName', 'ZhHantName'),
+            'order_by': Music.MusicID,
+        }
+    }
+    
+    # Version 欄位配置
+    form_args = {
+        'Version': {
+            'description': '常用選項：Inst, Piano'
+        }
+    }
+
+    def search_query(self, stmt, term):
+        if not term:
+            return stmt
+        like_term = f"%{term}%"
+        return (
+            stmt.join(Version.streaming)
+                .join(Version.music)
+                .where(
+                    or_(
+                        Version.Version.ilike(like_term),
+                        Streaming.JaTitle.ilike(like_term),
+                        Streaming.EnTitle.ilike(like_term),
+                        Streaming.ZhHantTitle.ilike(like_term),
+                        Music.JaName.ilike(like_term),
+                        Music.ZhHantName.ilike(like_term),
+                        Music.EnName.ilike(like_term),
+                    )
+                )
+        )
+
+
+class CreatorAdmin(CountStrategyMixin, ModelView, model=Creator):
+    name = "Creator"
+    name_plural = "Creators"
+    icon = "fa-solid fa-user"
+    category = "📊 資料管理"
+    
+    column_list = [
+        Creator.CreatorID,
+        Creator.CreatorName,
+        Creator.ChannelName,
+        Creator.ChannelLink
+    ]
+    
+    column_searchable_list = [Creator.CreatorName, Creator.ChannelName]
+    column_sortable_list = [Creator.CreatorID]
+    column_default_sort = (Creator.CreatorID, True)
+    can_view_details = True
+
+
+class RoleAdmin(IndexedAjaxRefsMixin, CountStrategyMixin, ModelView, model=Role):
+    name = "Role"
+    name_plural = "Roles (Creator-Music Link)"
+    icon = "fa-solid fa-user-tag"
+    category = "🔗 關聯資料"
+    
+    column_list = [Role.RoleID, 'creator', 'music', Role.Role]
+    column_sortable_list = [Role.RoleID]
+    column_default_sort = [(Role.RoleID, True)]
+    column_searchable_list = ["Role"]
+    
+    # 表單使用 AJAX 搜尋
+    form_ajax_refs = {
+        'creator': {
+            'fields': ('CreatorID', 'CreatorName', 'ChannelName'),
+            'order_by': Creator.CreatorID,
+        },
+        'music': {
+            'fields': ('MusicID', 'JaName', 'ZhHantName'),
+            'order_by': Music.MusicID,
+        }
+    }
+    
+    # Role 欄位配置
+    form_args = {
+        'Role': {
+            'description': '常用選項：Artist, Composer, Singer'
+        }
+    }
+
+    def search_query(self, stmt, term):
+        if not term:
+            return stmt
+        like_term = f"%{term}%"
+        return (
+            stmt.join(Role.creator)
+                .join(Role.music)
+                .where(
+                    or_(
+                        Role.Role.ilike(like_term),
+                        Creator.CreatorName.ilike(like_term),
+                        Creator.ChannelName.ilike(like_term),
+                        Music.JaName.ilike(like_term),
+                        Music.ZhHantName.ilike(like_term),
+                        Music.EnName.ilike(like_term),
+                    )
+                )
+        )
+
+
+def ajax_index_specs():
+    """(model, fields) of every form_ajax_refs picker, for warming the name index at startup"""
+    specs = []
+    for view in (StyleAdmin, VersionAdmin, RoleAdmin):
+        for name, options in view.form_ajax_refs.items():
+            specs.append((inspect(view.model).relationships[name].mapper.class_, tuple(options['fields'])))
+    return specs
+
+
+def create_admin(app, engine, count_strategy=None, index_service=None) -> Admin:
+    """Create the admin interface and register all views (ordered for sidebar)"""
+    if count_strategy is not None:
+        CountStrategyMixin.count_strategy = count_strategy
+    if index_service is not None:
+        IndexedAjaxLoader.index_service = index_service
+    
+    admin = Admin(
+        app, 
+        engine,
+        title="YouTube Metadata Manager",
+        base_url="/admin",
+        templates_dir="templates"
+    )
+    
+    # Add navigation links first
+    admin.add_view(DashboardLink)
+    admin.add_view(VideoSyncLink)
+    
+    # Add all data management views
+    admin.add_view(VideoAdmin)
+    admin.add_view(WorkAdmin)
+    admin.add_view(MusicAdmin)
+    admin.add_view(CreatorAdmin)
+    admin.add_view(StreamingAdmin)
+    admin.add_view(StyleAdmin)
+    admin.add_view(RoleAdmin)
+    admin.add_view(VersionAdmin)
+    return admin
@@ -1,24 +1,49 @@
 """
 FastAPI Application with SQLAdmin Dashboard
 """
+import io
 import os
+import json
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager, ExitStack
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, Request, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi import FastAPI, UploadFile, File, Request, HTTPException, Query
+from fastapi.responses import (
+    HTMLResponse, JSONResponse, RedirectResponse, PlainTextResponse, FileResponse, StreamingResponse
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from sqladmin import Admin, ModelView, BaseView
-from sqladmin import expose
-from sqlalchemy import create_engine, or_
-from typing import List
-import aiofiles
+from starlette.routing import Mount
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
 from pathlib import Path
+from contextlib import nullcontext
 
 from models import Video, Music, Style, Work, Streaming, Version, Creator, Role
-from services.youtube_service import YouTubeService
+from services.account_service import AccountPool
+from services.snapshot_service import SnapshotStore
 from services.database_service import DatabaseService
 from services.description_service import DescriptionService
 from services.video_sync_service import VideoSyncService
+from services.dry_run_service import DryRunService
+from services.change_tracking_service import ChangeTrackingService
+from services.metrics_service import (
+    REGISTRY, HTTP_REQUEST_SECONDS, SYNC_STAGE_SECONDS, SYNC_SECONDS, SYNC_IN_FLIGHT,
+    instrument_engines, track_sync
+)
+from services.profiling_service import ProfilingService
+from services.query_stats_service import QueryStatsService
+from services.count_service import create_count_strategy
+from services.name_index_service import NameIndexService
+from services.subtitle_store_service import create_subtitle_store
+from services.checkpoint_service import SyncCheckpoints, file_hash
+from services.import_service import ImportService, IMPORT_MODELS, iter_rows, detect_format
+from services.export_service import ExportService, EXPORT_FORMATS
+from services.job_queue_service import JobQueue
+from services.catalog_version_service import CatalogVersionService
+from services.http_cache_service import BuildVersion, PageCache, make_etag
+from services.batch_events_service import BatchEventRegistry
 
 # Load environment variables
 load_dotenv()
@@ -30,346 +55,256 @@ DB_HOST = os.getenv('DB_HOST')
 DB_PORT = os.getenv('DB_PORT', '3306')
 DB_NAME = os.getenv('DB_NAME')
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Any SQLAlchemy URL (e.g. sqlite:///catalog.db); defaults to MariaDB from the DB_* settings
+DATABASE_URL = os.getenv('DATABASE_URL') or f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Read-only traffic (dashboard stats, /video listing, exports, dry-run previews): a read replica or a
+# SQLite snapshot kept fresh with `cli.py snapshot-db`; writes always go to DATABASE_URL
+DATABASE_READ_URL = os.getenv('DATABASE_READ_URL')
 
 # YouTube configuration
 CLIENT_SECRETS_FILE = os.getenv('CLIENT_SECRETS_FILE')
 API_KEY = os.getenv('YOUTUBE_API_KEY')
+# Last known remote state per video, revalidated with ETags
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshots')
+# Channels/accounts (JSON list; without it CLIENT_SECRETS_FILE + token.json is the only account)
+YOUTUBE_ACCOUNTS_FILE = os.getenv('YOUTUBE_ACCOUNTS_FILE', 'accounts.json')
+QUOTA_DIR = os.getenv('QUOTA_DIR', 'quota')
+YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
+
+# Uploaded subtitles: a directory shared by every worker (or file:// URL); uploads expire after the TTL
+SUBTITLE_STORE = os.getenv('SUBTITLE_STORE', 'temp/subtitle_store')
+SUBTITLE_UPLOAD_TTL_HOURS = float(os.getenv('SUBTITLE_UPLOAD_TTL_HOURS', '24'))
+# Minimum interval between garbage collections triggered by uploads
+SUBTITLE_GC_INTERVAL_SECONDS = 600
+
+# Profiling configuration (requests opt in with ?profile=1 or an X-Profile header once enabled)
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+PROFILES_DIR = os.getenv('PROFILES_DIR', 'profiles')
+
+# SQL instrumentation (per-request query headers are only added in debug mode)
+DEBUG = os.getenv('DEBUG', 'false').lower() == 'true'
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '5'))
+
+# Admin list pagination counts: exact (SQLAdmin default), cached (invalidated on write) or
+# estimated (table statistics for unfiltered lists of tables above the threshold)
+ADMIN_COUNT_STRATEGY = os.getenv('ADMIN_COUNT_STRATEGY', 'estimated')
+ADMIN_COUNT_ESTIMATE_THRESHOLD = int(os.getenv('ADMIN_COUNT_ESTIMATE_THRESHOLD', '100000'))
+ADMIN_COUNT_CACHE_TTL = float(os.getenv('ADMIN_COUNT_CACHE_TTL', '300'))
+
+# Rows per transaction of /api/import
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '1000'))
+
+# Rows fetched from the cursor per chunk of /api/export
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+# Sync jobs run by worker.py processes: attempts before giving up, heartbeat age of a dead worker
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_STALE_SECONDS = float(os.getenv('JOB_STALE_SECONDS', '120'))
+
+# Longest circuit-breaker cooldown a batch sync waits out before skipping the remaining videos
+BATCH_MAX_PAUSE_SECONDS = 120
+
+# Initialize services (cheap: no connections, Google clients are built on first authenticate)
+accounts = AccountPool.from_config(YOUTUBE_ACCOUNTS_FILE, CLIENT_SECRETS_FILE, SnapshotStore(SNAPSHOT_DIR),
+                                   QUOTA_DIR, YOUTUBE_DAILY_QUOTA)
+db_service = DatabaseService(DATABASE_URL)
+read_db_service = DatabaseService(DATABASE_READ_URL, read_only=True) if DATABASE_READ_URL else db_service
+profiling_service = ProfilingService(PROFILES_DIR, enabled=PROFILING_ENABLED)
+query_stats_service = QueryStatsService(SLOW_QUERY_MS, N_PLUS_ONE_THRESHOLD)
+count_strategy = create_count_strategy(ADMIN_COUNT_STRATEGY, ADMIN_COUNT_ESTIMATE_THRESHOLD, ADMIN_COUNT_CACHE_TTL)
+subtitle_store = create_subtitle_store(SUBTITLE_STORE, SUBTITLE_UPLOAD_TTL_HOURS * 3600)
+_last_subtitle_gc = 0.0
+
+# SQLAdmin shares the DatabaseService engine and connection pool
+engine = db_service.engine
+name_index_service = NameIndexService(engine)
+job_queue = JobQueue(engine, JOB_MAX_ATTEMPTS, JOB_STALE_SECONDS)
+# Rendered / and /video for the current catalog version, plain and compressed
+page_cache = PageCache()
+# Batch syncs started with POST /api/batch-sync/events, followed over SSE
+batch_events = BatchEventRegistry()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Record edits from SQLAdmin and the clone helpers in SyncOutbox
+    ChangeTrackingService.register()
+    count_strategy.register()
+    
+    # Count SQL statements from every engine for /metrics, and per request for the slow/N+1 log
+    instrument_engines()
+    query_stats_service.install()
+    # Profiled requests include the work they hand to asyncio.to_thread
+    profiling_service.install(asyncio.get_running_loop())
+    
+    db_service.ensure_support_tables()
+    
+    # Build the admin picker (form_ajax_refs) name indexes off the request path
+    name_index_service.register()
+    threading.Thread(target=warm_name_indexes, name="name-index-warmup", daemon=True).start()
+    
+    # Drop subtitle uploads that were never synced
+    await collect_subtitle_garbage()
+    yield
+
+
+def warm_name_indexes():
+    from admin_views import ajax_index_specs
+    name_index_service.warm(ajax_index_specs())
+
+
+async def collect_subtitle_garbage():
+    global _last_subtitle_gc
+    _last_subtitle_gc = time.monotonic()
+    try:
+        result = await asyncio.to_thread(subtitle_store.collect_garbage)
+        if result['expired_uploads'] or result['removed_blobs']:
+            print(f"✓ Subtitle store: {result['expired_uploads']} expired uploads, "
+                  f"{result['removed_blobs']} unreferenced files removed")
+    except Exception as e:
+        print(f"⚠ Subtitle store garbage collection failed: {e}")
+
 
 # Create FastAPI app
-app = FastAPI(title="YouTube Metadata Manager", version="2.0")
+app = FastAPI(title="YouTube Metadata Manager", version="2.0", lifespan=lifespan)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Setup templates
 templates = Jinja2Templates(directory="templates")
-
-# Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL, echo=False)
-
-# Create admin interface with custom title
-admin = Admin(
-    app, 
-    engine,
-    title="YouTube Metadata Manager",
-    base_url="/admin",
-    templates_dir="templates"
+# App code, templates and static assets the cached pages are built from (part of their ETag)
+build_version = BuildVersion(
+    [str(path) for pattern in ("*.py", "services/*.py") for path in Path(__file__).parent.glob(pattern)],
+    ["templates", "static"]
 )
 
-# Initialize services
-youtube_service = YouTubeService(CLIENT_SECRETS_FILE)
-db_service = DatabaseService(DATABASE_URL)
 
-
-# Add navigation links at the top with category
-class DashboardLink(BaseView):
-    name = "Dashboard 首頁"
-    icon = "fa-solid fa-home"
-    category = "🚀 快速導航"
-    
-    @expose("/redirect-home", methods=["GET"])
-    async def redirect_home(self, request: Request):
-        return RedirectResponse(url="/")
-
-
-class VideoSyncLink(BaseView):
-    name = "Video Sync Manager"
-    icon = "fa-solid fa-sync-alt"
-    category = "🚀 快速導航"
-    
-    @expose("/redirect-video", methods=["GET"])
-    async def redirect_video(self, request: Request):
-        return RedirectResponse(url="/video")
-
-
-# Add navigation links first
-admin.add_view(DashboardLink)
-admin.add_view(VideoSyncLink)
-
-# Add all data management views with category
-class WorkAdmin(ModelView, model=Work):
-    name = "Work"
-    name_plural = "Works"
-    icon = "fa-solid fa-book"
-    category = "📊 資料管理"
-    
-    column_list = [Work.WorkID, Work.Type, Work.JaName, Work.ZhHantName, Work.EnName]
-    column_searchable_list = [Work.JaName, Work.ZhHantName, Work.EnName]
-    column_sortable_list = [Work.WorkID, Work.Type]
-    column_default_sort = (Work.WorkID, True)
-
-
-class MusicAdmin(ModelView, model=Music):
-    name = "Music"
-    name_plural = "Music"
-    icon = "fa-solid fa-music"
-    category = "📊 資料管理"
-    
-    column_list = [
-        Music.MusicID,
-        Music.WorkID,
-        Music.JaName,
-        Music.ZhHantName,
-        Music.EnName,
-        Music.ThemeType
-    ]
-    
-    column_searchable_list = [Music.JaName, Music.ZhHantName, Music.EnName]
-    column_sortable_list = [Music.MusicID, Music.WorkID]
-    column_default_sort = (Music.MusicID, True)
-    
-    # Show relationships
-    column_details_exclude_list = []
-    can_view_details = True
-
-
-from sqladmin import ModelView
-from wtforms import SelectField
-
-
-class VideoAdmin(ModelView, model=Video):
-    name = "Video"
-    name_plural = "Videos"
-    icon = "fa-solid fa-video"
-    category = "📊 資料管理"
-    
-    column_list = [
-        Video.VideoID, 
-        Video.JaTitle,
-        Video.YouTubeLink,
-        Video.UploadTime,
-        Video.Length
-    ]
-    
-    # 格式化欄位顯示
-    column_formatters = {
-        Video.JaTitle: lambda m, a: (m.JaTitle or m.ZhHantTitle or m.EnTitle or '(未設定)')[:35] + ('...' if (m.JaTitle or m.ZhHantTitle or m.EnTitle or '') and len(m.JaTitle or m.ZhHantTitle or m.EnTitle or '') > 35 else '')
-    }
-    
-    column_searchable_list = [Video.ZhHantTitle, Video.JaTitle, Video.EnTitle, Video.YouTubeLink]
-    column_sortable_list = [Video.VideoID, Video.UploadTime, Video.Length]
-    column_default_sort = [(Video.VideoID, True)]
-    
-    # Enable details view
-    can_view_details = True
-    can_create = True
-    can_edit = True
-    can_delete = True
-    
-    # Group form fields
-    form_columns = [
-        Video.YouTubeLink,
-        Video.UploadTime,
-        Video.ZhHantTitle,
-        Video.JaTitle,
-        Video.EnTitle,
-        Video.ZhHantDescription,
-        Video.JaDescription,
-        Video.EnDescription,
-        Video.ZhHantSubSource,
-        Video.JaSubSource,
-        Video.EnSubSource,
-        Video.Instrumental,
-        Video.Sheet,
-        Video.InstrumentalType,
-        Video.SubtitleType,
-        Video.GumroadSheet,
-        Video.Length
-    ]
-
-
-class StyleAdmin(ModelView, model=Style):
-    name = "Style"
-    name_plural = "Styles (Video-Music Link)"
-    icon = "fa-solid fa-link"
-    category = "🔗 關聯資料"
-    
-    column_list = [Style.ID, 'video', 'music', Style.Style]
-    column_sortable_list = [Style.ID]
-    column_default_sort = [(Style.ID, True)]
-    column_searchable_list = ["Style"]
-    
-    # 表單使用 AJAX 搜尋（Video 和 Music）
-    form_ajax_refs = {
-        'video': {
-            'fields': ('VideoID', 'JaTitle', 'ZhHantTitle'),
-            'order_by': Video.VideoID,
-        },
-        'music': {
-            'fields': ('MusicID', 'JaName', 'ZhHantName'),
-            'order_by': Music.MusicID,
-        }
-    }
+class LazyAdmin:
+    """ASGI app mounted at /admin that imports and builds SQLAdmin on the first admin request"""
     
-    # Style 欄位配置
-    form_args = {
-        'Style': {
-            'default': 'Cover',
-            'description': '常用選項：Cover, ShortCover, Collection, ShortMeme, ShortLife'
-        }
-    }
-
-    def search_query(self, stmt, term):
-        if not term:
-            return stmt
-        like_term = f"%{term}%"
-        return (
-            stmt.join(Style.video)
-                .join(Style.music)
-                .where(
-                    or_(
-                        Style.Style.ilike(like_term),
-                        Video.JaTitle.ilike(like_term),
-                        Video.ZhHantTitle.ilike(like_term),
-                        Video.EnTitle.ilike(like_term),
-                        Music.JaName.ilike(like_term),
-                        Music.ZhHantName.ilike(like_term),
-                        Music.EnName.ilike(like_term),
-                    )
-                )
+    def __init__(self):
+        self._admin_app = None
+        self._lock = threading.Lock()
+    
+    async def __call__(self, scope, receive, send):
+        if self._admin_app is None:
+            with self._lock:
+                if self._admin_app is None:
+                    from admin_views import create_admin
+                    # create_admin also mounts itself as "admin" so url_for('admin:...') keeps working
+                    self._admin_app = create_admin(app, engine, count_strategy, name_index_service).admin
+        await self._admin_app(scope, receive, send)
+
+
+# Create admin interface lazily
+app.mount("/admin", LazyAdmin(), name="admin_lazy")
+
+
+def _route_label(request: Request) -> str:
+    """Route template for metrics labels, so /api/sync-video/1 and /2 share one series"""
+    route = request.scope.get('route')
+    mount_prefix = request.scope.get('root_path', '')[len(request.scope.get('app_root_path', '')):]
+    if route is None:
+        # Older Starlette versions only record the route for FastAPI endpoints
+        return f"{mount_prefix}/*" if mount_prefix else 'unmatched'
+    if isinstance(route, Mount):
+        return mount_prefix or route.path
+    return mount_prefix + route.path
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method, route=_route_label(request), status=status
         )
 
 
-class StreamingAdmin(ModelView, model=Streaming):
-    name = "Streaming"
-    name_plural = "Streaming Releases"
-    icon = "fa-solid fa-compact-disc"
-    category = "📊 資料管理"
-    
-    column_list = [
-        Streaming.StreamingID,
-        Streaming.JaTitle,
-        Streaming.ZhHantTitle,
-        Streaming.EnTitle,
-        Streaming.InstrumentalType,
-        Streaming.SmartLink
-    ]
-    
-    column_searchable_list = [Streaming.JaTitle, Streaming.ZhHantTitle, Streaming.EnTitle]
-    column_sortable_list = [Streaming.StreamingID]
-    column_default_sort = (Streaming.StreamingID, True)
-    can_view_details = True
-
-
-class VersionAdmin(ModelView, model=Version):
-    name = "Version"
-    name_plural = "Versions (Streaming-Music Link)"
-    icon = "fa-solid fa-code-branch"
-    category = "🔗 關聯資料"
-    
-    column_list = [Version.ID, 'streaming', 'music', Version.Version]
-    column_sortable_list = [Version.ID]
-    column_default_sort = [(Version.ID, True)]
-    column_searchable_list = ["Version"]
-    
-    # 表單使用 AJAX 搜尋
-    form_ajax_refs = {
-        'streaming': {
-            'fields': ('JaTitle', 'EnTitle', 'ZhHantTitle', 'ZhHansTitle'),
-            'order_by': Streaming.StreamingID,
-        },
-        'music': {
-            'fields': ('JaName', 'EnName', 'ZhHantName'),
-            'order_by': Music.MusicID,
-        }
-    }
-    
-    # Version 欄位配置
-    form_args = {
-        'Version': {
-            'description': '常用選項：Inst, Piano'
-        }
-    }
-
-    def search_query(self, stmt, term):
-        if not term:
-            return stmt
-        like_term = f"%{term}%"
-        return (
-            stmt.join(Version.streaming)
-                .join(Version.music)
-                .where(
-                    or_(
-                        Version.Version.ilike(like_term),
-                        Streaming.JaTitle.ilike(like_term),
-                        Streaming.EnTitle.ilike(like_term),
-                        Streaming.ZhHantTitle.ilike(like_term),
-                        Music.JaName.ilike(like_term),
-                        Music.ZhHantName.ilike(like_term),
-                        Music.EnName.ilike(like_term),
-                    )
-                )
-        )
+@app.middleware("http")
+async def record_query_stats(request: Request, call_next):
+    """Count queries and DB time per request; flag repeated statements (N+1)"""
+    with query_stats_service.track(f"{request.method} {request.url.path}") as stats:
+        response = await call_next(request)
+    if DEBUG:
+        response.headers['X-DB-Query-Count'] = str(stats.count)
+        response.headers['X-DB-Time-Ms'] = f"{stats.total_time * 1000:.1f}"
+        response.headers['X-DB-Repeated-Statements'] = str(len(stats.repeated(N_PLUS_ONE_THRESHOLD)))
+    return response
 
 
-class CreatorAdmin(ModelView, model=Creator):
-    name = "Creator"
-    name_plural = "Creators"
-    icon = "fa-solid fa-user"
-    category = "📊 資料管理"
-    
-    column_list = [
-        Creator.CreatorID,
-        Creator.CreatorName,
-        Creator.ChannelName,
-        Creator.ChannelLink
-    ]
-    
-    column_searchable_list = [Creator.CreatorName, Creator.ChannelName]
-    column_sortable_list = [Creator.CreatorID]
-    column_default_sort = (Creator.CreatorID, True)
-    can_view_details = True
-
-
-class RoleAdmin(ModelView, model=Role):
-    name = "Role"
-    name_plural = "Roles (Creator-Music Link)"
-    icon = "fa-solid fa-user-tag"
-    category = "🔗 關聯資料"
-    
-    column_list = [Role.RoleID, 'creator', 'music', Role.Role]
-    column_sortable_list = [Role.RoleID]
-    column_default_sort = [(Role.RoleID, True)]
-    column_searchable_list = ["Role"]
-    
-    # 表單使用 AJAX 搜尋
-    form_ajax_refs = {
-        'creator': {
-            'fields': ('CreatorID', 'CreatorName', 'ChannelName'),
-            'order_by': Creator.CreatorID,
-        },
-        'music': {
-            'fields': ('MusicID', 'JaName', 'ZhHantName'),
-            'order_by': Music.MusicID,
-        }
-    }
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """Run a single request under a profiler when asked to; a flag lookup otherwise
     
-    # Role 欄位配置
-    form_args = {
-        'Role': {
-            'description': '常用選項：Artist, Composer, Singer'
-        }
-    }
-
-    def search_query(self, stmt, term):
-        if not term:
-            return stmt
-        like_term = f"%{term}%"
-        return (
-            stmt.join(Role.creator)
-                .join(Role.music)
-                .where(
-                    or_(
-                        Role.Role.ilike(like_term),
-                        Creator.CreatorName.ilike(like_term),
-                        Creator.ChannelName.ilike(like_term),
-                        Music.JaName.ilike(like_term),
-                        Music.ZhHantName.ilike(like_term),
-                        Music.EnName.ilike(like_term),
-                    )
-                )
-        )
+    The profile covers the request's asyncio.to_thread work and ends once the (streamed) body is sent
+    """
+    mode = profiling_service.resolve_mode(
+        request.headers.get('x-profile') or request.query_params.get('profile')
+    )
+    if mode is None:
+        return await call_next(request)
+    
+    profile = ExitStack()
+    path = profile.enter_context(profiling_service.profile(f"{request.method}_{request.url.path}", mode))
+    try:
+        response = await call_next(request)
+    except BaseException:
+        profile.close()
+        raise
+    if path is not None:
+        response.headers['X-Profile-File'] = path.name
+    body = response.body_iterator
+    
+    async def profiled_body():
+        with profile:
+            async for chunk in body:
+                yield chunk
+    
+    response.body_iterator = profiled_body()
+    return response
+
+
+@app.get("/api/profiles")
+async def list_profiles():
+    """List saved profile dumps"""
+    return JSONResponse({
+        "enabled": profiling_service.enabled,
+        "profiles": profiling_service.list_profiles()
+    })
+
+
+@app.post("/api/profiles/toggle")
+async def toggle_profiling(request: Request):
+    """Turn request profiling on/off at runtime (DEBUG=true only). Body: {"enabled": true}"""
+    if not DEBUG:
+        return JSONResponse({"success": False, "message": "Profiling toggle requires DEBUG=true"}, status_code=403)
+    body = await request.json()
+    profiling_service.enabled = bool(body.get('enabled'))
+    return JSONResponse({"enabled": profiling_service.enabled})
+
+
+@app.get("/api/profiles/{name}")
+async def download_profile(name: str):
+    """Download a .pstats, .folded or .txt profile"""
+    path = profiling_service.get_path(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=path.name)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of request, sync-stage and API-call metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 def _clone_video(session, video_id: int):
@@ -574,17 +509,6 @@ async def clone_creator(creator_id: int):
         session.close()
 
 
-# Add all data management views (ordered for sidebar)
-admin.add_view(VideoAdmin)
-admin.add_view(WorkAdmin)
-admin.add_view(MusicAdmin)
-admin.add_view(CreatorAdmin)
-admin.add_view(StreamingAdmin)
-admin.add_view(StyleAdmin)
-admin.add_view(RoleAdmin)
-admin.add_view(VersionAdmin)
-
-
 # Redirect /admin to /admin/video/list
 @app.get("/admin", include_in_schema=False)
 async def redirect_admin():
@@ -595,40 +519,62 @@ async def redirect_admin():
 
 # ============ Video Sync Routes ============
 
+def _page_version(template: str, include_outbox: bool = False):
+    """ETag and Last-Modified of a page rendered from the catalog: the catalog version (plus the
+    "changed" markers when shown) and the build version, so a data, template, asset or code change
+    invalidates cached copies"""
+    same_database = read_db_service is db_service
+    parts, last_modified = CatalogVersionService.current(read_db_service.engine, include_outbox and same_database)
+    if include_outbox and not same_database:
+        # The markers are read from the primary, the catalog from the replica
+        parts += CatalogVersionService.outbox(db_service.engine)
+    build, built_at = build_version.current()
+    return make_etag(template, build, *parts), max(last_modified or built_at, built_at)
+
+
 @app.get("/video", response_class=HTMLResponse)
 async def video_sync_page(request: Request):
-    """Video sync management page"""
-    session = db_service.get_session()
-    try:
-        videos = session.query(Video).order_by(Video.VideoID.desc()).all()
-        return templates.TemplateResponse("video_sync.html", {
-            "request": request,
-            "videos": videos
-        })
-    finally:
-        session.close()
+    """Video sync management page (304 / cached render while the catalog is unchanged)"""
+    def render() -> bytes:
+        session = read_db_service.get_session()
+        try:
+            videos = session.query(Video).order_by(Video.VideoID.desc()).all()
+            dirty_ids = set(db_service.get_dirty_video_ids())
+            return templates.TemplateResponse("video_sync.html", {
+                "request": request,
+                "videos": videos,
+                "dirty_ids": dirty_ids
+            }).body
+        finally:
+            session.close()
+    
+    version = await asyncio.to_thread(_page_version, "video_sync.html", include_outbox=True)
+    return await page_cache.respond(request, "video", version, render)
 
 
 @app.post("/api/upload-subtitles/{video_id}")
 async def upload_subtitles(video_id: int, files: List[UploadFile] = File(...)):
-    """Upload subtitle files for a video"""
+    """Upload subtitle files for a video
+    
+    Files go to the shared subtitle store; the returned upload_id is passed to sync-video
+    """
     try:
-        # Create temp directory for this video
-        temp_dir = Path("temp") / str(video_id)
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        
-        uploaded_files = []
+        subtitle_files = {}
         for file in files:
             if file.filename.endswith('.srt'):
-                file_path = temp_dir / file.filename
-                async with aiofiles.open(file_path, 'wb') as f:
-                    content = await file.read()
-                    await f.write(content)
-                uploaded_files.append(file.filename)
+                subtitle_files[file.filename] = await file.read()
+        
+        upload_id = None
+        if subtitle_files:
+            upload_id = await asyncio.to_thread(subtitle_store.save_upload, video_id, subtitle_files)
+        
+        if time.monotonic() - _last_subtitle_gc > SUBTITLE_GC_INTERVAL_SECONDS:
+            asyncio.create_task(collect_subtitle_garbage())
         
         return JSONResponse({
             "success": True,
-            "uploaded_files": uploaded_files
+            "uploaded_files": list(subtitle_files),
+            "upload_id": upload_id
         })
     except Exception as e:
         return JSONResponse({
@@ -638,11 +584,67 @@ async def upload_subtitles(video_id: int, files: List[UploadFile] = File(...)):
 
 
 @app.post("/api/sync-video/{video_id}")
-async def sync_video(video_id: int, subtitle_type: str = None):
-    """Sync video metadata and subtitles to YouTube"""
+async def sync_video(video_id: int, subtitle_type: str = None, upload_id: str = None, resume: bool = False):
+    """Sync video metadata and subtitles to YouTube
+    
+    upload_id selects the subtitle upload to use; without it the video's latest upload is used.
+    resume=true skips the YouTube writes a previous failed sync of this video already completed.
+    """
+    return await _run_sync(video_id, subtitle_type, upload_id, resume=resume)
+
+
+async def _run_sync(video_id: int, subtitle_type: str = None, upload_id: str = None,
+                    progress: Optional[Callable[[Dict], Awaitable]] = None, resume: bool = False,
+                    account: str = None):
+    try:
+        account = account or (await asyncio.to_thread(accounts.route, db_service, [video_id]))[int(video_id)]
+    except Exception as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=500)
+    
+    start = time.perf_counter()
+    
+    with SYNC_IN_FLIGHT.track():
+        # One sync at a time per account (its client is not thread-safe); other accounts run meanwhile
+        async with _account_lock(account):
+            with track_sync():
+                response = await _sync_video(video_id, subtitle_type, upload_id, progress, resume, account)
+    
+    SYNC_SECONDS.observe(
+        time.perf_counter() - start,
+        outcome='success' if response.status_code == 200 else 'failed'
+    )
+    return response
+
+
+# Account name -> lock serializing that account's syncs
+_account_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _account_lock(account: str) -> asyncio.Lock:
+    if account not in _account_locks:
+        _account_locks[account] = asyncio.Lock()
+    return _account_locks[account]
+
+
+@asynccontextmanager
+async def _sync_stage(stage: str, progress: Optional[Callable[[Dict], Awaitable]]):
+    """Time a sync stage for /metrics and report its start/end to `progress` (live batch events)"""
+    if progress:
+        await progress({'stage': stage, 'status': 'started'})
+    start = time.perf_counter()
+    with SYNC_STAGE_SECONDS.time(stage=stage):
+        yield
+    if progress:
+        await progress({'stage': stage, 'status': 'done', 'seconds': round(time.perf_counter() - start, 3)})
+
+
+async def _sync_video(video_id: int, subtitle_type: str = None, upload_id: str = None,
+                      progress: Optional[Callable[[Dict], Awaitable]] = None, resume: bool = False,
+                      account: str = None):
     try:
         # Get video data from database
-        video_data = db_service.get_video_metadata(video_id)
+        async with _sync_stage('load', progress):
+            video_data = await asyncio.to_thread(db_service.get_video_metadata, video_id)
         if not video_data:
             return JSONResponse({
                 "success": False,
@@ -650,84 +652,127 @@ async def sync_video(video_id: int, subtitle_type: str = None):
             }, status_code=404)
         
         # Check YouTube link
-        if not video_data.get('YouTubeLink'):
+        if not video_data.YouTubeLink:
             return JSONResponse({
                 "success": False,
                 "message": "YouTube link not set"
             }, status_code=400)
         
-        # Authenticate with YouTube
-        youtube_service.authenticate()
+        # Remember the outbox position so edits made during the sync stay dirty
+        dirty_marker = (await asyncio.to_thread(db_service.get_dirty_video_ids, [video_id])).get(int(video_id))
+        checkpoints = await asyncio.to_thread(SyncCheckpoints, db_service, video_id, resume)
+        
+        # Authenticate with the video's YouTube account; API calls run in threads so syncs
+        # of other accounts (and the batch event stream) keep going meanwhile
+        youtube_service = accounts.service(account)
+        async with _sync_stage('authenticate', progress):
+            await asyncio.to_thread(youtube_service.authenticate)
+        youtube_service.reset_outcomes()
         
         # Extract YouTube video ID
-        yt_video_id = VideoSyncService.extract_video_id_from_link(video_data['YouTubeLink'])
+        yt_video_id = VideoSyncService.extract_video_id_from_link(video_data.YouTubeLink)
         
         # Step 1: Upload subtitles (if available)
-        subtitle_names = {
-            'Lyrics': {'ja': "歌詞", "en": "English Lyrics Translation", "zh-Hant": "中文歌詞翻譯"},
-            'BloggerTalk': {'ja': "僕の心の話", "en": "My heartfelt story", "zh-Hant": "我心裡的話"}
-        }
         # Use provided subtitle_type or fall back to database value or default
-        selected_type = subtitle_type if subtitle_type else video_data.get('SubtitleType', 'Lyrics')
-        name = subtitle_names.get(selected_type, subtitle_names['Lyrics'])
+        selected_type = subtitle_type if subtitle_type else (video_data.SubtitleType or 'Lyrics')
+        name = DescriptionService.subtitle_names(selected_type)
         
+        # Subtitles come from the store; a pre-filled temp/<video_id>/ folder is still honoured
+        upload_id = upload_id or await asyncio.to_thread(subtitle_store.latest_upload, video_id)
+        upload = await asyncio.to_thread(subtitle_store.get_upload, upload_id) if upload_id else None
         temp_dir = Path("temp") / str(video_id)
         subtitle_uploaded = False
-        if temp_dir.exists():
-            for language_code in ['ja', 'en', 'zh-Hant']:
-                subtitle_file = temp_dir / f"{language_code}_subtitle.srt"
-                if subtitle_file.exists():
-                    try:
-                        youtube_service.upload_subtitle(
-                            yt_video_id, 
-                            language_code, 
-                            str(subtitle_file), 
-                            name[language_code]
-                        )
+        if upload or temp_dir.exists():
+            async with _sync_stage('subtitles', progress):
+                for language_code in DescriptionService.LANGUAGES:
+                    filename = f"{language_code}_subtitle.srt"
+                    if upload:
+                        if filename not in upload['files']:
+                            continue
+                        digest = upload['files'][filename]
+                        subtitle_file = subtitle_store.open_local(digest)
+                    elif (temp_dir / filename).exists():
+                        digest = await asyncio.to_thread(file_hash, str(temp_dir / filename))
+                        subtitle_file = nullcontext(str(temp_dir / filename))
+                    else:
+                        continue
+                    
+                    # A caption insert costs 400 units; never repeat one that already went through
+                    stage, inputs = f"subtitle:{language_code}", [digest, name[language_code]]
+                    if checkpoints.is_done(stage, inputs):
                         subtitle_uploaded = True
+                        continue
+                    try:
+                        with subtitle_file as subtitle_path:
+                            if await asyncio.to_thread(
+                                youtube_service.upload_subtitle,
+                                yt_video_id, 
+                                language_code, 
+                                subtitle_path, 
+                                name[language_code]
+                            ):
+                                subtitle_uploaded = True
+                                await asyncio.to_thread(checkpoints.complete, stage, inputs)
                     except Exception as e:
                         print(f"Warning: Failed to upload {language_code} subtitle: {e}")
                         # Continue even if subtitle upload fails
         
         # Step 2: Generate and update descriptions/titles
-        info_dict = DescriptionService.prepare_info_dict(video_data)
-        inst_type = "instrumental" if video_data.get('InstrumentalType') == 'Inst' else "piano"
-        
-        languages = ['ja', 'en', 'zh-Hant']
-        language_map = {'ja': 'JaTitle', 'en': 'EnTitle', 'zh-Hant': 'ZhHantTitle'}
-        
-        localized_metadata = {}
-        for language_code in languages:
-            title = video_data.get(language_map[language_code])
-            description = DescriptionService.generate(info_dict, inst_type, language=language_code)
-            localized_metadata[language_code] = {"title": title, "description": description}
-        
-        youtube_service.update_video_metadata(yt_video_id, localized_metadata, 10)
+        async with _sync_stage('metadata', progress):
+            localized_metadata = DescriptionService.build_localized_metadata(video_data)
+            metadata_done = await asyncio.to_thread(
+                checkpoints.push_metadata, youtube_service, yt_video_id, localized_metadata, 10
+            )
         
         # Step 3: Fetch video info from YouTube and update database
-        video_info = VideoSyncService.get_video_info(youtube_service.youtube, yt_video_id)
+        async with _sync_stage('video_info', progress):
+            video_info = await asyncio.to_thread(youtube_service.get_video_info, yt_video_id)
         
-        if video_info:
-            # Update database with duration and upload time
-            db_service.update_video(video_id, {
-                'Length': video_info['duration'],
-                'UploadTime': video_info['upload_time']
-            })
+        async with _sync_stage('db_write', progress):
+            if video_info:
+                # Update database with duration and upload time
+                await asyncio.to_thread(db_service.update_video, video_id, {
+                    'Length': video_info['duration'],
+                    'UploadTime': video_info['upload_time']
+                })
+            
+            if dirty_marker and metadata_done:
+                await asyncio.to_thread(db_service.clear_dirty, int(video_id), dirty_marker)
         
-        # Clean up temp files
-        import shutil
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+        # Surface the final outcome of every YouTube stage
+        outcomes = youtube_service.outcomes
+        failed_stages = [stage for stage, outcome in outcomes.items() if outcome and outcome['status'] != 'ok']
+        
+        if not failed_stages:
+            await asyncio.to_thread(checkpoints.finish)
+            # Release the upload (its files are garbage collected) and clean up legacy temp files;
+            # after a failure they are kept for the retry
+            if upload:
+                await asyncio.to_thread(subtitle_store.delete_upload, upload_id)
+            elif temp_dir.exists():
+                import shutil
+                await asyncio.to_thread(shutil.rmtree, temp_dir)
+        if not failed_stages:
+            status_code = 200
+        elif any(outcomes[stage]['status'] in ('circuit_open', 'quota_exceeded') for stage in failed_stages):
+            status_code = 503
+        else:
+            status_code = 502
         
         return JSONResponse({
-            "success": True,
-            "message": "Sync completed successfully",
+            "success": not failed_stages,
+            "message": "Sync completed successfully" if not failed_stages
+                       else f"Sync finished with failed stages: {', '.join(failed_stages)}",
             "subtitle_uploaded": subtitle_uploaded,
             "video_info": {
                 "duration": video_info['duration'] if video_info else None,
                 "upload_time": video_info['upload_time'].isoformat() if video_info else None
-            }
-        })
+            },
+            "stages": outcomes,
+            "resumed_stages": checkpoints.resumed,
+            "account": account,
+            "circuit": youtube_service.breaker.state()
+        }, status_code=status_code)
         
     except Exception as e:
         return JSONResponse({
@@ -736,45 +781,105 @@ async def sync_video(video_id: int, subtitle_type: str = None):
         }, status_code=500)
 
 
+@app.post("/api/import")
+async def import_catalog(file: UploadFile = File(...), table: str = None, format: str = None):
+    """Bulk insert Work/Music/Video/Style rows from an uploaded CSV or NDJSON file
+    
+    Rows name their table in a `table` column/field (or all use ?table=). Invalid rows are reported
+    per line and skipped; the other rows are inserted in chunks of IMPORT_CHUNK_SIZE.
+    """
+    fmt = format or detect_format(file.filename or '')
+    if fmt not in ('csv', 'ndjson'):
+        return JSONResponse({"success": False, "message": f"Unsupported format: {fmt}"}, status_code=400)
+    
+    def run():
+        # The upload is spooled to a temporary file; parse it lazily from there
+        stream = io.TextIOWrapper(file.file, encoding='utf-8', newline='')
+        try:
+            return ImportService(engine, IMPORT_CHUNK_SIZE).run(iter_rows(stream, fmt), table)
+        finally:
+            stream.detach()
+    
+    try:
+        report = await asyncio.to_thread(run)
+    except Exception as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=500)
+    
+    # Core inserts bypass the ORM events that keep admin counts and picker indexes current
+    inserted_tables = [name for name, count in report['inserted'].items() if count]
+    if inserted_tables:
+        count_strategy.invalidate()
+        name_index_service.refresh(IMPORT_MODELS[name] for name in inserted_tables)
+    
+    return JSONResponse({"success": report['error_count'] == 0, **report})
+
+
+async def _iterate_in_thread(iterator: Iterator):
+    """Pull a blocking iterator with asyncio.to_thread (Starlette's own threadpool is not profiled)"""
+    done = object()
+    while (item := await asyncio.to_thread(next, iterator, done)) is not done:
+        yield item
+
+
+@app.get("/api/export")
+async def export_catalog(format: str = 'ndjson', columns: str = None,
+                         video_id: Optional[List[int]] = Query(None)):
+    """Stream the joined Video/Style/Music/Work catalog as NDJSON or CSV (one row per Style)
+    
+    ?columns=VideoID,JaTitle,JaName limits the export (and the query) to those columns;
+    ?video_id=1&video_id=2 to those videos
+    """
+    if format not in EXPORT_FORMATS:
+        return JSONResponse({"success": False, "message": f"Unsupported format: {format}"}, status_code=400)
+    try:
+        selected = ExportService.resolve_columns(columns.split(',') if columns else None)
+    except ValueError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+    
+    service = ExportService(read_db_service, EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        _iterate_in_thread(service.iter_export(format, selected, video_id)),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="catalog.{format}"'}
+    )
+
+
+@app.get("/api/dry-run")
+async def dry_run(video_id: Optional[List[int]] = Query(None), tags: str = None):
+    """Stream the payloads sync_video would send as JSONL, without calling YouTube
+    
+    ?video_id=1&video_id=2 limits the plan to those videos; without it the whole catalog is planned
+    """
+    service = DryRunService(read_db_service, subtitle_store=subtitle_store)
+    return StreamingResponse(_iterate_in_thread(service.iter_jsonl(video_id, tags)), media_type="application/x-ndjson")
+
+
 @app.post("/api/batch-sync")
 async def batch_sync(request: Request):
-    """Batch sync multiple videos"""
+    """Batch sync multiple videos
+    
+    Body: {"video_ids": [...]} or {"mode": "dirty"} to sync only videos changed since their last push;
+    "resume": true skips stages completed by a previous failed sync
+    """
     try:
         body = await request.json()
-        video_ids = body.get('video_ids', [])
+        if body.get('mode') == 'dirty':
+            video_ids = sorted(await asyncio.to_thread(db_service.get_dirty_video_ids))
+        else:
+            video_ids = body.get('video_ids', [])
         
         results = {
             'success_count': 0,
             'failed_count': 0,
+            'skipped_count': 0,
             'details': []
         }
+        async for detail in _run_batch(video_ids, resume=bool(body.get('resume'))):
+            results[_BATCH_COUNTERS[detail['status']]] += 1
+            results['details'].append(detail)
         
-        for video_id in video_ids:
-            try:
-                # Note: In production, this should be done asynchronously
-                # For now, we process sequentially
-                result = await sync_video(video_id)
-                if result.status_code == 200:
-                    results['success_count'] += 1
-                    results['details'].append({
-                        'video_id': video_id,
-                        'status': 'success'
-                    })
-                else:
-                    results['failed_count'] += 1
-                    results['details'].append({
-                        'video_id': video_id,
-                        'status': 'failed',
-                        'error': result.body.decode()
-                    })
-            except Exception as e:
-                results['failed_count'] += 1
-                results['details'].append({
-                    'video_id': video_id,
-                    'status': 'error',
-                    'error': str(e)
-                })
-        
+        results['circuit'] = accounts.service().breaker.state()
+        results['accounts'] = accounts.state()
         return JSONResponse(results)
         
     except Exception as e:
@@ -784,47 +889,259 @@ async def batch_sync(request: Request):
         }, status_code=500)
 
 
-@app.get("/")
-async def root(request: Request):
-    """Dashboard home page with statistics"""
-    session = db_service.get_session()
+@app.post("/api/batch-sync/events")
+async def start_batch_sync_events(request: Request):
+    """Start a batch sync whose progress is streamed by GET /api/batch-sync/events/{batch_id}
+    
+    Body: {"video_ids": [...]} or {"mode": "dirty"}, optional "resume": true. Returns {"batch_id", "total"};
+    the batch runs to completion even if no client follows it.
+    """
     try:
-        # Get statistics
-        video_count = session.query(Video).count()
-        video_with_link = session.query(Video).filter(Video.YouTubeLink.isnot(None)).count()
-        music_count = session.query(Music).count()
-        work_count = session.query(Work).count()
-        streaming_count = session.query(Streaming).count()
-        style_count = session.query(Style).count()
-        version_count = session.query(Version).count()
-        creator_count = session.query(Creator).count()
-        
-        # Get recent videos (last 10)
-        recent_videos = session.query(Video).order_by(Video.VideoID.desc()).limit(10).all()
+        body = await request.json()
+        if body.get('mode') == 'dirty':
+            video_ids = sorted(await asyncio.to_thread(db_service.get_dirty_video_ids))
+        else:
+            video_ids = [int(v) for v in body.get('video_ids', [])]
+    except Exception as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+    
+    batch_id, events = batch_events.create()
+    
+    async def run():
+        counts = {'success_count': 0, 'failed_count': 0, 'skipped_count': 0}
+        try:
+            await events.emit('start', {'total': len(video_ids)})
+            async for detail in _run_batch(video_ids, events.emit, bool(body.get('resume'))):
+                counts[_BATCH_COUNTERS[detail['status']]] += 1
+            await events.emit('done', {**counts, 'circuit': accounts.service().breaker.state(),
+                                       'accounts': accounts.state()})
+        except Exception as e:
+            await events.emit('error', {'message': str(e)})
+        finally:
+            await events.close()
+    
+    task = asyncio.create_task(run())
+    _batch_tasks.add(task)
+    task.add_done_callback(_batch_tasks.discard)
+    return JSONResponse({"success": True, "batch_id": batch_id, "total": len(video_ids)})
+
+
+@app.get("/api/batch-sync/events/{batch_id}")
+async def batch_sync_events(batch_id: str):
+    """Progress of a batch started with POST /api/batch-sync/events, as Server-Sent Events
+    
+    Every connection replays the batch's events from the start. Events: start {total}, video {video_id},
+    stage {video_id, stage, status, seconds}, result {video_id, status, error}, done {*_count, circuit},
+    error {message}.
+    """
+    events = batch_events.get(batch_id)
+    if events is None:
+        return JSONResponse({"success": False, "message": "Batch not found"}, status_code=404)
+    
+    async def stream():
+        async for event, data in events.follow():
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+
+@app.post("/api/jobs")
+async def enqueue_jobs(request: Request):
+    """Queue syncs for worker.py processes instead of running them in this server
+    
+    Body: {"video_ids": [...]} or {"mode": "dirty"}, optional "resume": true. Each job uses the video's
+    latest subtitle upload. Returns the job ids to poll with GET /api/jobs?id=...
+    """
+    try:
+        body = await request.json()
+        if body.get('mode') == 'dirty':
+            video_ids = sorted(await asyncio.to_thread(db_service.get_dirty_video_ids))
+        else:
+            video_ids = [int(v) for v in body.get('video_ids', [])]
         
-        stats = {
-            'video_count': video_count,
-            'video_with_link': video_with_link,
-            'music_count': music_count,
-            'work_count': work_count,
-            'streaming_count': streaming_count,
-            'style_count': style_count,
-            'version_count': version_count,
-            'creator_count': creator_count
-        }
+        def build_items():
+            return [{'VideoID': video_id, 'UploadID': subtitle_store.latest_upload(video_id),
+                     'Resume': bool(body.get('resume'))} for video_id in video_ids]
         
-        return templates.TemplateResponse("dashboard_home.html", {
-            "request": request,
-            "stats": stats,
-            "recent_videos": recent_videos
-        })
+        items = await asyncio.to_thread(build_items)
+        job_ids = await asyncio.to_thread(job_queue.enqueue, items) if items else []
+        return JSONResponse({"success": True, "job_ids": job_ids})
+    except Exception as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=500)
+
+
+@app.get("/api/jobs")
+async def list_jobs(id: Optional[List[int]] = Query(None)):
+    """Job counts by status, plus the status of the jobs given with ?id=1&id=2"""
+    counts = await asyncio.to_thread(job_queue.counts)
+    jobs = await asyncio.to_thread(job_queue.get, id) if id else []
+    return JSONResponse({"counts": counts, "jobs": jobs}, headers={"Cache-Control": "no-cache"})
+
+
+# Batch detail status -> summary counter
+_BATCH_COUNTERS = {'success': 'success_count', 'failed': 'failed_count', 'error': 'failed_count',
+                   'skipped': 'skipped_count'}
+# Running streamed batches (the event loop only keeps weak references to tasks)
+_batch_tasks = set()
+
+
+async def _run_batch(video_ids: List[int], emit: Optional[Callable[[str, Dict], Awaitable]] = None,
+                     resume: bool = False):
+    """Sync videos, yielding a detail dict per video as it finishes; `emit(event, data)` gets live progress
+    
+    Videos of one account are synced one by one; different accounts (channels) run concurrently.
+    """
+    groups = await asyncio.to_thread(accounts.group, db_service, video_ids)
+    if len(groups) <= 1:
+        for account, account_video_ids in groups.items():
+            async for detail in _run_account_batch(account, account_video_ids, emit, resume):
+                yield detail
+        return
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def drain(account: str, account_video_ids: List[int]):
+        try:
+            async for detail in _run_account_batch(account, account_video_ids, emit, resume):
+                queue.put_nowait(detail)
+        finally:
+            queue.put_nowait(None)
+    
+    tasks = [asyncio.create_task(drain(account, ids)) for account, ids in groups.items()]
+    try:
+        running = len(tasks)
+        while running:
+            detail = await queue.get()
+            if detail is None:
+                running -= 1
+            else:
+                yield detail
+        # Surface an error that ended an account's loop early
+        await asyncio.gather(*tasks)
     finally:
-        session.close()
+        for task in tasks:
+            task.cancel()
+
+
+async def _run_account_batch(account: str, video_ids: List[int],
+                             emit: Optional[Callable[[str, Dict], Awaitable]] = None, resume: bool = False):
+    """Sync one account's videos one by one, pausing or skipping while its circuit breaker is open"""
+    async def notify(event: str, data: Dict):
+        if emit:
+            await emit(event, data)
+    
+    try:
+        breaker = accounts.service(account).breaker
+    except ValueError as e:
+        for video_id in video_ids:
+            detail = {'video_id': video_id, 'account': account, 'status': 'skipped', 'error': str(e)}
+            await notify('result', detail)
+            yield detail
+        return
+    
+    for video_id in video_ids:
+        # Pause while the circuit breaker cools down; give up on long (quota) outages
+        retry_after = breaker.retry_after()
+        if 0 < retry_after <= BATCH_MAX_PAUSE_SECONDS:
+            print(f"⏸ Circuit open for {account}, pausing its batch for {retry_after:.0f}s")
+            await notify('paused', {'video_id': video_id, 'account': account, 'seconds': round(retry_after)})
+            await asyncio.sleep(retry_after)
+        elif retry_after > BATCH_MAX_PAUSE_SECONDS:
+            detail = {
+                'video_id': video_id,
+                'account': account,
+                'status': 'skipped',
+                'error': f"YouTube API circuit open, retry in {retry_after:.0f}s"
+            }
+            await notify('result', detail)
+            yield detail
+            continue
+        
+        await notify('video', {'video_id': video_id, 'account': account})
+        
+        async def progress(data: Dict, video_id=video_id):
+            await notify('stage', {'video_id': video_id, **data})
+        
+        try:
+            result = await _run_sync(video_id, progress=progress if emit else None, resume=resume, account=account)
+            if result.status_code == 200:
+                detail = {
+                    'video_id': video_id,
+                    'account': account,
+                    'status': 'success'
+                }
+            else:
+                detail = {
+                    'video_id': video_id,
+                    'account': account,
+                    'status': 'failed',
+                    'error': result.body.decode()
+                }
+        except Exception as e:
+            detail = {
+                'video_id': video_id,
+                'account': account,
+                'status': 'error',
+                'error': str(e)
+            }
+        await notify('result', detail)
+        yield detail
+
+
+@app.get("/api/accounts")
+async def list_accounts():
+    """Configured YouTube accounts with circuit-breaker state and today's quota usage"""
+    return JSONResponse({"default": accounts.default, "accounts": accounts.state()})
+
+
+@app.get("/")
+async def root(request: Request):
+    """Dashboard home page with statistics (304 / cached render while the catalog is unchanged)"""
+    def render() -> bytes:
+        session = read_db_service.get_session()
+        try:
+            # Get statistics
+            video_count = session.query(Video).count()
+            video_with_link = session.query(Video).filter(Video.YouTubeLink.isnot(None)).count()
+            music_count = session.query(Music).count()
+            work_count = session.query(Work).count()
+            streaming_count = session.query(Streaming).count()
+            style_count = session.query(Style).count()
+            version_count = session.query(Version).count()
+            creator_count = session.query(Creator).count()
+            
+            # Get recent videos (last 10)
+            recent_videos = session.query(Video).order_by(Video.VideoID.desc()).limit(10).all()
+            
+            stats = {
+                'video_count': video_count,
+                'video_with_link': video_with_link,
+                'music_count': music_count,
+                'work_count': work_count,
+                'streaming_count': streaming_count,
+                'style_count': style_count,
+                'version_count': version_count,
+                'creator_count': creator_count
+            }
+            
+            return templates.TemplateResponse("dashboard_home.html", {
+                "request": request,
+                "stats": stats,
+                "recent_videos": recent_videos
+            }).body
+        finally:
+            session.close()
+    
+    version = await asyncio.to_thread(_page_version, "dashboard_home.html")
+    return await page_cache.respond(request, "home", version, render)
 
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "database": DATABASE_URL.split("@")[1]}
+    return {"status": "healthy", "database": db_service.backend, "read_database": read_db_service.backend}
 
 
 # ============ Clone Routes ============
@@ -915,7 +1232,7 @@ async def clone_creator(creator_id: int):
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "database": DATABASE_URL.split("@")[1]}
+    return {"status": "healthy", "database": db_service.backend, "read_database": read_db_service.backend}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+"""
+Memory and throughput of the per-video metadata records over a synthetic catalog
+Compares ORM entities, dicts of projected rows (the previous format) and VideoMetadata tuples,
+all loaded from a temporary SQLite database.
+
+Usage: python -m benchmarks.bench_metadata [--rows 100000] [--runs 3]
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import summarize, save_results, print_table
+from models import Base, Video, Style, Music, Work
+from services.database_service import DatabaseService
+from services.description_service import DescriptionService
+
+
+def build_catalog(db_service: DatabaseService, rows: int):
+    """`rows` videos, one Style each, spread over rows/20 Music rows of rows/100 Works"""
+    works = max(1, rows // 100)
+    music = max(1, rows // 20)
+    start = datetime(2020, 1, 1)
+    with db_service.engine.begin() as connection:
+        connection.execute(insert(Work), [
+            {'WorkID': i, 'Type': 'Anime', 'ZhHantName': f'作品{i}', 'JaName': f'作品{i}', 'EnName': f'Work {i}'}
+            for i in range(1, works + 1)
+        ])
+        connection.execute(insert(Music), [
+            {'MusicID': i, 'WorkID': i % works + 1, 'ZhHantName': f'歌曲{i}', 'JaName': f'楽曲{i}',
+             'EnName': f'Song {i}', 'ThemeType': 'OP', 'MV': f'https://youtu.be/mv{i:07d}'}
+            for i in range(1, music + 1)
+        ])
+        for offset in range(0, rows, 10000):
+            ids = range(offset + 1, min(rows, offset + 10000) + 1)
+            connection.execute(insert(Video), [
+                {'VideoID': i, 'YouTubeLink': f'https://youtu.be/v{i:09d}', 'UploadTime': start + timedelta(hours=i),
+                 'ZhHantTitle': f'標題 {i}', 'JaTitle': f'タイトル {i}', 'EnTitle': f'Title {i}',
+                 'ZhHantDescription': '說明' * 20, 'JaDescription': '説明' * 20, 'EnDescription': 'Description ' * 10,
+                 'ZhHantSubSource': 'Source', 'EnSubSource': 'Source', 'InstrumentalType': 'Piano',
+                 'SubtitleType': 'Lyrics', 'Sheet': f'https://musescore.com/{i}', 'Length': 240}
+                for i in ids
+            ])
+            connection.execute(insert(Style), [
+                {'VideoID': i, 'MusicID': i % music + 1, 'Style': 'Piano'} for i in ids
+            ])
+
+
+def load_orm(db_service: DatabaseService):
+    """(Video, Style, Music) entities, held by the session's identity map"""
+    session = db_service.get_session()
+    query = select(Video, Style, Music)\
+        .outerjoin(Style, Style.VideoID == Video.VideoID)\
+        .outerjoin(Music, Music.MusicID == Style.MusicID)\
+        .order_by(Video.VideoID, Style.ID)
+    rows = session.execute(query).all()
+    # Keep the session open: the entities are only usable (and only cost memory) while it is
+    return rows, session
+
+
+def load_dicts(db_service: DatabaseService):
+    session = db_service.get_session()
+    try:
+        return [dict(row._mapping) for row in session.execute(DatabaseService._metadata_query())], None
+    finally:
+        session.close()
+
+
+def load_records(db_service: DatabaseService):
+    return list(db_service.iter_video_metadata()), None
+
+
+LOADERS = {'orm entities': load_orm, 'projected dicts': load_dicts, 'VideoMetadata': load_records}
+
+
+def measure_memory(loader, db_service: DatabaseService):
+    """(retained, peak) bytes allocated while loading, from tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    records, session = loader(db_service)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if session is not None:
+        session.close()
+    del records
+    return retained, peak
+
+
+def measure_time(loader, db_service: DatabaseService, runs: int):
+    samples = []
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        records, session = loader(db_service)
+        samples.append(time.perf_counter() - start)
+        if session is not None:
+            session.close()
+        del records
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_service = DatabaseService(f"sqlite:///{os.path.join(tmp, 'catalog.db')}")
+        Base.metadata.create_all(db_service.engine)
+        build_catalog(db_service, args.rows)
+
+        timings, memory = {}, {}
+        for name, loader in LOADERS.items():
+            timings[f'load {args.rows} rows: {name}'] = measure_time(loader, db_service, args.runs)
+            retained, peak = measure_memory(loader, db_service)
+            memory[name] = {
+                'retained_mb': round(retained / 2 ** 20, 1),
+                'peak_mb': round(peak / 2 ** 20, 1),
+                'bytes_per_video': round(retained / args.rows)
+            }
+
+        records = list(db_service.iter_video_metadata())
+        sample = records[:10000]
+        start = time.perf_counter()
+        for record in sample:
+            DescriptionService.build_localized_metadata(record)
+        elapsed = time.perf_counter() - start
+        db_service.engine.dispose()
+
+    print_table(timings)
+    print(f"\n{'records':<20} {'retained':>12} {'peak':>12} {'per video':>12}")
+    print("-" * 58)
+    for name, stats in memory.items():
+        print(f"{name:<20} {stats['retained_mb']:>10.1f}MB {stats['peak_mb']:>10.1f}MB "
+              f"{stats['bytes_per_video']:>10}B")
+    throughput = {
+        'rows_per_second': {name: round(args.rows / (stats['median_ms'] / 1000))
+                            for name, stats in zip(LOADERS, timings.values())},
+        'build_localized_metadata_per_second': round(len(sample) / elapsed)
+    }
+    print(f"\nbuild_localized_metadata: {throughput['build_localized_metadata_per_second']} videos/s")
+
+    path = save_results('metadata', {'rows': args.rows, 'timings': timings, 'memory': memory, 'throughput': throughput})
+    print(f"\nSaved to {path}")
+
+
+if __name__ == '__main__':
+    main()
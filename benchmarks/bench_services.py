@@ -0,0 +1,166 @@
+"""
+Micro-benchmarks of the core services, fully offline
+Description generation, tag replacement, video-id extraction, videos.list parsing and the
+per-video metadata lookup against a temporary SQLite copy of the schema in models.py.
+
+Usage: python -m benchmarks.bench_services [--rows 10000] [--tags 2000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from sqlalchemy import delete
+
+from benchmarks.bench_metadata import build_catalog
+from benchmarks.common import timeit, save_results, print_table
+from models import Base, VideoReadModel
+from services.database_service import DatabaseService
+from services.description_service import DescriptionService
+from services.tag_service import TagService
+from services.video_sync_service import VideoSyncService
+from services.youtube_service import YouTubeService
+
+LINKS = [
+    'https://youtu.be/dQw4w9WgXcQ',
+    'https://youtu.be/dQw4w9WgXcQ?si=abcdef123456',
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1234567890&index=3',
+    'dQw4w9WgXcQ',
+]
+
+
+class FakeYouTube:
+    """Just enough of the googleapiclient Resource for VideoSyncService.get_video_info"""
+
+    def __init__(self, item):
+        self.response = {'items': [item]}
+
+    def videos(self):
+        return self
+
+    def list(self, **kwargs):
+        return self
+
+    def execute(self):
+        return self.response
+
+
+def video_item(index: int, scheduled: bool) -> dict:
+    item = {
+        'contentDetails': {'duration': f'PT{index % 10}M{index % 60}S'},
+        'snippet': {'publishedAt': '2024-05-01T12:30:00Z', 'title': f'Title {index}',
+                    'description': 'Description ' * 50},
+        'status': {}
+    }
+    if scheduled:
+        item['status']['publishAt'] = '2024-06-01T04:00:00Z'
+    return item
+
+
+def bench_description(db_service: DatabaseService, repeat: int) -> dict:
+    records = list(db_service.iter_video_metadata())[:1000]
+    info_dicts = [DescriptionService.prepare_info_dict(record) for record in records]
+
+    def generate_all():
+        for info_dict in info_dicts:
+            for language in DescriptionService.LANGUAGES:
+                DescriptionService.generate(info_dict, 'piano', language)
+
+    def prepare_all():
+        for record in records:
+            DescriptionService.prepare_info_dict(record)
+
+    return {
+        f'prepare_info_dict x{len(records)}': timeit(prepare_all, repeat),
+        f'generate x{len(records)} x{len(DescriptionService.LANGUAGES)} languages': timeit(generate_all, repeat),
+    }
+
+
+def bench_tags(tmp: str, entries: int, repeat: int) -> dict:
+    rng = random.Random(0)
+    words = [f'word{i}' for i in range(entries)]
+    csv_path = os.path.join(tmp, 'tag_replacement.csv')
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        for word in words:
+            f.write(f'{word},{word.upper()}\n')
+    tag_service = TagService('offline', csv_path)
+    # A realistic video: ~30 tags, a few of them containing replaceable words
+    tags = [f'{rng.choice(words)} cover' if i % 5 == 0 else f'tag {i}' for i in range(30)]
+
+    return {
+        f'load replacement CSV ({entries} rows)': timeit(tag_service._load_replacement_dict, repeat),
+        f'replace_tags x100 (30 tags, {entries} words)': timeit(lambda: [tag_service.replace_tags(tags) for _ in range(100)], repeat),
+    }
+
+
+def bench_extractors(repeat: int) -> dict:
+    links = LINKS * 2000
+    return {
+        f'extract id x{len(links)}: {name}': timeit(lambda fn=fn: [fn(link) for link in links], repeat)
+        for name, fn in {
+            'VideoSyncService': VideoSyncService.extract_video_id_from_link,
+            'YouTubeService': YouTubeService.extract_video_id,
+            'TagService': TagService._extract_video_id,
+        }.items()
+    }
+
+
+def bench_video_info(repeat: int) -> dict:
+    items = [video_item(i, scheduled=i % 2 == 0) for i in range(1000)]
+    services = [FakeYouTube(item) for item in items]
+    return {
+        f'parse_video_info x{len(items)}': timeit(lambda: [VideoSyncService.parse_video_info(i) for i in items], repeat),
+        f'get_video_info x{len(items)} (fake client)': timeit(
+            lambda: [VideoSyncService.get_video_info(s, 'dQw4w9WgXcQ') for s in services], repeat
+        ),
+    }
+
+
+def bench_metadata_lookup(db_service: DatabaseService, rows: int, repeat: int) -> dict:
+    ids = random.Random(1).sample(range(1, rows + 1), min(200, rows))
+
+    def cold():
+        # Drop the read-model rows so every lookup rebuilds from the source tables
+        with db_service.engine.begin() as connection:
+            connection.execute(delete(VideoReadModel).where(VideoReadModel.VideoID.in_(ids)))
+        for video_id in ids:
+            db_service.get_video_metadata(video_id)
+
+    def warm():
+        for video_id in ids:
+            db_service.get_video_metadata(video_id)
+
+    return {
+        f'get_video_metadata x{len(ids)} (build read model)': timeit(cold, repeat),
+        f'get_video_metadata x{len(ids)} (read model hit)': timeit(warm, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000, help='Videos in the SQLite catalog')
+    parser.add_argument('--tags', type=int, default=2000, help='Entries in the tag replacement dictionary')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_service = DatabaseService(f"sqlite:///{os.path.join(tmp, 'catalog.db')}")
+        Base.metadata.create_all(db_service.engine)
+        build_catalog(db_service, args.rows)
+
+        results.update(bench_description(db_service, args.repeat))
+        results.update(bench_tags(tmp, args.tags, args.repeat))
+        results.update(bench_extractors(args.repeat))
+        results.update(bench_video_info(args.repeat))
+        results.update(bench_metadata_lookup(db_service, args.rows, args.repeat))
+        db_service.engine.dispose()
+
+    print_table(results)
+    path = save_results('services', {'rows': args.rows, 'tag_entries': args.tags, 'timings': results})
+    print(f"\nSaved to {path}")
+
+
+if __name__ == '__main__':
+    main()
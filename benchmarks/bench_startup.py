@@ -0,0 +1,77 @@
+"""
+Cold-start benchmark for the two entry points
+Each sample is a fresh interpreter, so module caches never help.
+
+Usage: python -m benchmarks.bench_startup [--runs 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import ROOT, summarize, save_results, print_table
+
+ENTRY_POINTS = {
+    'import app': [sys.executable, '-c', 'import app'],
+    'import cli': [sys.executable, '-c', 'import cli'],
+    'cli.py --help': [sys.executable, 'cli.py', '--help'],
+}
+
+# Importing app/cli must not need a reachable database; placeholders are enough
+PLACEHOLDER_ENV = {'DB_HOST': 'localhost', 'DB_USER': 'bench', 'DB_PASSWORD': 'bench', 'DB_NAME': 'bench'}
+
+
+def _env():
+    env = dict(os.environ)
+    for key, value in PLACEHOLDER_ENV.items():
+        env.setdefault(key, value)
+    return env
+
+
+def time_command(command, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, env=_env(), check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def slowest_imports(module: str, limit: int = 10):
+    """Direct imports of `module` with the largest cumulative time, from `python -X importtime`"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            rows.append({'module': name.strip(), 'cumulative_ms': round(int(cumulative_us) / 1000, 1)})
+    return sorted(rows, key=lambda row: -row['cumulative_ms'])[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    results = {name: time_command(command, args.runs) for name, command in ENTRY_POINTS.items()}
+    print_table(results)
+
+    for module in ('app', 'cli'):
+        results[f'slowest imports: {module}'] = slowest_imports(module)
+        print(f"\nSlowest top-level imports for {module}:")
+        for row in results[f'slowest imports: {module}']:
+            print(f"  {row['module']:<40} {row['cumulative_ms']:>8.1f}ms")
+
+    path = save_results('startup', results)
+    print(f"\nSaved to {path}")
+
+
+if __name__ == '__main__':
+    main()
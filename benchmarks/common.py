@@ -0,0 +1,69 @@
+"""
+Shared helpers for the benchmark scripts
+Results are written to benchmarks/results/<name>.json, one entry per commit, so regressions show up between commits
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def summarize(samples) -> Dict:
+    """min/median/mean/max in milliseconds"""
+    samples_ms = [s * 1000 for s in samples]
+    return {
+        'runs': len(samples_ms),
+        'min_ms': round(min(samples_ms), 3),
+        'median_ms': round(statistics.median(samples_ms), 3),
+        'mean_ms': round(statistics.mean(samples_ms), 3),
+        'max_ms': round(max(samples_ms), 3)
+    }
+
+
+def timeit(fn: Callable, repeat: int = 5, number: int = 1) -> Dict:
+    """Time `number` calls of fn, `repeat` times; reports per-call timings"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return summarize(samples)
+
+
+def save_results(name: str, results: Dict) -> Path:
+    """Append this run to benchmarks/results/<name>.json keyed by commit"""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{name}.json"
+    history = json.loads(path.read_text()) if path.exists() else []
+    history.append({
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'results': results
+    })
+    path.write_text(json.dumps(history, indent=2, ensure_ascii=False) + '\n')
+    return path
+
+
+def print_table(results: Dict[str, Dict]):
+    print(f"{'benchmark':<45} {'median':>10} {'min':>10} {'max':>10}")
+    print("-" * 78)
+    for name, stats in results.items():
+        print(f"{name:<45} {stats['median_ms']:>8.2f}ms {stats['min_ms']:>8.2f}ms {stats['max_ms']:>8.2f}ms")
@@ -0,0 +1,229 @@
+"""
+Synthetic catalog generator
+Fills Work/Music/Video/Style/Streaming/Version/Creator/Role with multilingual (ZhHant/Ja/En) rows at a
+production-like shape: several covers per song, medleys, OP/ED/IN themes, credits and streaming releases.
+Rows are appended after the current maximum IDs, so an existing database keeps its data.
+
+Usage: python -m benchmarks.generate_catalog --url sqlite:///catalog.db --videos 100000 [--seed 0]
+       (without --url DATABASE_URL, or the DB_* settings, from .env is used)
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from dotenv import load_dotenv
+from sqlalchemy import func, insert, select
+
+from models import Base, Work, Music, Video, Style, Streaming, Version, Creator, Role
+from services.database_service import DatabaseService
+
+WORK_TYPES = ['Anime', 'Anime', 'Anime', 'Game', 'Drama', 'Movie', 'Vocaloid']
+THEME_TYPES = ['OP', 'OP', 'ED', 'ED', 'IN', 'Theme']
+STYLES = ['Piano', 'Piano', 'Piano', 'Mandolin', 'Guitar', 'Violin']
+VERSIONS = ['Piano', 'Mandolin', 'Inst', 'Short']
+INSTRUMENTAL_TYPES = ['Piano', 'Piano', 'Inst', 'Mandolin']
+SUBTITLE_TYPES = ['Lyrics', 'Lyrics', 'Translation', None]
+ROLES = ['Vocal', 'Lyrics', 'Composer', 'Arranger']
+ARTIST_TYPES = ['Band', 'Solo', 'Unit', None]
+
+# Fragments combined into names; sizes chosen so names repeat about as often as real titles do
+JA_WORDS = ['君', '夢', '空', '星', '桜', '約束', '未来', '奇跡', '青春', '物語', '勇者', '花火', '光', '風', '心', '世界',
+            'ありがとう', 'さよなら', 'きらめき', '魔法', '旅', '夜明け', '恋', '永遠', '祈り', '翼', '季節', '記憶']
+ZH_WORDS = ['你', '夢想', '天空', '星星', '櫻花', '約定', '未來', '奇蹟', '青春', '故事', '勇者', '煙火', '光芒', '微風',
+            '心', '世界', '謝謝', '再見', '閃耀', '魔法', '旅程', '黎明', '戀愛', '永恆', '祈禱', '翅膀', '季節', '記憶']
+EN_WORDS = ['You', 'Dream', 'Sky', 'Star', 'Sakura', 'Promise', 'Future', 'Miracle', 'Youth', 'Story', 'Hero',
+            'Fireworks', 'Light', 'Wind', 'Heart', 'World', 'Thanks', 'Goodbye', 'Sparkle', 'Magic', 'Journey',
+            'Dawn', 'Love', 'Forever', 'Prayer', 'Wings', 'Seasons', 'Memories']
+JA_SUFFIXES = ['の歌', 'へ', 'と僕', '物語', '', '', '']
+JA_ARTISTS = ['YOASOBI', 'Aimer', 'LiSA', 'ヨルシカ', 'Ado', 'King Gnu', 'ClariS', 'RADWIMPS', 'Mrs. GREEN APPLE']
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+
+
+def _youtube_id(rng: random.Random) -> str:
+    return ''.join(rng.choice(ALPHABET) for _ in range(11))
+
+
+def _names(rng: random.Random) -> Dict[str, str]:
+    """Parallel ZhHant/Ja/En names built from the same fragments"""
+    picks = rng.sample(range(len(JA_WORDS)), rng.randint(1, 3))
+    suffix = rng.choice(JA_SUFFIXES)
+    return {
+        'ZhHantName': ''.join(ZH_WORDS[i] for i in picks),
+        'JaName': ''.join(JA_WORDS[i] for i in picks) + suffix,
+        'EnName': ' '.join(EN_WORDS[i] for i in picks),
+    }
+
+
+def _chunks(rows: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class CatalogGenerator:
+    """Deterministic (per seed) rows for every catalog table, inserted with executemany in chunks"""
+
+    def __init__(self, engine, videos: int, seed: int = 0, chunk_size: int = 5000):
+        self.engine = engine
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.counts = {
+            'Video': videos,
+            'Work': max(1, videos // 8),
+            'Music': max(1, videos // 3),
+            'Creator': max(1, videos // 10),
+            'Streaming': max(1, videos // 5),
+        }
+
+    def _offsets(self, connection) -> Dict[str, int]:
+        keys = {'Work': Work.WorkID, 'Music': Music.MusicID, 'Video': Video.VideoID,
+                'Creator': Creator.CreatorID, 'Streaming': Streaming.StreamingID}
+        return {name: connection.execute(select(func.max(key))).scalar() or 0 for name, key in keys.items()}
+
+    def _ids(self, name: str) -> range:
+        return range(self.offsets[name] + 1, self.offsets[name] + self.counts[name] + 1)
+
+    def works(self) -> Iterator[Dict]:
+        for work_id in self._ids('Work'):
+            yield {'WorkID': work_id, 'Type': self.rng.choice(WORK_TYPES), **_names(self.rng)}
+
+    def music(self) -> Iterator[Dict]:
+        works = self._ids('Work')
+        for music_id in self._ids('Music'):
+            yield {
+                'MusicID': music_id, 'WorkID': self.rng.choice(works), **_names(self.rng),
+                'ThemeType': self.rng.choice(THEME_TYPES),
+                'SpotifyID': ''.join(self.rng.choice(ALPHABET[:62]) for _ in range(22)) if self.rng.random() < 0.7 else None,
+                'MV': f"https://www.youtube.com/watch?v={_youtube_id(self.rng)}" if self.rng.random() < 0.8 else None,
+                'OfficialArtist': self.rng.choice(ARTIST_TYPES),
+            }
+
+    def videos(self) -> Iterator[Dict]:
+        start = datetime(2016, 1, 1, 18)
+        for video_id in self._ids('Video'):
+            names = _names(self.rng)
+            instrumental_type = self.rng.choice(INSTRUMENTAL_TYPES)
+            artist = self.rng.choice(JA_ARTISTS)
+            yield {
+                'VideoID': video_id,
+                'YouTubeLink': f"https://youtu.be/{_youtube_id(self.rng)}" if self.rng.random() < 0.95 else None,
+                'UploadTime': start + timedelta(hours=video_id * 7, minutes=self.rng.randint(0, 59)),
+                'ZhHantTitle': f"{names['ZhHantName']} - {artist}【鋼琴版】"[:100],
+                'JaTitle': f"{names['JaName']} / {artist}【ピアノ】"[:100],
+                'EnTitle': f"{names['EnName']} - {artist} (Piano Cover)"[:100],
+                'ZhHantDescription': f"{names['ZhHantName']}的{instrumental_type}改編。" * self.rng.randint(1, 4),
+                'JaDescription': f"{names['JaName']}を{instrumental_type}でアレンジしました。" * self.rng.randint(1, 3),
+                'EnDescription': (f"A {instrumental_type.lower()} arrangement of {names['EnName']}. " * self.rng.randint(1, 3))[:300],
+                'ZhHantSubSource': f"https://lyrics.example/zh/{video_id}" if self.rng.random() < 0.6 else None,
+                'JaSubSource': f"https://lyrics.example/ja/{video_id}" if self.rng.random() < 0.6 else None,
+                'EnSubSource': f"https://lyrics.example/en/{video_id}" if self.rng.random() < 0.6 else None,
+                'Instrumental': f"https://youtu.be/{_youtube_id(self.rng)}" if self.rng.random() < 0.3 else None,
+                'Sheet': f"https://musescore.com/user/1/scores/{video_id}" if self.rng.random() < 0.5 else None,
+                'InstrumentalType': instrumental_type,
+                'SubtitleType': self.rng.choice(SUBTITLE_TYPES),
+                'GumroadSheet': f"sheet-{video_id}" if self.rng.random() < 0.2 else None,
+                'Length': self.rng.randint(60, 420),
+            }
+
+    def styles(self) -> Iterator[Dict]:
+        music = self._ids('Music')
+        for video_id in self._ids('Video'):
+            # One song per video, medleys (2-4 songs) now and then
+            count = 1 if self.rng.random() < 0.93 else self.rng.randint(2, 4)
+            for music_id in self.rng.sample(music, min(count, len(music))):
+                yield {'VideoID': video_id, 'MusicID': music_id, 'Style': self.rng.choice(STYLES)}
+
+    def creators(self) -> Iterator[Dict]:
+        for creator_id in self._ids('Creator'):
+            name = self.rng.choice(JA_ARTISTS) if self.rng.random() < 0.1 else f"{_names(self.rng)['JaName']}{creator_id}"
+            yield {
+                'CreatorID': creator_id, 'CreatorName': name[:100],
+                'ChannelName': f"{name} Official"[:100] if self.rng.random() < 0.6 else None,
+                'ChannelLink': f"https://www.youtube.com/@creator{creator_id}" if self.rng.random() < 0.6 else None,
+            }
+
+    def roles(self) -> Iterator[Dict]:
+        creators = self._ids('Creator')
+        for music_id in self._ids('Music'):
+            for role in self.rng.sample(ROLES, self.rng.randint(1, 3)):
+                yield {'CreatorID': self.rng.choice(creators), 'MusicID': music_id, 'Role': role}
+
+    def streamings(self) -> Iterator[Dict]:
+        for streaming_id in self._ids('Streaming'):
+            names = _names(self.rng)
+            yield {
+                'StreamingID': streaming_id,
+                'EnTitle': f"{names['EnName']} (Piano Ver.)", 'JaTitle': f"{names['JaName']} (Piano Ver.)",
+                'ZhHantTitle': f"{names['ZhHantName']}（鋼琴版）", 'ZhHansTitle': f"{names['ZhHantName']}（钢琴版）",
+                'InstrumentalType': self.rng.choice(INSTRUMENTAL_TYPES),
+                'SmartLink': f"https://linkco.re/{_youtube_id(self.rng)}",
+            }
+
+    def versions(self) -> Iterator[Dict]:
+        music = self._ids('Music')
+        for streaming_id in self._ids('Streaming'):
+            for music_id in self.rng.sample(music, min(self.rng.randint(1, 2), len(music))):
+                yield {'StreamingID': streaming_id, 'MusicID': music_id, 'Version': self.rng.choice(VERSIONS)}
+
+    def run(self) -> Dict[str, int]:
+        """Insert everything, parents first; returns {table: rows inserted}"""
+        Base.metadata.create_all(self.engine, tables=[
+            table.__table__ for table in (Work, Music, Video, Style, Streaming, Version, Creator, Role)
+        ])
+        with self.engine.connect() as connection:
+            self.offsets = self._offsets(connection)
+
+        inserted = {}
+        for model, rows in ((Work, self.works()), (Music, self.music()), (Video, self.videos()),
+                            (Style, self.styles()), (Creator, self.creators()), (Role, self.roles()),
+                            (Streaming, self.streamings()), (Version, self.versions())):
+            start = time.perf_counter()
+            total = 0
+            for chunk in _chunks(rows, self.chunk_size):
+                with self.engine.begin() as connection:
+                    connection.execute(insert(model), chunk)
+                total += len(chunk)
+            inserted[model.__tablename__] = total
+            print(f"✓ {model.__tablename__}: {total} rows in {time.perf_counter() - start:.1f}s")
+        return inserted
+
+
+def default_url() -> str:
+    load_dotenv()
+    return os.getenv('DATABASE_URL') or (
+        f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:"
+        f"{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME')}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='SQLAlchemy URL of the target database (default: DATABASE_URL / DB_* from .env)')
+    parser.add_argument('--videos', type=int, default=100000,
+                        help='Videos to add; Work/Music/Creator/Streaming counts scale with it')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per INSERT transaction')
+    parser.add_argument('--skip-read-model', action='store_true', help='Do not rebuild VideoReadModel afterwards')
+    args = parser.parse_args()
+
+    db_service = DatabaseService(args.url or default_url())
+    start = time.perf_counter()
+    inserted = CatalogGenerator(db_service.engine, args.videos, args.seed, args.chunk_size).run()
+    if not args.skip_read_model:
+        # Rows were inserted without the ORM, so the read model has not seen them
+        db_service.ensure_support_tables()
+        print(f"✓ VideoReadModel: {db_service.rebuild_read_model()} videos")
+    print(f"✓ {sum(inserted.values())} rows in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+HTTP load test for the dashboard
+Concurrent keep-alive clients request the routes round-robin against a running server and report
+latency percentiles per route. Start the app on a generated catalog first (benchmarks.generate_catalog).
+
+Usage: python -m benchmarks.load_test [--base-url http://localhost:8000] [--clients 8] [--duration 30]
+                                      [--route / --route /video ...]
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from benchmarks.common import save_results
+
+DEFAULT_ROUTES = [
+    '/', '/video', '/admin/video/list', '/admin/music/list', '/admin/work/list',
+    '/admin/style/list', '/admin/role/list', '/admin/creator/list', '/health',
+]
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    index = min(len(sorted_samples) - 1, max(0, int(round(fraction * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[index]
+
+
+def summarize_route(samples: List[float], errors: int, elapsed: float) -> Dict:
+    """Request count, throughput and latency percentiles in milliseconds"""
+    samples_ms = sorted(s * 1000 for s in samples)
+    stats = {'requests': len(samples_ms), 'errors': errors, 'rps': round(len(samples_ms) / elapsed, 1)}
+    if samples_ms:
+        stats.update({
+            'p50_ms': round(percentile(samples_ms, 0.50), 2),
+            'p90_ms': round(percentile(samples_ms, 0.90), 2),
+            'p95_ms': round(percentile(samples_ms, 0.95), 2),
+            'p99_ms': round(percentile(samples_ms, 0.99), 2),
+            'max_ms': round(samples_ms[-1], 2),
+            'mean_ms': round(statistics.mean(samples_ms), 2),
+        })
+    return stats
+
+
+class LoadTest:
+    """`clients` threads, each with one keep-alive connection, cycling through the routes"""
+
+    def __init__(self, base_url: str, routes: List[str], clients: int, duration: float, warmup: float = 0,
+                 headers: Dict[str, str] = None):
+        parts = urlsplit(base_url)
+        self.scheme, self.netloc = parts.scheme or 'http', parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.routes = routes
+        self.clients = clients
+        self.duration = duration
+        self.warmup = warmup
+        self.headers = {'Accept-Encoding': 'identity', **(headers or {})}
+        self.samples: Dict[str, List[float]] = {route: [] for route in routes}
+        self.errors: Dict[str, int] = {route: 0 for route in routes}
+        self.status_codes: Dict[str, Dict[int, int]] = {route: {} for route in routes}
+        self._lock = threading.Lock()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return cls(self.netloc, timeout=60)
+
+    def _request(self, connection, route: str):
+        """(status, seconds) of one request, body fully read"""
+        start = time.perf_counter()
+        connection.request('GET', self.prefix + route, headers=self.headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - start
+
+    def _client(self, index: int, measure_from: float, stop_at: float):
+        connection = self._connection()
+        # Stagger the starting route so clients do not all hit the same page at once
+        position = index
+        try:
+            while time.perf_counter() < stop_at:
+                route = self.routes[position % len(self.routes)]
+                position += 1
+                try:
+                    status, seconds = self._request(connection, route)
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = self._connection()
+                    status, seconds = None, None
+                if time.perf_counter() < measure_from:
+                    continue
+                with self._lock:
+                    codes = self.status_codes[route]
+                    codes[status] = codes.get(status, 0) + 1
+                    if status is None or status >= 400:
+                        self.errors[route] += 1
+                    else:
+                        self.samples[route].append(seconds)
+        finally:
+            connection.close()
+
+    def run(self) -> Dict[str, Dict]:
+        start = time.perf_counter()
+        measure_from = start + self.warmup
+        stop_at = measure_from + self.duration
+        threads = [threading.Thread(target=self._client, args=(i, measure_from, stop_at), daemon=True)
+                   for i in range(self.clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = max(time.perf_counter() - measure_from, 1e-9)
+
+        results = {route: summarize_route(self.samples[route], self.errors[route], elapsed) for route in self.routes}
+        for route, stats in results.items():
+            stats['status_codes'] = {str(code): count for code, count in self.status_codes[route].items()}
+        return results
+
+
+def print_report(results: Dict[str, Dict]):
+    print(f"{'route':<24} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>9} {'p90':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    print("-" * 97)
+    for route, stats in results.items():
+        if not stats['requests']:
+            print(f"{route:<24} {0:>7} {stats['errors']:>5} {'-':>8}  (no successful requests: {stats['status_codes']})")
+            continue
+        print(f"{route:<24} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+              + " ".join(f"{stats[key]:>7.1f}ms" for key in ('p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--route', action='append', dest='routes',
+                        help=f"Route to request, repeatable (default: {' '.join(DEFAULT_ROUTES)})")
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+    parser.add_argument('--warmup', type=float, default=3, help='Seconds of unmeasured requests first')
+    parser.add_argument('--header', action='append', default=[], metavar='NAME:VALUE',
+                        help='Extra request header, e.g. --header "Accept-Encoding: gzip"')
+    args = parser.parse_args()
+
+    headers = dict(header.split(':', 1) for header in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    routes = args.routes or DEFAULT_ROUTES
+    print(f"🔥 {args.clients} clients x {args.duration:.0f}s against {args.base_url} ({len(routes)} routes)")
+    results = LoadTest(args.base_url, routes, args.clients, args.duration, args.warmup, headers).run()
+    print_report(results)
+
+    path = save_results('load_test', {
+        'base_url': args.base_url, 'clients': args.clients, 'duration_s': args.duration,
+        'headers': headers, 'routes': results
+    })
+    print(f"\nSaved to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,20 @@ CLI Interface - Command Line Tool
 Uses the refactored services for YouTube metadata management
 """
 import os
+import sys
+import time
+import argparse
 from dotenv import load_dotenv
 
+# Only lightweight services are imported up front; SQLAlchemy and the Google client
+# libraries load on first use so prompts and --help appear immediately.
 from services.youtube_service import YouTubeService
-from services.database_service import DatabaseService
+from services.account_service import AccountPool
+from services.snapshot_service import SnapshotStore
 from services.description_service import DescriptionService
 from services.tag_service import TagService
+from services.video_sync_service import VideoSyncService
+from services.profiling_service import ProfilingService, PROFILE_MODES
 
 # Load environment variables
 load_dotenv()
@@ -25,26 +33,62 @@ DB_HOST = os.getenv('DB_HOST')
 DB_PORT = os.getenv('DB_PORT', '3306')
 DB_NAME = os.getenv('DB_NAME')
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Any SQLAlchemy URL (e.g. sqlite:///catalog.db); defaults to MariaDB from the DB_* settings
+DATABASE_URL = os.getenv('DATABASE_URL') or f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Replica or SQLite snapshot for read-only commands (dry-run)
+DATABASE_READ_URL = os.getenv('DATABASE_READ_URL')
 
+PROFILES_DIR = os.getenv('PROFILES_DIR', 'profiles')
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshots')
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))
+YOUTUBE_ACCOUNTS_FILE = os.getenv('YOUTUBE_ACCOUNTS_FILE', 'accounts.json')
+QUOTA_DIR = os.getenv('QUOTA_DIR', 'quota')
+YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '1000'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_STALE_SECONDS = float(os.getenv('JOB_STALE_SECONDS', '120'))
 
-def main():
+
+def get_accounts():
+    """YouTube accounts from YOUTUBE_ACCOUNTS_FILE, reading through the on-disk video snapshot cache"""
+    return AccountPool.from_config(YOUTUBE_ACCOUNTS_FILE, CLIENT_SECRETS_FILE, SnapshotStore(SNAPSHOT_DIR),
+                                   QUOTA_DIR, YOUTUBE_DAILY_QUOTA)
+
+
+def get_db_service():
+    """Create the DatabaseService, importing SQLAlchemy and the models on first use"""
+    from services.database_service import DatabaseService
+    return DatabaseService(DATABASE_URL)
+
+
+def get_read_db_service():
+    """DatabaseService on DATABASE_READ_URL when set (read-only), else the primary"""
+    from services.database_service import DatabaseService
+    return DatabaseService(DATABASE_READ_URL, read_only=True) if DATABASE_READ_URL else get_db_service()
+
+
+def main(resume: bool = False):
     """Main CLI execution"""
+    from services.checkpoint_service import SyncCheckpoints, file_hash
+    
     print("=" * 60)
     print("YouTube Metadata Manager - CLI")
     print("=" * 60)
     
     # Initialize services
-    youtube_service = YouTubeService(CLIENT_SECRETS_FILE)
-    db_service = DatabaseService(DATABASE_URL)
-    tag_service = TagService(API_KEY, TAG_REPLACEMENT_CSV)
+    accounts = get_accounts()
+    tag_service = TagService(API_KEY, TAG_REPLACEMENT_CSV, caller=accounts.service().caller)
     
     # Get inputs
     video_link = input("\n📹 Input uploaded video link: ")
     db_video_id = int(input("🔢 Input VideoID from database: "))
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
     
-    # Authenticate
-    print("\n[1/6] 🔐 Authenticating with YouTube...")
+    # Authenticate with the video's account
+    account = accounts.route(db_service, [db_video_id])[db_video_id]
+    youtube_service = accounts.service(account)
+    print(f"\n[1/6] 🔐 Authenticating with YouTube ({account})...")
     youtube_service.authenticate()
     print("✓ Authentication successful")
     
@@ -58,46 +102,40 @@ def main():
     if not video_data:
         print("✗ Failed to fetch video metadata")
         return
-    print(f"✓ Metadata fetched: {video_data.get('ZhHantTitle', 'N/A')}")
+    print(f"✓ Metadata fetched: {video_data.ZhHantTitle or 'N/A'}")
+    dirty_marker = db_service.get_dirty_video_ids([db_video_id]).get(db_video_id)
+    checkpoints = SyncCheckpoints(db_service, db_video_id, resume)
+    youtube_service.reset_outcomes()
     
     # Upload subtitles
     print("\n[3/6] 📄 Uploading subtitles...")
-    subtitle_names = {
-        'Lyrics': {'ja': "歌詞", "en": "English Lyrics Translation", "zh-Hant": "中文歌詞翻譯"},
-        'BloggerTalk': {'ja': "僕の心の話", "en": "My heartfelt story", "zh-Hant": "我心裡的話"}
-    }
-    
-    name = subtitle_names.get(video_data['SubtitleType'], subtitle_names['Lyrics'])
+    name = DescriptionService.subtitle_names(video_data.SubtitleType)
     
     for language_code in ['ja', 'en', 'zh-Hant']:
         subtitle_file = f"{language_code}_subtitle.srt"
         subtitle_path = os.path.join(SUBTITLES_FOLDER_PATH, subtitle_file)
         if os.path.exists(subtitle_path):
-            youtube_service.upload_subtitle(yt_video_id, language_code, subtitle_path, name[language_code])
+            checkpoint = (f"subtitle:{language_code}", [file_hash(subtitle_path), name[language_code]])
+            if not checkpoints.is_done(*checkpoint) and \
+                    youtube_service.upload_subtitle(yt_video_id, language_code, subtitle_path, name[language_code]):
+                checkpoints.complete(*checkpoint)
         else:
             print(f"⚠ Subtitle file not found: {subtitle_path}")
     
     # Generate descriptions
     print("\n[4/6] 📝 Generating descriptions...")
-    info_dict = DescriptionService.prepare_info_dict(video_data)
-    inst_type = "instrumental" if video_data['InstrumentalType'] == 'Inst' else "piano"
+    localized_metadata = DescriptionService.build_localized_metadata(video_data)
     
     # Update titles and descriptions
     print("\n[5/6] 🔄 Updating titles and descriptions...")
-    languages = ['ja', 'en', 'zh-Hant']
-    language_map = {'ja': 'JaTitle', 'en': 'EnTitle', 'zh-Hant': 'ZhHantTitle'}
-    
-    localized_metadata = {}
-    for language_code in languages:
-        title = video_data[language_map[language_code]]
-        description = DescriptionService.generate(info_dict, inst_type, language=language_code)
-        localized_metadata[language_code] = {"title": title, "description": description}
-        
+    for language_code, metadata in localized_metadata.items():
         print(f"\n{language_code} Description Preview:")
         print("-" * 40)
-        print(description[:200] + "...")
+        print(metadata["description"][:200] + "...")
     
-    youtube_service.update_video_metadata(yt_video_id, localized_metadata, 10)
+    metadata_done = checkpoints.push_metadata(youtube_service, yt_video_id, localized_metadata, 10)
+    if metadata_done and dirty_marker:
+        db_service.clear_dirty(db_video_id, dirty_marker)
     
     # Update tags
     print("\n[6/6] 🏷️ Updating tags...")
@@ -106,17 +144,438 @@ def main():
     if reference_video:
         tag_string = tag_service.grab_tags(reference_video)
         if tag_string:
-            youtube_service.update_tags(yt_video_id, tag_string)
+            if not checkpoints.is_done('tags', tag_string) and youtube_service.update_tags(yt_video_id, tag_string):
+                checkpoints.complete('tags', tag_string)
             print(f"✓ Tags: {tag_string[:100]}...")
         else:
             print("⚠ No tags found")
     else:
         print("⊘ Skipped tag update")
     
+    failed_stages = [stage for stage, outcome in youtube_service.outcomes.items()
+                     if outcome and outcome['status'] != 'ok']
     print("\n" + "=" * 60)
-    print("✅ All tasks completed successfully!")
+    if failed_stages:
+        print(f"⚠ Failed stages: {', '.join(failed_stages)}")
+        print("  Run again with --resume to skip the stages that already succeeded")
+    else:
+        checkpoints.finish()
+        print("✅ All tasks completed successfully!")
+    print("=" * 60)
+
+
+def sync_dirty(resume: bool = False):
+    """Push titles/descriptions for every video changed since its last sync"""
+    from services.checkpoint_service import SyncCheckpoints
+    
+    print("=" * 60)
+    print("YouTube Metadata Manager - Sync Dirty Videos")
+    print("=" * 60)
+    
+    accounts = get_accounts()
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    
+    dirty = db_service.get_dirty_video_ids()
+    if not dirty:
+        print("\n✓ Nothing to sync, all videos are up to date")
+        return
+    print(f"\n📦 {len(dirty)} changed video(s): {', '.join(str(v) for v in sorted(dirty))}")
+    
+    synced, failed = 0, 0
+    for account, video_ids in accounts.group(db_service, sorted(dirty)).items():
+        try:
+            youtube_service = accounts.service(account)
+        except ValueError as e:
+            print(f"\n✗ {e}, skipping {len(video_ids)} video(s)")
+            failed += len(video_ids)
+            continue
+        print(f"\n🔐 Authenticating with YouTube ({account}, {len(video_ids)} video(s))...")
+        youtube_service.authenticate()
+        
+        for position, db_video_id in enumerate(video_ids):
+            if youtube_service.breaker.is_open:
+                print(f"\n⛔ {account}: YouTube API circuit open, skipping its remaining videos "
+                      f"({youtube_service.breaker.retry_after():.0f}s cooldown)")
+                failed += len(video_ids) - position
+                break
+            
+            video_data = db_service.get_video_metadata(db_video_id)
+            if not video_data or not video_data.YouTubeLink:
+                print(f"\n⚠ VideoID {db_video_id}: no metadata or YouTube link, skipped")
+                failed += 1
+                continue
+            
+            yt_video_id = VideoSyncService.extract_video_id_from_link(video_data.YouTubeLink)
+            print(f"\n🔄 VideoID {db_video_id} → {yt_video_id}")
+            localized_metadata = DescriptionService.build_localized_metadata(video_data)
+            checkpoints = SyncCheckpoints(db_service, db_video_id, resume)
+            youtube_service.reset_outcomes()
+            if not checkpoints.push_metadata(youtube_service, yt_video_id, localized_metadata, 10):
+                failed += 1
+                continue
+            
+            video_info = youtube_service.get_video_info(yt_video_id)
+            if video_info:
+                db_service.update_video(db_video_id, {
+                    'Length': video_info['duration'],
+                    'UploadTime': video_info['upload_time']
+                })
+            db_service.clear_dirty(db_video_id, dirty[db_video_id])
+            checkpoints.finish()
+            synced += 1
+    
+    print("\n" + "=" * 60)
+    print(f"✅ Synced: {synced}, Failed: {failed}")
+    print("=" * 60)
+
+
+def batch(manifest_path: str, workers: int, resume: bool = False):
+    """Sync every row of a CSV/JSON manifest on a worker pool and print per-item timings"""
+    from services.batch_service import BatchService, load_manifest
+    
+    print("=" * 60)
+    print("YouTube Metadata Manager - Batch Sync")
+    print("=" * 60)
+    
+    items = load_manifest(manifest_path)
+    if not items:
+        print("\n✓ Manifest is empty, nothing to sync")
+        return
+    print(f"\n📦 {len(items)} video(s) from {manifest_path}, {workers} worker(s) per account")
+    
+    accounts = get_accounts()
+    tag_service = TagService(API_KEY, TAG_REPLACEMENT_CSV, caller=accounts.service().caller)
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    
+    print("\n🔐 Authenticating with YouTube...")
+    start = time.perf_counter()
+    results = BatchService(accounts, tag_service, db_service, workers, resume).run(items)
+    print_batch_summary(results, time.perf_counter() - start)
+
+
+def print_batch_summary(results, elapsed: float):
+    """Per-item status and stage timings (seconds) as a plain-text table"""
+    stages = ['load', 'subtitles', 'metadata', 'tags', 'video_info', 'db_write']
+    header = f"{'VideoID':>8}  {'YouTube ID':<12}  {'Account':<10}  {'Status':<8}" + ''.join(f"  {s:>10}" for s in stages) + f"  {'total':>8}"
+    
+    print("\n" + "=" * len(header))
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        timings = ''.join(
+            f"  {result['timings'][s]:>10.2f}" if s in result['timings'] else f"  {'-':>10}" for s in stages
+        )
+        print(f"{result['VideoID']:>8}  {result['YouTubeID'] or '-':<12}  {result['account']:<10}  {result['status']:<8}{timings}  {result['total']:>8.2f}")
+    print("=" * len(header))
+    
+    for result in results:
+        if result['error']:
+            print(f"✗ VideoID {result['VideoID']}: {result['error']}")
+    
+    resumed = sum(len(r.get('resumed', [])) for r in results)
+    if resumed:
+        print(f"⏭ {resumed} stage(s) already done in a previous run were skipped")
+    
+    counts = {status: sum(1 for r in results if r['status'] == status) for status in ('success', 'failed', 'skipped')}
+    print(f"\n✅ Synced: {counts['success']}, Failed: {counts['failed']}, Skipped: {counts['skipped']} "
+          f"in {elapsed:.1f}s")
+
+
+def bulk_tags(manifest_path: str):
+    """Add tags to every video of a manifest with the fewest list/update calls"""
+    from services.batch_service import load_manifest
+    
+    print("=" * 60)
+    print("YouTube Metadata Manager - Bulk Tags")
+    print("=" * 60)
+    
+    items = [item for item in load_manifest(manifest_path) if item['Tags'] or item['TagReference']]
+    if not items:
+        print("\n✓ No rows with Tags or TagReference, nothing to do")
+        return
+    
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    # Rows without a YouTubeLink use the link stored in the database
+    links = {item['VideoID']: item['YouTubeLink'] for item in items}
+    missing = [video_id for video_id, link in links.items() if not link]
+    if missing:
+        for video_data in db_service.iter_video_metadata(missing):
+            links[video_data.VideoID] = video_data.YouTubeLink
+    
+    accounts = get_accounts()
+    routes = accounts.route(db_service, links)
+    tag_service = TagService(API_KEY, TAG_REPLACEMENT_CSV, caller=accounts.service().caller)
+    references = tag_service.grab_tags_bulk([item['TagReference'] for item in items if item['TagReference'] and not item['Tags']])
+    
+    tags_by_video, results = {}, {}
+    for item in items:
+        yt_video_id = VideoSyncService.extract_video_id_from_link(links.get(item['VideoID']))
+        if not yt_video_id:
+            results[item['VideoID']] = 'no_link'
+            continue
+        if item['Tags']:
+            new_tags = tag_service.replace_tags([tag.strip() for tag in item['Tags'].split(',')])
+        else:
+            new_tags = references.get(item['TagReference'], [])
+        if not new_tags:
+            results[item['VideoID']] = 'no_tags'
+            continue
+        tags_by_video.setdefault(routes[item['VideoID']], {}).setdefault(yt_video_id, []).extend(new_tags)
+        results[item['VideoID']] = yt_video_id
+    
+    outcomes = {}
+    for account, account_tags in tags_by_video.items():
+        print(f"\n🏷️ Tagging {len(account_tags)} video(s) with {account}...")
+        try:
+            youtube_service = accounts.service(account)
+        except ValueError as e:
+            print(f"✗ {e}")
+            outcomes.update({video_id: 'failed' for video_id in account_tags})
+            continue
+        youtube_service.authenticate()
+        outcomes.update(youtube_service.bulk_update_tags(account_tags))
+    
+    print()
+    for video_id, result in results.items():
+        status = outcomes.get(result, result)
+        print(f"{video_id:>8}  {result if result in outcomes else '-':<12}  {status}")
+    counts = {}
+    for result in results.values():
+        status = outcomes.get(result, result)
+        counts[status] = counts.get(status, 0) + 1
+    print("\n✅ " + ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+
+
+def dry_run(video_ids, output: str, tag_string: str = None, subtitle_dir: str = None):
+    """Write the payloads a sync would send as JSONL, without calling YouTube"""
+    from services.dry_run_service import DryRunService
+    
+    db_service = get_read_db_service()
+    tag_service = TagService(API_KEY, TAG_REPLACEMENT_CSV) if TAG_REPLACEMENT_CSV else None
+    service = DryRunService(db_service, tag_service, subtitle_dir or SUBTITLES_FOLDER_PATH or '.')
+    
+    start = time.perf_counter()
+    if output == '-':
+        count = service.write_jsonl(sys.stdout, video_ids, tag_string)
+    else:
+        with open(output, 'w', encoding='utf-8') as out:
+            count = service.write_jsonl(out, video_ids, tag_string)
+    print(f"✓ {count} plan(s) written to {output} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+def import_catalog(path: str, table: str = None, fmt: str = None, chunk_size: int = IMPORT_CHUNK_SIZE):
+    """Bulk insert Work/Music/Video/Style rows from a CSV or NDJSON file"""
+    from services.import_service import ImportService, iter_rows, detect_format
+    
+    print("=" * 60)
+    print("YouTube Metadata Manager - Import")
     print("=" * 60)
+    
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    fmt = fmt or detect_format(path)
+    
+    start = time.perf_counter()
+    with open(path, newline='', encoding='utf-8') as f:
+        report = ImportService(db_service.engine, chunk_size).run(iter_rows(f, fmt), table)
+    
+    for error in report['errors']:
+        print(f"✗ Line {error['line']} ({error['table'] or '-'}): {error['error']}")
+    if report['error_count'] > len(report['errors']):
+        print(f"  ... {report['error_count'] - len(report['errors'])} more error(s)")
+    inserted = ", ".join(f"{name}: {count}" for name, count in report['inserted'].items() if count)
+    print(f"\n✅ {report['rows']} row(s) read, inserted {inserted or 'nothing'}, "
+          f"{report['error_count']} error(s) in {time.perf_counter() - start:.1f}s")
+
+
+def enqueue(video_ids, manifest_path: str = None, dirty: bool = False, resume: bool = False):
+    """Queue sync jobs for worker.py processes instead of syncing in this process"""
+    from services.batch_service import load_manifest
+    from services.job_queue_service import JobQueue
+    
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    items = [{'VideoID': video_id} for video_id in video_ids or []]
+    if manifest_path:
+        items += load_manifest(manifest_path)
+    if dirty:
+        items += [{'VideoID': video_id} for video_id in sorted(db_service.get_dirty_video_ids())]
+    if not items:
+        print("✓ Nothing to queue")
+        return
+    if resume:
+        for item in items:
+            item['Resume'] = True
+    
+    job_ids = JobQueue(db_service.engine, JOB_MAX_ATTEMPTS, JOB_STALE_SECONDS).enqueue(items)
+    print(f"✓ {len(items)} video(s) queued as job(s) {min(job_ids)}-{max(job_ids)}; run `python worker.py` to process them")
+
+
+def show_jobs():
+    """Sync job counts by status (requeueing jobs of workers that stopped sending heartbeats)"""
+    from services.job_queue_service import JobQueue
+    
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    queue = JobQueue(db_service.engine, JOB_MAX_ATTEMPTS, JOB_STALE_SECONDS)
+    queue.requeue_stale()
+    print("  ".join(f"{status}: {count}" for status, count in queue.counts().items()))
+
+
+def list_accounts():
+    """Configured YouTube accounts with today's quota usage and their number of assigned videos"""
+    from sqlalchemy import func, select
+    from models import VideoAccount
+    
+    accounts = get_accounts()
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    session = db_service.get_session()
+    try:
+        assigned = dict(session.execute(
+            select(VideoAccount.Account, func.count()).group_by(VideoAccount.Account)
+        ).all())
+    finally:
+        session.close()
+    
+    print(f"{'Account':<20} {'Videos':>8} {'Quota used':>12} {'Remaining':>10}")
+    print("-" * 53)
+    for state in accounts.state():
+        name = state['name']
+        videos = f"{assigned.pop(name, 0)}{' +' if name == accounts.default else ''}"
+        print(f"{name:<20} {videos:>8} {state['quota']['used']:>12} {state['quota']['remaining']:>10}")
+    print(f"\n'+' = also syncs every unassigned video (default account: {accounts.default})")
+    for name, count in assigned.items():
+        print(f"⚠ {count} video(s) assigned to unknown account {name!r}")
+
+
+def assign_account(account: str, video_ids):
+    """Route videos to a YouTube account (the default account removes their assignment)"""
+    accounts = get_accounts()
+    if account not in accounts.names:
+        print(f"✗ Unknown account {account!r}, configured: {', '.join(accounts.names)}")
+        return
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    db_service.set_video_account(video_ids, None if account == accounts.default else account)
+    print(f"✓ {len(video_ids)} video(s) assigned to {account}")
+
+
+def rebuild_read_model():
+    """Rebuild every video's VideoReadModel row (after SQL edits made outside the app)"""
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    start = time.perf_counter()
+    count = db_service.rebuild_read_model()
+    print(f"✓ Read model rebuilt for {count} video(s) in {time.perf_counter() - start:.1f}s")
+
+
+def snapshot_db(path: str):
+    """Copy the catalog from DATABASE_URL into a SQLite file for DATABASE_READ_URL"""
+    db_service = get_db_service()
+    db_service.ensure_support_tables()
+    start = time.perf_counter()
+    counts = db_service.snapshot_to_sqlite(path)
+    print("\n".join(f"  {table:<16} {count:>9} rows" for table, count in counts.items()))
+    print(f"✓ Snapshot of {db_service.backend} written to {path} in {time.perf_counter() - start:.1f}s")
+    print(f"  Serve dashboard reads from it with DATABASE_READ_URL=sqlite:///{os.path.abspath(path)}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="YouTube Metadata Manager CLI")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=PROFILE_MODES,
+                        help=f"Profile the run and save the dump under {PROFILES_DIR}/")
+    resume_help = "Skip YouTube writes (subtitles, metadata, tags) a previous failed sync already completed"
+    parser.add_argument("--resume", action="store_true", help=resume_help)
+    # Accepted after the sync commands too (cli.py batch m.csv --resume); SUPPRESS keeps a --resume
+    # given before the command from being reset by the subcommand's default
+    resume_parser = argparse.ArgumentParser(add_help=False)
+    resume_parser.add_argument("--resume", action="store_true", default=argparse.SUPPRESS, help=resume_help)
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("sync", parents=[resume_parser], help="Interactive sync of a single video (default)")
+    subparsers.add_parser("sync-dirty", parents=[resume_parser], help="Sync only videos changed since their last push")
+    batch_parser = subparsers.add_parser(
+        "batch", parents=[resume_parser],
+        help="Sync videos listed in a CSV/JSON manifest (VideoID, YouTubeLink, SubtitleFolder, TagReference)"
+    )
+    batch_parser.add_argument("manifest", help="Path to a .csv (with header row) or .json manifest")
+    batch_parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                              help=f"Videos synced in parallel (default {BATCH_WORKERS})")
+    tags_parser = subparsers.add_parser(
+        "tags", help="Add tags to every video of a CSV/JSON manifest (VideoID, YouTubeLink, TagReference or Tags)"
+    )
+    tags_parser.add_argument("manifest", help="Path to a .csv (with header row) or .json manifest")
+    dry_run_parser = subparsers.add_parser(
+        "dry-run", help="Write the snippet/localizations/tags/captions a sync would send as JSONL (no API calls)"
+    )
+    dry_run_parser.add_argument("video_ids", nargs="*", type=int, help="VideoIDs to plan (default: whole catalog)")
+    dry_run_parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    dry_run_parser.add_argument("--tags", help="Comma-separated tags to plan, after tag replacement")
+    dry_run_parser.add_argument("--subtitle-dir",
+                                help="Folder with <lang>_subtitle.srt; may contain {video_id} "
+                                     "(default: SUBTITLES_FOLDER_PATH)")
+    enqueue_parser = subparsers.add_parser("enqueue", parents=[resume_parser], help="Queue sync jobs for worker.py processes")
+    enqueue_parser.add_argument("video_ids", nargs="*", type=int, help="VideoIDs to sync")
+    enqueue_parser.add_argument("--manifest", help="Also queue the rows of a CSV/JSON batch manifest")
+    enqueue_parser.add_argument("--dirty", action="store_true", help="Also queue every video changed since its last sync")
+    subparsers.add_parser("jobs", help="Show sync job counts by status")
+    subparsers.add_parser("accounts", help="List YouTube accounts with today's quota usage")
+    assign_parser = subparsers.add_parser("assign-account", help="Sync videos with a given YouTube account")
+    assign_parser.add_argument("account", help="Account name from YOUTUBE_ACCOUNTS_FILE")
+    assign_parser.add_argument("video_ids", nargs="+", type=int, help="VideoIDs to assign")
+    subparsers.add_parser("rebuild-read-model",
+                          help="Rebuild the denormalized video metadata table from the source tables")
+    snapshot_parser = subparsers.add_parser(
+        "snapshot-db", help="Copy the catalog into a local SQLite file for read-only traffic (DATABASE_READ_URL)"
+    )
+    snapshot_parser.add_argument("path", nargs="?", default="catalog-snapshot.db", help="Default: catalog-snapshot.db")
+    import_parser = subparsers.add_parser(
+        "import", help="Bulk insert Work/Music/Video/Style rows from a CSV or NDJSON file"
+    )
+    import_parser.add_argument("file", help="Rows with a `table` column/field, or all of --table")
+    import_parser.add_argument("--table", choices=["Work", "Music", "Video", "Style"],
+                               help="Table of rows without a `table` field")
+    import_parser.add_argument("--format", choices=["csv", "ndjson"], help="Default: from the file extension")
+    import_parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE,
+                               help=f"Rows per transaction (default {IMPORT_CHUNK_SIZE})")
+    return parser.parse_args()
+
+
+def run(args):
+    if args.command == "sync-dirty":
+        sync_dirty(args.resume)
+    elif args.command == "batch":
+        batch(args.manifest, args.workers, args.resume)
+    elif args.command == "tags":
+        bulk_tags(args.manifest)
+    elif args.command == "dry-run":
+        dry_run(args.video_ids or None, args.output, args.tags, args.subtitle_dir)
+    elif args.command == "enqueue":
+        enqueue(args.video_ids, args.manifest, args.dirty, args.resume)
+    elif args.command == "jobs":
+        show_jobs()
+    elif args.command == "accounts":
+        list_accounts()
+    elif args.command == "assign-account":
+        assign_account(args.account, args.video_ids)
+    elif args.command == "rebuild-read-model":
+        rebuild_read_model()
+    elif args.command == "snapshot-db":
+        snapshot_db(args.path)
+    elif args.command == "import":
+        import_catalog(args.file, args.table, args.format, args.chunk_size)
+    else:
+        main(args.resume)
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.profile:
+        profiler = ProfilingService(PROFILES_DIR, enabled=True)
+        with profiler.profile(f"cli_{args.command or 'sync'}", args.profile):
+            run(args)
+    else:
+        run(args)
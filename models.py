@@ -1,7 +1,8 @@
 """
 Database models using SQLAlchemy ORM
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -157,3 +158,95 @@ class Role(Base):
     
     def __repr__(self):
         return f"<Role {self.RoleID}: Creator={self.CreatorID}, Music={self.MusicID}>"
+
+
+class SyncOutbox(Base):
+    """Videos whose synced metadata changed since their last push to YouTube"""
+    __tablename__ = 'SyncOutbox'
+    
+    ID = Column(Integer, primary_key=True, autoincrement=True)
+    VideoID = Column(Integer, nullable=False, index=True)
+    Reason = Column(String(20), nullable=False)
+    CreatedAt = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SyncOutbox {self.ID}: VideoID={self.VideoID}, Reason={self.Reason}>"
+
+
+class SyncCheckpoint(Base):
+    """Sync stages already pushed to YouTube for a video, kept until its sync completes"""
+    __tablename__ = 'SyncCheckpoint'
+    __table_args__ = (UniqueConstraint('VideoID', 'Stage'),)
+    
+    ID = Column(Integer, primary_key=True, autoincrement=True)
+    VideoID = Column(Integer, nullable=False)
+    Stage = Column(String(30), nullable=False)
+    InputHash = Column(String(64), nullable=False)
+    CompletedAt = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SyncCheckpoint {self.ID}: VideoID={self.VideoID}, Stage={self.Stage}>"
+
+
+class VideoReadModel(Base):
+    """Flattened metadata of a video (Video, first Style, Music, Work names, Role/Creator credits) as JSON,
+    rebuilt whenever one of its source rows changes"""
+    __tablename__ = 'VideoReadModel'
+    
+    VideoID = Column(Integer, primary_key=True, autoincrement=False)
+    Data = Column(Text, nullable=False)
+    UpdatedAt = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<VideoReadModel {self.VideoID}>"
+
+
+class VideoAccount(Base):
+    """YouTube account (channel) a video is synced with; videos without a row use the default account"""
+    __tablename__ = 'VideoAccount'
+    
+    VideoID = Column(Integer, ForeignKey('Video.VideoID'), primary_key=True, autoincrement=False)
+    Account = Column(String(50), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<VideoAccount {self.VideoID}: {self.Account}>"
+
+
+class SyncJob(Base):
+    """Queued video sync, claimed by a worker process (worker.py) with SELECT ... FOR UPDATE SKIP LOCKED"""
+    __tablename__ = 'SyncJob'
+    __table_args__ = (Index('ix_SyncJob_Status_ID', 'Status', 'ID'),)
+    
+    ID = Column(Integer, primary_key=True, autoincrement=True)
+    VideoID = Column(Integer, nullable=False, index=True)
+    # queued -> running -> done | failed; running jobs without a recent heartbeat go back to queued
+    Status = Column(String(20), nullable=False, default='queued')
+    # Manifest row fields (YouTubeLink, SubtitleFolder, TagReference, Tags, UploadID, Resume) as JSON
+    Payload = Column(Text)
+    Attempts = Column(Integer, nullable=False, default=0)
+    # Not claimed before this time (jobs put back while their account's circuit breaker is open)
+    RunAfter = Column(DateTime)
+    WorkerID = Column(String(100))
+    HeartbeatAt = Column(DateTime)
+    CreatedAt = Column(DateTime, nullable=False, default=datetime.utcnow)
+    StartedAt = Column(DateTime)
+    FinishedAt = Column(DateTime)
+    Error = Column(Text)
+    # Batch result of the last attempt (YouTube ID, account, stage timings, resumed stages) as JSON
+    Result = Column(Text)
+    
+    def __repr__(self):
+        return f"<SyncJob {self.ID}: VideoID={self.VideoID}, {self.Status}>"
+
+
+class CatalogChange(Base):
+    """Append-only log of writes to the catalog tables, one row per flush; its max ID with their max IDs
+    versions the dashboard pages (ETag / Last-Modified). Writers only insert, so they never queue on a
+    shared row."""
+    __tablename__ = 'CatalogChange'
+    
+    ID = Column(Integer, primary_key=True, autoincrement=True)
+    ChangedAt = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<CatalogChange {self.ID}: {self.ChangedAt}>"
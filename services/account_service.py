@@ -0,0 +1,212 @@
+"""
+Account Service
+YouTube accounts (channels), each with its own OAuth client, token, quota ledger and API client
+"""
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from services.retry_service import ApiCaller
+from services.snapshot_service import SnapshotStore
+from services.youtube_service import YouTubeService
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Units charged per request (https://developers.google.com/youtube/v3/determine_quota_cost); others cost 1
+QUOTA_COSTS = {
+    'videos.update': 50,
+    'captions.insert': 400,
+    'captions.update': 450,
+    'captions.list': 50,
+    'search.list': 100,
+}
+DEFAULT_DAILY_QUOTA = 10000
+
+
+def _quota_day_start(now: Optional[datetime] = None) -> datetime:
+    """Start of the current quota day; YouTube quotas reset at midnight Pacific time"""
+    try:
+        from zoneinfo import ZoneInfo
+        tz = ZoneInfo('America/Los_Angeles')
+    except Exception:
+        # No tz database (e.g. Windows without tzdata): Pacific standard time is close enough
+        tz = timezone(timedelta(hours=-8))
+    now = (now or datetime.now(tz)).astimezone(tz)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class QuotaLedger:
+    """Units spent today by one OAuth client (Google Cloud project), persisted so restarts keep counting
+
+    Usage is what this app sent; calls made elsewhere with the same project are not seen.
+    """
+
+    def __init__(self, path: Optional[str], daily_limit: int = DEFAULT_DAILY_QUOTA):
+        self.path = Path(path) if path else None
+        self.daily_limit = daily_limit
+        self._day = None
+        self._used = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by every process using this ledger (app, CLI, worker.py processes)"""
+        if self.path is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # A separate lock file: the ledger itself is replaced atomically on every save
+        with open(self.path.with_name(f"{self.path.name}.lock"), 'a+b') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            self._day, self._used = data['day'], int(data['used'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(json.dumps({'day': self._day, 'used': self._used}), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+    def _roll_over(self):
+        today = _quota_day_start().date().isoformat()
+        if self._day != today:
+            self._day, self._used = today, 0
+
+    def charge(self, method: str) -> bool:
+        """Reserve the units of one request; False (nothing charged) when it would exceed today's quota"""
+        cost = QUOTA_COSTS.get(method, 1)
+        with self._lock, self._file_lock():
+            # Re-read under the file lock so concurrent processes add to the same count
+            self._load()
+            self._roll_over()
+            if self._used + cost > self.daily_limit:
+                return False
+            self._used += cost
+            self._save()
+            return True
+
+    def seconds_until_reset(self) -> float:
+        start = _quota_day_start()
+        return ((start + timedelta(days=1)) - datetime.now(start.tzinfo)).total_seconds()
+
+    def state(self) -> Dict:
+        with self._lock:
+            self._load()
+            self._roll_over()
+            return {'used': self._used, 'limit': self.daily_limit, 'remaining': self.daily_limit - self._used}
+
+
+class YouTubeAccount:
+    """One channel: its YouTubeService has its own token, retry/circuit breaker and quota ledger"""
+
+    def __init__(self, name: str, client_secrets_file: str, token_file: str, ledger: QuotaLedger,
+                 snapshots: Optional[SnapshotStore] = None):
+        self.name = name
+        self.ledger = ledger
+        self.service = YouTubeService(client_secrets_file, caller=ApiCaller(ledger=ledger),
+                                      snapshots=snapshots, token_file=token_file)
+
+    def state(self) -> Dict:
+        return {'name': self.name, 'circuit': self.service.breaker.state(), 'quota': self.ledger.state()}
+
+
+class AccountPool:
+    """Configured accounts; the first one is the default for videos without a VideoAccount row"""
+
+    def __init__(self, accounts: List[YouTubeAccount]):
+        if not accounts:
+            raise ValueError("At least one YouTube account is required")
+        self.accounts = {account.name: account for account in accounts}
+        self.default = accounts[0].name
+
+    @classmethod
+    def from_config(cls, path: Optional[str], client_secrets_file: str, snapshots: Optional[SnapshotStore] = None,
+                    quota_dir: Optional[str] = 'quota', daily_quota: int = DEFAULT_DAILY_QUOTA) -> 'AccountPool':
+        """Accounts from a JSON list of {name, client_secrets_file, token_file, daily_quota}
+
+        Without the file there is a single 'default' account using CLIENT_SECRETS_FILE and token.json.
+        Accounts sharing an OAuth client share its quota ledger (quota is per Google Cloud project).
+        """
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                entries = json.load(f)
+            if not isinstance(entries, list):
+                raise ValueError(f"{path} must contain a list of accounts")
+        else:
+            entries = [{'name': 'default', 'client_secrets_file': client_secrets_file, 'token_file': 'token.json'}]
+
+        ledgers: Dict[str, QuotaLedger] = {}
+        accounts = []
+        for entry in entries:
+            name = str(entry.get('name') or '').strip()
+            if not name:
+                raise ValueError("Every account needs a name")
+            secrets = entry.get('client_secrets_file') or client_secrets_file
+            if secrets not in ledgers:
+                ledger_path = os.path.join(quota_dir, f"{name}.json") if quota_dir else None
+                ledgers[secrets] = QuotaLedger(ledger_path, int(entry.get('daily_quota') or daily_quota))
+            token_file = entry.get('token_file') or os.path.join('tokens', f"{name}.json")
+            accounts.append(YouTubeAccount(name, secrets, token_file, ledgers[secrets], snapshots))
+        return cls(accounts)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.accounts)
+
+    def get(self, name: Optional[str] = None) -> YouTubeAccount:
+        account = self.accounts.get(name or self.default)
+        if account is None:
+            raise ValueError(f"Unknown YouTube account: {name}")
+        return account
+
+    def service(self, name: Optional[str] = None) -> YouTubeService:
+        """The account's shared YouTubeService (use .fork() for extra threads)"""
+        return self.get(name).service
+
+    def route(self, db_service, video_ids: Iterable[int]) -> Dict[int, str]:
+        """{VideoID: account name}, from VideoAccount or the default account"""
+        video_ids = [int(v) for v in video_ids]
+        assigned = db_service.get_video_accounts(video_ids) if video_ids else {}
+        return {video_id: assigned.get(video_id, self.default) for video_id in video_ids}
+
+    def group(self, db_service, video_ids: Iterable[int]) -> Dict[str, List[int]]:
+        """{account name: [VideoID, ...]} keeping the given order within each account"""
+        groups: Dict[str, List[int]] = {}
+        for video_id, name in self.route(db_service, video_ids).items():
+            groups.setdefault(name, []).append(video_id)
+        return groups
+
+    def state(self) -> List[Dict]:
+        return [account.state() for account in self.accounts.values()]
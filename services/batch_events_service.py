@@ -0,0 +1,62 @@
+"""
+Batch Events Service
+Progress events of batch syncs started over HTTP, replayed and followed by Server-Sent Events streams
+"""
+import asyncio
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+
+class BatchEvents:
+    """Event log of one batch; every follower gets the events from the start, then live ones"""
+
+    def __init__(self):
+        self.events: List[Tuple[str, Dict]] = []
+        self.finished = False
+        self._changed = asyncio.Condition()
+
+    async def emit(self, event: str, data: Dict):
+        async with self._changed:
+            self.events.append((event, data))
+            self._changed.notify_all()
+
+    async def close(self):
+        async with self._changed:
+            self.finished = True
+            self._changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[Tuple[str, Dict]]:
+        """Yield (event, data) until the batch has finished and every event was sent"""
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: position < len(self.events) or self.finished)
+                new_events, finished = self.events[position:], self.finished
+            position += len(new_events)
+            for item in new_events:
+                yield item
+            if finished:
+                return
+
+
+class BatchEventRegistry:
+    """Batches by id; the ids are random, so only the client that started a batch can follow it"""
+
+    def __init__(self, keep_finished: int = 20):
+        self.keep_finished = keep_finished
+        self._batches: Dict[str, BatchEvents] = {}
+
+    def create(self) -> Tuple[str, BatchEvents]:
+        self._prune()
+        batch_id = uuid.uuid4().hex
+        self._batches[batch_id] = BatchEvents()
+        return batch_id, self._batches[batch_id]
+
+    def get(self, batch_id: str) -> Optional[BatchEvents]:
+        return self._batches.get(batch_id)
+
+    def _prune(self):
+        # Finished batches stay followable for a while (a late or reconnecting client); oldest go first
+        finished = [batch_id for batch_id, batch in self._batches.items() if batch.finished]
+        for batch_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._batches[batch_id]
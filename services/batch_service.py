@@ -0,0 +1,205 @@
+"""
+Batch Sync Service
+Runs a manifest of videos through the sync pipeline on a worker pool per YouTube account
+"""
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+from services.account_service import AccountPool
+from services.youtube_service import YouTubeService
+from services.description_service import DescriptionService
+from services.tag_service import TagService
+from services.video_sync_service import VideoSyncService
+from services.checkpoint_service import SyncCheckpoints, file_hash
+
+
+MANIFEST_FIELDS = ('VideoID', 'YouTubeLink', 'SubtitleFolder', 'TagReference', 'Tags')
+
+
+def load_manifest(path: str) -> List[Dict]:
+    """Read batch rows from a CSV (with a header row) or JSON (list of objects) manifest"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            rows = json.load(f)
+            if not isinstance(rows, list):
+                raise ValueError("JSON manifest must be a list of objects")
+        else:
+            rows = list(csv.DictReader(f))
+
+    items = []
+    for line, row in enumerate(rows, start=1):
+        item = {field: (str(row.get(field) or '').strip() or None) for field in MANIFEST_FIELDS}
+        if not item['VideoID'] or not item['VideoID'].isdigit():
+            raise ValueError(f"Manifest row {line}: VideoID must be an integer, got {row.get('VideoID')!r}")
+        item['VideoID'] = int(item['VideoID'])
+        items.append(item)
+    return items
+
+
+class BatchService:
+    """Each account gets its own pool of `workers` threads, so different channels sync in parallel
+    and one channel's quota or circuit breaker never holds up another's"""
+
+    def __init__(self, accounts: AccountPool, tag_service: TagService, db_service, workers: int = 4,
+                 resume: bool = False, subtitle_store=None):
+        self.accounts = accounts
+        self.tag_service = tag_service
+        self.db_service = db_service
+        self.workers = max(1, workers)
+        self.resume = resume
+        # Resolves rows with an UploadID (subtitles uploaded through the dashboard)
+        self.subtitle_store = subtitle_store
+        self._local = threading.local()
+
+    def _client(self, account: str) -> YouTubeService:
+        """Per-thread YouTube client built from the account's shared credentials"""
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if account not in clients:
+            clients[account] = self.accounts.service(account).fork()
+        return clients[account]
+
+    def run(self, items: List[Dict]) -> List[Dict]:
+        """Sync every manifest row; results come back in manifest order"""
+        routes = self.accounts.route(self.db_service, [item['VideoID'] for item in items])
+        by_account: Dict[str, List[Dict]] = {}
+        for item in items:
+            by_account.setdefault(routes[item['VideoID']], []).append(item)
+
+        # OAuth consent may need a browser, so authenticate one account at a time before starting
+        for account in by_account:
+            if account in self.accounts.accounts:
+                print(f"🔐 Account {account}: {len(by_account[account])} video(s)")
+                self.accounts.service(account).authenticate()
+
+        pools = [ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f'batch-{account}')
+                 for account in by_account]
+        try:
+            futures = {}
+            for pool, (account, account_items) in zip(pools, by_account.items()):
+                for item in account_items:
+                    futures[id(item)] = pool.submit(self.sync_item, item, account)
+            return [futures[id(item)].result() for item in items]
+        finally:
+            for pool in pools:
+                pool.shutdown()
+
+    def _subtitles(self, item: Dict) -> Dict[str, tuple]:
+        """{language: (content hash, context manager giving a local path)} from the row's upload or folder"""
+        upload = None
+        if item.get('UploadID') and self.subtitle_store is not None:
+            upload = self.subtitle_store.get_upload(item['UploadID'])
+        subtitles = {}
+        for language_code in DescriptionService.LANGUAGES:
+            filename = f"{language_code}_subtitle.srt"
+            if upload:
+                if filename in upload['files']:
+                    digest = upload['files'][filename]
+                    subtitles[language_code] = (digest, self.subtitle_store.open_local(digest))
+            elif item['SubtitleFolder']:
+                subtitle_path = os.path.join(item['SubtitleFolder'], filename)
+                if os.path.exists(subtitle_path):
+                    subtitles[language_code] = (file_hash(subtitle_path), nullcontext(subtitle_path))
+        return subtitles
+
+    def sync_item(self, item: Dict, account: Optional[str] = None) -> Dict:
+        """Subtitles, titles/descriptions, tags and duration/upload time for one manifest row"""
+        db_video_id = item['VideoID']
+        account = account or self.accounts.default
+        result = {'VideoID': db_video_id, 'YouTubeID': None, 'account': account, 'status': 'failed', 'error': None,
+                  'timings': {}, 'resumed': []}
+        start = time.perf_counter()
+
+        @contextmanager
+        def stage(name: str):
+            stage_start = time.perf_counter()
+            try:
+                yield
+            finally:
+                result['timings'][name] = time.perf_counter() - stage_start
+
+        try:
+            breaker = self.accounts.service(account).breaker
+            if breaker.is_open:
+                result.update(status='skipped', error=f"YouTube API circuit open, retry in {breaker.retry_after():.0f}s")
+                return result
+
+            with stage('load'):
+                video_data = self.db_service.get_video_metadata(db_video_id)
+                dirty_marker = self.db_service.get_dirty_video_ids([db_video_id]).get(db_video_id)
+                checkpoints = SyncCheckpoints(self.db_service, db_video_id, item.get('Resume', self.resume))
+            result['resumed'] = checkpoints.resumed
+            if not video_data:
+                result['error'] = "Video not found in database"
+                return result
+
+            youtube_link = item['YouTubeLink'] or video_data.YouTubeLink
+            if not youtube_link:
+                result['error'] = "YouTube link not set"
+                return result
+            yt_video_id = VideoSyncService.extract_video_id_from_link(youtube_link)
+            result['YouTubeID'] = yt_video_id
+
+            youtube_service = self._client(account)
+            youtube_service.reset_outcomes()
+
+            subtitles = self._subtitles(item)
+            if subtitles:
+                with stage('subtitles'):
+                    names = DescriptionService.subtitle_names(video_data.SubtitleType)
+                    for language_code, (digest, subtitle_file) in subtitles.items():
+                        checkpoint = (f"subtitle:{language_code}", [digest, names[language_code]])
+                        if checkpoints.is_done(*checkpoint):
+                            continue
+                        with subtitle_file as subtitle_path:
+                            if youtube_service.upload_subtitle(yt_video_id, language_code, subtitle_path,
+                                                               names[language_code]):
+                                checkpoints.complete(*checkpoint)
+
+            with stage('metadata'):
+                localized_metadata = DescriptionService.build_localized_metadata(video_data)
+                metadata_done = checkpoints.push_metadata(youtube_service, yt_video_id, localized_metadata, 10)
+
+            if item['Tags'] or item['TagReference']:
+                with stage('tags'):
+                    tag_string = item['Tags'] or self.tag_service.grab_tags(item['TagReference'])
+                    if tag_string and not checkpoints.is_done('tags', tag_string):
+                        if youtube_service.update_tags(yt_video_id, tag_string):
+                            checkpoints.complete('tags', tag_string)
+
+            with stage('video_info'):
+                video_info = youtube_service.get_video_info(yt_video_id)
+
+            with stage('db_write'):
+                if video_info:
+                    self.db_service.update_video(db_video_id, {
+                        'Length': video_info['duration'],
+                        'UploadTime': video_info['upload_time']
+                    })
+                if dirty_marker and metadata_done:
+                    self.db_service.clear_dirty(db_video_id, dirty_marker)
+
+            failed_stages = [name for name, outcome in youtube_service.outcomes.items()
+                             if outcome and outcome['status'] != 'ok']
+            if failed_stages:
+                result['error'] = f"Failed stages: {', '.join(failed_stages)}"
+            else:
+                checkpoints.finish()
+                if item.get('UploadID') and self.subtitle_store is not None:
+                    # Release the upload; after a failure it is kept for the retry
+                    self.subtitle_store.delete_upload(item['UploadID'])
+                result['status'] = 'success'
+            return result
+
+        except Exception as e:
+            result['error'] = str(e)
+            return result
+        finally:
+            result['total'] = time.perf_counter() - start
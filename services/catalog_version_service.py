@@ -0,0 +1,71 @@
+"""
+Catalog Version Service
+Cheap version of the catalog tables for HTTP revalidation: their max IDs plus the newest change log entry
+"""
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from models import Work, Music, Video, Style, Streaming, Version, Creator, Role, SyncOutbox, CatalogChange
+
+
+class CatalogVersionService:
+
+    # Tables shown on the dashboard pages; a write to any of them appends a CatalogChange row
+    CATALOG_MODELS = (Work, Music, Video, Style, Streaming, Version, Creator, Role)
+
+    @classmethod
+    def register(cls):
+        """Log a change in the same transaction as every ORM flush that touches the catalog"""
+        if not event.contains(Session, 'after_flush', cls._after_flush):
+            event.listen(Session, 'after_flush', cls._after_flush)
+
+    @classmethod
+    def prune(cls, engine, keep: int = 1000):
+        """Drop all but the newest `keep` log rows; only the newest one is ever read"""
+        with engine.begin() as connection:
+            newest = connection.execute(select(func.max(CatalogChange.ID))).scalar()
+            if newest is not None and newest > keep:
+                connection.execute(delete(CatalogChange).where(CatalogChange.ID <= newest - keep))
+
+    @classmethod
+    def record(cls, connection):
+        """Log a catalog change made with Core statements (bulk import) inside the caller's transaction"""
+        connection.execute(insert(CatalogChange).values(ChangedAt=datetime.utcnow()))
+
+    @classmethod
+    def _after_flush(cls, session: Session, flush_context):
+        changed = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+        for obj in (*session.new, *changed, *session.deleted):
+            if isinstance(obj, cls.CATALOG_MODELS):
+                cls.record(session.connection())
+                return
+
+    @staticmethod
+    def _outbox_columns() -> list:
+        return [select(func.count(SyncOutbox.ID)).scalar_subquery(), select(func.max(SyncOutbox.ID)).scalar_subquery()]
+
+    @classmethod
+    def current(cls, engine, include_outbox: bool = False) -> Tuple[tuple, Optional[datetime]]:
+        """(version parts, time of the last counted change) in one round trip of primary-key lookups
+
+        Max IDs cover rows inserted without the ORM; the change log covers updates and deletes.
+        include_outbox adds the SyncOutbox size and max ID (the "changed" markers on /video).
+        """
+        columns = [select(func.max(model.__mapper__.primary_key[0])).scalar_subquery()
+                   for model in cls.CATALOG_MODELS]
+        newest = select(CatalogChange).order_by(CatalogChange.ID.desc()).limit(1).subquery()
+        columns += [select(newest.c.ChangedAt).scalar_subquery(), select(newest.c.ID).scalar_subquery()]
+        if include_outbox:
+            columns += cls._outbox_columns()
+        with engine.connect() as connection:
+            row = tuple(connection.execute(select(*columns)).one())
+        updated_at = row[len(cls.CATALOG_MODELS)]
+        return row[:len(cls.CATALOG_MODELS)] + row[len(cls.CATALOG_MODELS) + 1:], updated_at
+
+    @classmethod
+    def outbox(cls, engine) -> tuple:
+        """SyncOutbox size and max ID, for pages whose catalog is read from a replica"""
+        with engine.connect() as connection:
+            return tuple(connection.execute(select(*cls._outbox_columns())).one())
@@ -0,0 +1,76 @@
+"""
+Change Tracking Service
+Records which videos need to be pushed to YouTube again after their data changed
+"""
+from typing import Dict, Set
+from sqlalchemy import event, inspect, insert, select
+from sqlalchemy.orm import Session
+
+from models import Video, Music, Style, SyncOutbox
+
+
+class ChangeTrackingService:
+
+    # Columns that end up in the YouTube title/description.
+    # Length and UploadTime are written back by the sync itself, so they never mark a video dirty.
+    VIDEO_FIELDS = {
+        'YouTubeLink', 'ZhHantTitle', 'JaTitle', 'EnTitle',
+        'ZhHantDescription', 'JaDescription', 'EnDescription',
+        'ZhHantSubSource', 'JaSubSource', 'EnSubSource',
+        'Instrumental', 'Sheet', 'InstrumentalType', 'SubtitleType', 'GumroadSheet'
+    }
+    MUSIC_FIELDS = {'ZhHantName', 'JaName', 'EnName', 'MV'}
+
+    @classmethod
+    def register(cls):
+        """Attach the outbox writer to every ORM session (SQLAdmin, clone helpers, services)"""
+        if not event.contains(Session, 'after_flush', cls._after_flush):
+            event.listen(Session, 'after_flush', cls._after_flush)
+
+    @staticmethod
+    def _changed(obj, fields: Set[str]) -> bool:
+        """Check whether any of the given columns changed in this flush"""
+        attrs = inspect(obj).attrs
+        return any(attrs[field].history.has_changes() for field in fields)
+
+    @classmethod
+    def _after_flush(cls, session: Session, flush_context):
+        """Collect affected VideoIDs from the flush and append them to SyncOutbox"""
+        reasons: Dict[int, str] = {}
+        music_ids = set()
+
+        for obj in session.new:
+            if isinstance(obj, Video):
+                reasons[obj.VideoID] = 'video'
+            elif isinstance(obj, Style):
+                reasons.setdefault(obj.VideoID, 'style')
+
+        for obj in session.dirty:
+            if isinstance(obj, Video) and cls._changed(obj, cls.VIDEO_FIELDS):
+                reasons[obj.VideoID] = 'video'
+            elif isinstance(obj, Music) and cls._changed(obj, cls.MUSIC_FIELDS):
+                music_ids.add(obj.MusicID)
+            elif isinstance(obj, Style) and cls._changed(obj, {'VideoID', 'MusicID'}):
+                history = inspect(obj).attrs['VideoID'].history
+                for video_id in list(history.added) + list(history.deleted) + list(history.unchanged):
+                    reasons.setdefault(video_id, 'style')
+
+        for obj in session.deleted:
+            if isinstance(obj, Style):
+                reasons.setdefault(obj.VideoID, 'style')
+
+        connection = session.connection()
+        if music_ids:
+            linked = connection.execute(
+                select(Style.VideoID).where(Style.MusicID.in_(music_ids))
+            ).scalars()
+            for video_id in linked:
+                reasons.setdefault(video_id, 'music')
+
+        rows = [
+            {'VideoID': video_id, 'Reason': reason}
+            for video_id, reason in reasons.items()
+            if video_id is not None
+        ]
+        if rows:
+            connection.execute(insert(SyncOutbox), rows)
@@ -0,0 +1,66 @@
+"""
+Checkpoint Service
+Durable per-stage sync progress, so a retried sync resumes at the first incomplete stage
+"""
+import hashlib
+import json
+from typing import Any, Dict, List
+
+
+def input_hash(value: Any) -> str:
+    """Stable hash of a stage's inputs (JSON-serialisable values)"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """sha256 of a file's content (the subtitle store names its blobs the same way)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SyncCheckpoints:
+    """Checkpoints of one video's sync
+    
+    Only the YouTube writes (subtitle:<lang>, snippet, localization, tags) are checkpointed: they cost quota and are
+    not idempotent. Reads and the DB write always run again. A stage is skipped on resume only when its
+    recorded input hash matches, so edited metadata or a new subtitle file is still pushed.
+    """
+    
+    def __init__(self, db_service, video_id: int, resume: bool = False):
+        self.db_service = db_service
+        self.video_id = int(video_id)
+        self.resume = resume
+        self.resumed: List[str] = []
+        self._done = db_service.get_checkpoints(self.video_id) if resume else {}
+    
+    def is_done(self, stage: str, inputs: Any) -> bool:
+        """True when resuming and the stage already completed with the same inputs"""
+        if self._done.get(stage) == input_hash(inputs):
+            self.resumed.append(stage)
+            print(f"⏭ {stage} already done, skipped (resume)")
+            return True
+        return False
+    
+    def complete(self, stage: str, inputs: Any):
+        """Record a stage as done"""
+        self.db_service.save_checkpoint(self.video_id, stage, input_hash(inputs))
+    
+    def finish(self):
+        """Whole sync succeeded: the next sync starts from scratch"""
+        self.db_service.clear_checkpoints(self.video_id)
+
+    def push_metadata(self, youtube_service, yt_video_id: str, localized_metadata: Dict, category_id: int = 10) -> bool:
+        """Snippet then localization update, each checkpointed on its own inputs; True once both are done"""
+        snippet_inputs = [localized_metadata['ja'], category_id]
+        if not self.is_done('snippet', snippet_inputs):
+            if not youtube_service.update_video_snippet(yt_video_id, localized_metadata, category_id):
+                return False
+            self.complete('snippet', snippet_inputs)
+        if not self.is_done('localization', localized_metadata):
+            if not youtube_service.update_localization(yt_video_id, localized_metadata):
+                return False
+            self.complete('localization', localized_metadata)
+        return True
@@ -0,0 +1,134 @@
+"""
+Count Service
+Pluggable row-count strategies for admin list pagination (exact, cached, estimated from table statistics)
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+
+# Runs a statement and returns its scalar rows (SQLAdmin's ModelView._run_query)
+RunQuery = Callable[..., Awaitable[list]]
+
+# Row estimates kept by the database, by dialect; None when the dialect has no usable statistics
+ESTIMATE_QUERIES = {
+    'mysql': "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name",
+    'mariadb': "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name",
+    'postgresql': "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(quote_ident(:name))",
+}
+
+
+class ExactCount:
+    """SQLAdmin's default: run the COUNT on every page view"""
+
+    def register(self):
+        """Nothing to invalidate"""
+
+    def invalidate(self):
+        """Nothing cached"""
+
+    async def count(self, stmt, run: RunQuery, table_name: str, dialect: str, filtered: bool) -> Tuple[int, bool]:
+        """Returns (count, is_estimate)"""
+        rows = await run(stmt)
+        return rows[0], False
+
+
+class CachedCount(ExactCount):
+    """Exact counts reused until any ORM write happens in this process, or `ttl` seconds pass
+    (the TTL bounds staleness from writes made by other processes)"""
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[tuple, Tuple[int, int, float]]" = OrderedDict()
+        self._write_version = 0
+        self._lock = threading.Lock()
+
+    def register(self):
+        """Invalidate cached counts whenever a session flushes inserts, updates or deletes"""
+        if not event.contains(Session, 'after_flush', self._after_flush):
+            event.listen(Session, 'after_flush', self._after_flush)
+
+    def _after_flush(self, session, flush_context):
+        if session.new or session.dirty or session.deleted:
+            self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._write_version += 1
+            self._cache.clear()
+
+    @staticmethod
+    def _key(stmt, dialect: str) -> tuple:
+        compiled = stmt.compile()
+        return dialect, str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items()))
+
+    async def count(self, stmt, run: RunQuery, table_name: str, dialect: str, filtered: bool) -> Tuple[int, bool]:
+        key = self._key(stmt, dialect)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            version = self._write_version
+        if cached and cached[1] == version and now - cached[2] < self.ttl:
+            return cached[0], False
+
+        count, _ = await super().count(stmt, run, table_name, dialect, filtered)
+        with self._lock:
+            # Skip storing if a write landed while counting
+            if version == self._write_version:
+                self._cache[key] = (count, version, now)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return count, False
+
+
+class EstimatedCount(CachedCount):
+    """Unfiltered counts of tables above `threshold` rows come from table statistics (no table scan);
+    smaller tables and search results fall back to cached exact counts
+
+    The statistics lookup itself is cached for `ttl` seconds per table, so a small table costs one cached
+    exact count per page view rather than a statistics query plus a count.
+    """
+
+    def __init__(self, threshold: int = 100000, ttl: float = 300.0, max_entries: int = 256):
+        super().__init__(ttl, max_entries)
+        self.threshold = threshold
+        # (dialect, table) -> (estimate, fetched at); estimates are approximate anyway, so writes keep them
+        self._estimates: Dict[Tuple[str, str], Tuple[Optional[int], float]] = {}
+
+    async def estimate(self, run: RunQuery, table_name: str, dialect: str) -> Optional[int]:
+        query = ESTIMATE_QUERIES.get(dialect)
+        if query is None:
+            return None
+        key, now = (dialect, table_name), time.monotonic()
+        with self._lock:
+            cached = self._estimates.get(key)
+        if cached and now - cached[1] < self.ttl:
+            return cached[0]
+
+        rows = await run(text(query).bindparams(name=table_name))
+        estimate = int(rows[0]) if rows and rows[0] is not None else None
+        with self._lock:
+            self._estimates[key] = (estimate, now)
+        return estimate
+
+    async def count(self, stmt, run: RunQuery, table_name: str, dialect: str, filtered: bool) -> Tuple[int, bool]:
+        if not filtered:
+            estimate = await self.estimate(run, table_name, dialect)
+            if estimate is not None and estimate >= self.threshold:
+                return estimate, True
+        return await super().count(stmt, run, table_name, dialect, filtered)
+
+
+def create_count_strategy(name: str, threshold: int = 100000, ttl: float = 300.0) -> ExactCount:
+    """Build a strategy from configuration ('exact', 'cached' or 'estimated')"""
+    if name == 'estimated':
+        return EstimatedCount(threshold, ttl)
+    if name == 'cached':
+        return CachedCount(ttl)
+    return ExactCount()
@@ -2,74 +2,385 @@
 Database Service
 Handles all database operations using SQLAlchemy
 """
-from typing import Optional, Dict
-from sqlalchemy import create_engine
+import json
+import os
+import uuid
+from datetime import datetime
+from itertools import chain
+from typing import Optional, Dict, Iterable, Iterator, Set
+from sqlalchemy import create_engine, func, delete, select, insert, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, Session
-from models import Video, Style, Music
+from sqlalchemy.pool import NullPool, StaticPool
+from models import (
+    Base, Video, Style, Music, Work, Role, Creator, Streaming, Version, SyncOutbox, SyncCheckpoint,
+    VideoReadModel, VideoAccount, SyncJob, CatalogChange
+)
+from services.catalog_version_service import CatalogVersionService
+from services.video_metadata import (
+    VideoMetadata, VIDEO_METADATA_FIELDS, STYLE_METADATA_FIELDS, MUSIC_METADATA_FIELDS, WORK_METADATA_FIELDS
+)
+
+
+# Tables copied into a SQLite read snapshot (parents first): the catalog, its read model, the change outbox
+# and the catalog version counter
+SNAPSHOT_TABLES = (Work, Music, Video, Style, Streaming, Version, Creator, Role, VideoReadModel, SyncOutbox,
+                   CatalogChange)
+
+
+def create_database_engine(db_url: str, read_only: bool = False):
+    """Engine for any SQLAlchemy URL, with the settings SQLite needs to serve a threaded web app
+    
+    SQLite connections may be used across threads and enforce foreign keys like MariaDB; a writable file
+    database uses WAL so readers do not block on the writer. Read-only SQLite engines open a connection
+    per checkout, so a snapshot file replaced by `cli.py snapshot-db` is picked up by the next query.
+    """
+    url = make_url(db_url)
+    if url.get_backend_name() != 'sqlite':
+        return create_engine(url, echo=False)
+    
+    in_memory = url.database in (None, '', ':memory:')
+    poolclass = StaticPool if in_memory else NullPool if read_only else None
+    engine = create_engine(url, echo=False, connect_args={'check_same_thread': False},
+                           **({'poolclass': poolclass} if poolclass else {}))
+    
+    @event.listens_for(engine, 'connect')
+    def configure_sqlite(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        if not in_memory and not read_only:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+    
+    return engine
 
 
 class DatabaseService:
-    def __init__(self, db_url: str):
-        self.engine = create_engine(db_url, echo=False)
+    # Columns flattened into VideoMetadata records used by the description and sync code
+    VIDEO_METADATA_FIELDS = VIDEO_METADATA_FIELDS
+    STYLE_METADATA_FIELDS = STYLE_METADATA_FIELDS
+    MUSIC_METADATA_FIELDS = MUSIC_METADATA_FIELDS
+    WORK_METADATA_FIELDS = WORK_METADATA_FIELDS
+    CREDIT_FIELDS = ('Role', 'CreatorID', 'CreatorName', 'ChannelName', 'ChannelLink')
+    # Source tables whose changes rebuild VideoReadModel rows
+    READ_MODEL_SOURCES = (Video, Style, Music, Work, Role, Creator)
+    
+    def __init__(self, db_url: str, read_only: bool = False):
+        # read_only: a replica or SQLite snapshot serving dashboard reads; sessions refuse to flush
+        self.read_only = read_only
+        self.engine = create_database_engine(db_url, read_only)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        if read_only:
+            event.listen(self.SessionLocal, 'before_flush', self._reject_flush)
+    
+    @staticmethod
+    def _reject_flush(session, flush_context, instances):
+        raise RuntimeError("Writes must go to the primary database, not the read replica")
+    
+    @property
+    def backend(self) -> str:
+        """Where the engine points, without credentials (host:port/database or the SQLite file)"""
+        url = self.engine.url
+        if url.get_backend_name() == 'sqlite':
+            return f"sqlite:{url.database or ':memory:'}"
+        return f"{url.host}:{url.port}/{url.database}" if url.port else f"{url.host}/{url.database}"
     
     def get_session(self) -> Session:
         """Get a new database session"""
         return self.SessionLocal()
     
-    def get_video_metadata(self, video_id: int) -> Optional[Dict]:
-        """Fetch video metadata with related Music info"""
+    def snapshot_to_sqlite(self, path: str, batch_size: int = 5000) -> Dict[str, int]:
+        """Copy SNAPSHOT_TABLES into a SQLite file for DATABASE_READ_URL; returns {table: rows}
+        
+        Rows are read in one transaction (a consistent snapshot on InnoDB) and written to a temporary
+        file that atomically replaces `path`, so readers never see a half-written snapshot.
+        """
+        tmp_path = os.path.join(os.path.dirname(os.path.abspath(path)), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+        target = create_engine(f"sqlite:///{tmp_path}")
+        counts = {}
+        try:
+            Base.metadata.create_all(target, tables=[model.__table__ for model in SNAPSHOT_TABLES])
+            with self.engine.connect() as source, target.begin() as destination:
+                for model in SNAPSHOT_TABLES:
+                    table = model.__table__
+                    result = source.execution_options(stream_results=True, yield_per=batch_size).execute(select(table))
+                    counts[table.name] = 0
+                    for rows in result.partitions():
+                        destination.execute(insert(table), [dict(row._mapping) for row in rows])
+                        counts[table.name] += len(rows)
+            target.dispose()
+            os.replace(tmp_path, path)
+        finally:
+            target.dispose()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return counts
+    
+    def ensure_support_tables(self):
+        """Create bookkeeping tables that are not part of the original schema, and keep the read model and
+        the catalog change log current"""
+        Base.metadata.create_all(self.engine, tables=[
+            SyncOutbox.__table__, SyncCheckpoint.__table__, VideoReadModel.__table__, VideoAccount.__table__,
+            SyncJob.__table__, CatalogChange.__table__
+        ])
+        CatalogVersionService.prune(self.engine)
+        CatalogVersionService.register()
+        if not event.contains(Session, 'after_flush', self._refresh_after_flush):
+            event.listen(Session, 'after_flush', self._refresh_after_flush)
+    
+    def get_dirty_video_ids(self, video_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        """Return {VideoID: latest outbox ID} for videos changed since their last sync"""
         session = self.get_session()
         try:
-            # Query with joins
-            result = session.query(Video, Style, Music)\
-                .join(Style, Video.VideoID == Style.VideoID)\
-                .join(Music, Style.MusicID == Music.MusicID)\
-                .filter(Video.VideoID == video_id)\
-                .first()
-            
-            if not result:
-                return None
-            
-            video, style, music = result
-            
-            # Convert to dictionary
-            video_dict = {
-                'VideoID': video.VideoID,
-                'YouTubeLink': video.YouTubeLink,
-                'UploadTime': video.UploadTime,
-                'ZhHantTitle': video.ZhHantTitle,
-                'JaTitle': video.JaTitle,
-                'EnTitle': video.EnTitle,
-                'ZhHantDescription': video.ZhHantDescription,
-                'JaDescription': video.JaDescription,
-                'EnDescription': video.EnDescription,
-                'ZhHantSubSource': video.ZhHantSubSource,
-                'JaSubSource': video.JaSubSource,
-                'EnSubSource': video.EnSubSource,
-                'Instrumental': video.Instrumental,
-                'Sheet': video.Sheet,
-                'InstrumentalType': video.InstrumentalType,
-                'SubtitleType': video.SubtitleType,
-                'GumroadSheet': video.GumroadSheet,
-                'Length': video.Length,
-                # Style fields
-                'ID': style.ID,
-                'MusicID': style.MusicID,
-                'Style': style.Style,
-                # Music fields
-                'WorkID': music.WorkID,
-                'ZhHantName': music.ZhHantName,
-                'JaName': music.JaName,
-                'EnName': music.EnName,
-                'ThemeType': music.ThemeType,
-                'SpotifyID': music.SpotifyID,
-                'MV': music.MV,
-                'OfficialArtist': music.OfficialArtist
-            }
+            query = session.query(SyncOutbox.VideoID, func.max(SyncOutbox.ID))\
+                .group_by(SyncOutbox.VideoID)
+            if video_ids is not None:
+                query = query.filter(SyncOutbox.VideoID.in_([int(v) for v in video_ids]))
+            return {video_id: outbox_id for video_id, outbox_id in query.all()}
+        finally:
+            session.close()
+    
+    def clear_dirty(self, video_id: int, up_to_id: int):
+        """Drop outbox entries up to the marker taken before the sync started"""
+        session = self.get_session()
+        try:
+            session.execute(
+                delete(SyncOutbox)
+                .where(SyncOutbox.VideoID == video_id)
+                .where(SyncOutbox.ID <= up_to_id)
+            )
+            session.commit()
+        finally:
+            session.close()
+    
+    def get_checkpoints(self, video_id: int) -> Dict[str, str]:
+        """Return {Stage: InputHash} of the sync stages recorded as done for a video"""
+        session = self.get_session()
+        try:
+            rows = session.execute(
+                select(SyncCheckpoint.Stage, SyncCheckpoint.InputHash)
+                .where(SyncCheckpoint.VideoID == video_id)
+            ).all()
+            return {stage: input_hash for stage, input_hash in rows}
+        finally:
+            session.close()
+    
+    def save_checkpoint(self, video_id: int, stage: str, input_hash: str):
+        """Record a completed sync stage (replacing an earlier checkpoint of the same stage)"""
+        session = self.get_session()
+        try:
+            checkpoint = session.query(SyncCheckpoint).filter_by(VideoID=video_id, Stage=stage).one_or_none()
+            if checkpoint is None:
+                session.add(SyncCheckpoint(VideoID=video_id, Stage=stage, InputHash=input_hash))
+            else:
+                checkpoint.InputHash = input_hash
+                checkpoint.CompletedAt = datetime.utcnow()
+            session.commit()
+        finally:
+            session.close()
+    
+    def clear_checkpoints(self, video_id: int):
+        """Forget a video's checkpoints once its sync has completed"""
+        session = self.get_session()
+        try:
+            session.execute(delete(SyncCheckpoint).where(SyncCheckpoint.VideoID == video_id))
+            session.commit()
+        finally:
+            session.close()
+    
+    def get_video_accounts(self, video_ids: Iterable[int]) -> Dict[int, str]:
+        """Return {VideoID: Account} for the videos assigned to an account"""
+        session = self.get_session()
+        try:
+            rows = session.execute(
+                select(VideoAccount.VideoID, VideoAccount.Account)
+                .where(VideoAccount.VideoID.in_([int(v) for v in video_ids]))
+            ).all()
+            return {video_id: account for video_id, account in rows}
+        finally:
+            session.close()
+    
+    def set_video_account(self, video_ids: Iterable[int], account: Optional[str]):
+        """Assign videos to an account (None moves them back to the default account)"""
+        video_ids = [int(v) for v in video_ids]
+        session = self.get_session()
+        try:
+            session.execute(delete(VideoAccount).where(VideoAccount.VideoID.in_(video_ids)))
+            if account:
+                session.add_all(VideoAccount(VideoID=video_id, Account=account) for video_id in video_ids)
+            session.commit()
+        finally:
+            session.close()
+    
+    @classmethod
+    def _metadata_query(cls):
+        """Video joined to its Style and Music, projected to the VideoMetadata columns in field order"""
+        columns = [getattr(Video, name).label(name) for name in cls.VIDEO_METADATA_FIELDS]
+        columns += [getattr(Style, name).label(name) for name in cls.STYLE_METADATA_FIELDS]
+        columns += [getattr(Music, name).label(name) for name in cls.MUSIC_METADATA_FIELDS]
+        return select(*columns)\
+            .join(Style, Video.VideoID == Style.VideoID)\
+            .join(Music, Style.MusicID == Music.MusicID)
+    
+    @classmethod
+    def build_read_models(cls, connection, video_ids: Iterable[int], chunk_size: int = 500) -> Dict[int, Dict]:
+        """Full metadata dicts (Work names and Credits included) of the given videos, straight from the source tables"""
+        video_ids = sorted({int(v) for v in video_ids})
+        models: Dict[int, Dict] = {}
+        for start in range(0, len(video_ids), chunk_size):
+            query = cls._metadata_query()\
+                .add_columns(*(getattr(Work, column).label(name) for name, column in cls.WORK_METADATA_FIELDS.items()))\
+                .outerjoin(Work, Music.WorkID == Work.WorkID)\
+                .where(Video.VideoID.in_(video_ids[start:start + chunk_size]))\
+                .order_by(Video.VideoID, Style.ID)
+            chunk: Dict[int, Dict] = {}
+            for row in connection.execute(query):
+                # Videos with several Style rows keep the first, like iter_video_metadata
+                if row.VideoID not in chunk:
+                    chunk[row.VideoID] = dict(row._mapping, Credits=[])
             
-            return video_dict
+            credits: Dict[int, list] = {}
+            music_ids = {data['MusicID'] for data in chunk.values()}
+            if music_ids:
+                query = select(Role.MusicID, Role.Role, Creator.CreatorID, Creator.CreatorName,
+                               Creator.ChannelName, Creator.ChannelLink)\
+                    .join(Creator, Role.CreatorID == Creator.CreatorID)\
+                    .where(Role.MusicID.in_(music_ids))\
+                    .order_by(Role.RoleID)
+                for row in connection.execute(query):
+                    credits.setdefault(row.MusicID, []).append({field: row._mapping[field] for field in cls.CREDIT_FIELDS})
+            for data in chunk.values():
+                data['Credits'] = credits.get(data['MusicID'], [])
+            models.update(chunk)
+        return models
+    
+    @staticmethod
+    def _encode_read_model(data: Dict) -> str:
+        return json.dumps(data, ensure_ascii=False,
+                          default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+    
+    @staticmethod
+    def _decode_read_model(text: str) -> Dict:
+        data = json.loads(text)
+        if data.get('UploadTime'):
+            data['UploadTime'] = datetime.fromisoformat(data['UploadTime'])
+        return data
+    
+    @classmethod
+    def refresh_read_model(cls, connection, video_ids: Iterable[int]):
+        """Rebuild the read-model rows of these videos inside the caller's transaction"""
+        video_ids = {int(v) for v in video_ids if v is not None}
+        if not video_ids:
+            return
+        connection.execute(delete(VideoReadModel).where(VideoReadModel.VideoID.in_(video_ids)))
+        models = cls.build_read_models(connection, video_ids)
+        if models:
+            connection.execute(insert(VideoReadModel), [
+                {'VideoID': video_id, 'Data': cls._encode_read_model(data), 'UpdatedAt': datetime.utcnow()}
+                for video_id, data in models.items()
+            ])
+    
+    @classmethod
+    def _refresh_after_flush(cls, session: Session, flush_context):
+        """Rebuild the read model of every video whose Video/Style/Music/Work/Role/Creator rows changed"""
+        video_ids: Set[int] = set()
+        music_ids: Set[int] = set()
+        work_ids: Set[int] = set()
+        creator_ids: Set[int] = set()
+        
+        def with_previous(obj, field: str):
+            history = inspect(obj).attrs[field].history
+            return [getattr(obj, field)] + list(history.deleted)
+        
+        changed = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+        for obj in chain(session.new, changed, session.deleted):
+            if isinstance(obj, Video):
+                video_ids.add(obj.VideoID)
+            elif isinstance(obj, Style):
+                video_ids.update(with_previous(obj, 'VideoID'))
+            elif isinstance(obj, Music):
+                music_ids.add(obj.MusicID)
+            elif isinstance(obj, Role):
+                music_ids.update(with_previous(obj, 'MusicID'))
+            elif isinstance(obj, Work):
+                work_ids.add(obj.WorkID)
+            elif isinstance(obj, Creator):
+                creator_ids.add(obj.CreatorID)
+        
+        connection = session.connection()
+        if music_ids:
+            video_ids.update(connection.execute(
+                select(Style.VideoID).where(Style.MusicID.in_(music_ids))
+            ).scalars())
+        if work_ids:
+            video_ids.update(connection.execute(
+                select(Style.VideoID).join(Music, Style.MusicID == Music.MusicID).where(Music.WorkID.in_(work_ids))
+            ).scalars())
+        if creator_ids:
+            video_ids.update(connection.execute(
+                select(Style.VideoID).join(Role, Style.MusicID == Role.MusicID).where(Role.CreatorID.in_(creator_ids))
+            ).scalars())
+        cls.refresh_read_model(connection, video_ids)
+    
+    def rebuild_read_model(self, batch_size: int = 500) -> int:
+        """Rebuild every video's read-model row (after writes that bypassed the ORM); returns the video count"""
+        count = 0
+        with self.engine.connect() as connection:
+            video_ids = connection.execute(select(Video.VideoID).order_by(Video.VideoID)).scalars().all()
+        for start in range(0, len(video_ids), batch_size):
+            with self.engine.begin() as connection:
+                self.refresh_read_model(connection, video_ids[start:start + batch_size])
+            count += len(video_ids[start:start + batch_size])
+        # The same writes may have changed what the dashboard pages show
+        with self.engine.begin() as connection:
+            CatalogVersionService.record(connection)
+        return count
+    
+    def get_video_metadata(self, video_id: int) -> Optional[VideoMetadata]:
+        """Video metadata with its Music, Work names and credits: a primary-key lookup in the read model,
+        built from the source tables on first use"""
+        session = self.get_session()
+        try:
+            text = session.execute(
+                select(VideoReadModel.Data).where(VideoReadModel.VideoID == video_id)
+            ).scalar()
+            if text is not None:
+                return VideoMetadata.from_mapping(self._decode_read_model(text))
             
+            data = self.build_read_models(session.connection(), [video_id]).get(int(video_id))
+            if data is None or self.read_only:
+                return VideoMetadata.from_mapping(data) if data else None
+            try:
+                session.execute(insert(VideoReadModel), [
+                    {'VideoID': data['VideoID'], 'Data': self._encode_read_model(data), 'UpdatedAt': datetime.utcnow()}
+                ])
+                session.commit()
+            except IntegrityError:
+                # A concurrent writer rebuilt it first
+                session.rollback()
+            return VideoMetadata.from_mapping(data)
+        finally:
+            session.close()
+    
+    def iter_video_metadata(self, video_ids: Optional[Iterable[int]] = None,
+                            batch_size: int = 500) -> Iterator[VideoMetadata]:
+        """Stream VideoMetadata records in VideoID order over a server-side cursor (one per video)"""
+        query = self._metadata_query()\
+            .order_by(Video.VideoID, Style.ID)\
+            .execution_options(stream_results=True, yield_per=batch_size)
+        if video_ids is not None:
+            query = query.where(Video.VideoID.in_([int(v) for v in video_ids]))
+        
+        session = self.get_session()
+        try:
+            last_video_id = None
+            for row in session.execute(query):
+                # Videos with several Style rows keep the first, like get_video_metadata
+                if row[0] != last_video_id:
+                    last_video_id = row[0]
+                    yield VideoMetadata(*row)
         finally:
             session.close()
     
@@ -4,9 +4,20 @@ Generates video descriptions for multiple languages
 """
 from typing import Dict
 
+from services.video_metadata import VideoMetadata
+
 
 class DescriptionService:
     
+    LANGUAGES = ['ja', 'en', 'zh-Hant']
+    TITLE_FIELDS = {'ja': 'JaTitle', 'en': 'EnTitle', 'zh-Hant': 'ZhHantTitle'}
+    
+    # Caption track names shown on YouTube, by Video.SubtitleType
+    SUBTITLE_NAMES = {
+        'Lyrics': {'ja': "歌詞", "en": "English Lyrics Translation", "zh-Hant": "中文歌詞翻譯"},
+        'BloggerTalk': {'ja': "僕の心の話", "en": "My heartfelt story", "zh-Hant": "我心裡的話"}
+    }
+    
     INSTRUMENTAL_TEMPLATES = {
         'zh-Hant': '''
 {chinese_introduciton}
@@ -149,19 +160,38 @@ bloggermandolin@proton.me
         return description
     
     @staticmethod
-    def prepare_info_dict(video_data: Dict) -> Dict:
+    def prepare_info_dict(video_data: VideoMetadata) -> Dict:
         """Prepare information dictionary from database data"""
         return {
-            "japanese_introduction": (video_data.get("JaDescription") or "") + '\n',
-            "chinese_introduction": (video_data.get("ZhHantDescription") or "") + '\n',
-            "english_introduction": (video_data.get("EnDescription") or "") + '\n',
-            "musescore_sheetmusic": video_data.get("Sheet") or "",
-            "gumroad_sheetmusic_name": video_data.get("GumroadSheet") or "",
-            "original_song": video_data.get("MV") or "",
-            "chinese_translation": video_data.get("ZhHantSubSource") or "",
-            "english_translation": video_data.get("EnSubSource") or "",
-            "instrumental": video_data.get("Instrumental") or "",
-            "japanese_name": video_data.get("JaName") or "",
-            "chinese_name": video_data.get("ZhHantName") or "",
-            "english_name": video_data.get("EnName") or ""
+            "japanese_introduction": (video_data.JaDescription or "") + '\n',
+            "chinese_introduction": (video_data.ZhHantDescription or "") + '\n',
+            "english_introduction": (video_data.EnDescription or "") + '\n',
+            "musescore_sheetmusic": video_data.Sheet or "",
+            "gumroad_sheetmusic_name": video_data.GumroadSheet or "",
+            "original_song": video_data.MV or "",
+            "chinese_translation": video_data.ZhHantSubSource or "",
+            "english_translation": video_data.EnSubSource or "",
+            "instrumental": video_data.Instrumental or "",
+            "japanese_name": video_data.JaName or "",
+            "chinese_name": video_data.ZhHantName or "",
+            "english_name": video_data.EnName or ""
         }
+    
+    @classmethod
+    def build_localized_metadata(cls, video_data: VideoMetadata) -> Dict:
+        """Build {language: {title, description}} for every supported language"""
+        info_dict = cls.prepare_info_dict(video_data)
+        inst_type = "instrumental" if video_data.InstrumentalType == 'Inst' else "piano"
+        
+        localized_metadata = {}
+        for language_code in cls.LANGUAGES:
+            localized_metadata[language_code] = {
+                "title": getattr(video_data, cls.TITLE_FIELDS[language_code]),
+                "description": cls.generate(info_dict, inst_type, language=language_code)
+            }
+        return localized_metadata
+    
+    @classmethod
+    def subtitle_names(cls, subtitle_type: str) -> Dict[str, str]:
+        """Caption track names for a subtitle type (Lyrics by default)"""
+        return cls.SUBTITLE_NAMES.get(subtitle_type, cls.SUBTITLE_NAMES['Lyrics'])
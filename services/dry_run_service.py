@@ -0,0 +1,118 @@
+"""
+Dry Run Service
+Builds the exact payloads a sync would send to YouTube, without calling the API
+"""
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from services.description_service import DescriptionService
+from services.tag_service import TagService
+from services.video_sync_service import VideoSyncService
+from services.video_metadata import VideoMetadata
+
+
+class DryRunService:
+    def __init__(self, db_service, tag_service: Optional[TagService] = None,
+                 subtitle_dir: str = os.path.join('temp', '{video_id}'), subtitle_store=None):
+        self.db_service = db_service
+        self.tag_service = tag_service
+        # Folder holding <lang>_subtitle.srt; {video_id} is replaced per video (temp/<id> is the legacy upload folder)
+        self.subtitle_dir = subtitle_dir
+        # Dashboard uploads: a video's latest upload wins over the folder, as in the real sync
+        self.subtitle_store = subtitle_store
+
+    def build_plan(self, video_data: VideoMetadata, tag_string: Optional[str] = None, category_id: int = 10,
+                   latest_uploads: Optional[Dict[int, str]] = None) -> Dict:
+        """Snippet, localizations, tags and captions update_video_snippet/update_localization/update_tags/upload_subtitle would send
+
+        latest_uploads (video id -> upload id, from SubtitleStore.latest_uploads) saves a store scan per video
+        """
+        yt_video_id = VideoSyncService.extract_video_id_from_link(video_data.YouTubeLink)
+        localized_metadata = DescriptionService.build_localized_metadata(video_data)
+
+        if latest_uploads is None and self.subtitle_store is not None:
+            latest_uploads = self.subtitle_store.latest_uploads()
+        upload_id = (latest_uploads or {}).get(int(video_data.VideoID))
+        upload = self.subtitle_store.get_upload(upload_id) if upload_id else None
+
+        captions = []
+        folder = self.subtitle_dir.format(video_id=video_data.VideoID)
+        names = DescriptionService.subtitle_names(video_data.SubtitleType)
+        for language_code in DescriptionService.LANGUAGES:
+            filename = f"{language_code}_subtitle.srt"
+            if upload is not None:
+                captions.append({
+                    'language': language_code,
+                    'name': names[language_code],
+                    'file': f"{upload_id}/{filename}",
+                    'exists': filename in upload['files']
+                })
+                continue
+            path = os.path.join(folder, filename)
+            captions.append({
+                'language': language_code,
+                'name': names[language_code],
+                'file': path,
+                'exists': os.path.exists(path)
+            })
+
+        tags: List[str] = []
+        if tag_string:
+            tags = [tag.strip() for tag in tag_string.split(',')]
+            if self.tag_service is not None:
+                tags = self.tag_service.replace_tags(tags)
+
+        return {
+            'VideoID': video_data.VideoID,
+            'YouTubeID': yt_video_id or None,
+            # Fields set on top of the current snippet (videos.update part=snippet)
+            'snippet': {
+                'defaultLanguage': 'ja',
+                'title': localized_metadata['ja']['title'],
+                'description': localized_metadata['ja']['description'],
+                'categoryId': category_id
+            },
+            'localizations': localized_metadata,
+            'tags': tags,
+            'captions': captions,
+            'warnings': self._warnings(video_data, yt_video_id, localized_metadata)
+        }
+
+    @staticmethod
+    def _warnings(video_data: VideoMetadata, yt_video_id: str, localized_metadata: Dict) -> List[str]:
+        """Problems that would make the real sync fail or publish incomplete metadata"""
+        warnings = []
+        if not yt_video_id:
+            warnings.append("YouTube link not set")
+        for language_code, metadata in localized_metadata.items():
+            if not metadata['title']:
+                warnings.append(f"Missing {language_code} title")
+            if len(metadata['title'] or '') > 100:
+                warnings.append(f"{language_code} title longer than 100 characters")
+            if len(metadata['description']) > 5000:
+                warnings.append(f"{language_code} description longer than 5000 characters")
+        return warnings
+
+    def iter_plans(self, video_ids: Optional[Iterable[int]] = None, tag_string: Optional[str] = None) -> Iterator[Dict]:
+        """Plans for the given videos (or the whole catalog), streamed from the database"""
+        latest_uploads = self.subtitle_store.latest_uploads() if self.subtitle_store is not None else None
+        for video_data in self.db_service.iter_video_metadata(video_ids):
+            try:
+                yield self.build_plan(video_data, tag_string, latest_uploads=latest_uploads)
+            except Exception as e:
+                yield {'VideoID': video_data.VideoID, 'error': str(e)}
+
+    def iter_jsonl(self, video_ids: Optional[Iterable[int]] = None, tag_string: Optional[str] = None) -> Iterator[str]:
+        """One JSON document per line, keys sorted so runs can be diffed"""
+        for plan in self.iter_plans(video_ids, tag_string):
+            yield json.dumps(plan, ensure_ascii=False, sort_keys=True, default=str) + '\n'
+
+    def write_jsonl(self, out: TextIO, video_ids: Optional[Iterable[int]] = None,
+                    tag_string: Optional[str] = None) -> int:
+        """Write plans to a file object; returns the number of plans written"""
+        count = 0
+        for line in self.iter_jsonl(video_ids, tag_string):
+            out.write(line)
+            count += 1
+        return count
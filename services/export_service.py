@@ -0,0 +1,105 @@
+"""
+Export Service
+Streams the joined Video/Style/Music/Work catalog as NDJSON or CSV over a server-side cursor
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from models import Video, Style, Music, Work
+from services.video_metadata import VIDEO_METADATA_FIELDS, MUSIC_METADATA_FIELDS, WORK_METADATA_FIELDS
+
+
+# Exported column name -> model column; one row per Style, videos without styles get one row of NULLs
+EXPORT_COLUMNS = {
+    **{name: getattr(Video, name) for name in VIDEO_METADATA_FIELDS},
+    'StyleID': Style.ID,
+    'Style': Style.Style,
+    'MusicID': Music.MusicID,
+    **{name: getattr(Music, name) for name in MUSIC_METADATA_FIELDS if name != 'WorkID'},
+    'WorkID': Work.WorkID,
+    **{name: getattr(Work, column) for name, column in WORK_METADATA_FIELDS.items()},
+}
+
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class ExportService:
+    def __init__(self, db_service, batch_size: int = 1000):
+        self.db_service = db_service
+        # Rows fetched from the cursor, and sent as one chunk, at a time
+        self.batch_size = batch_size
+
+    @staticmethod
+    def resolve_columns(columns: Optional[Iterable[str]]) -> List[str]:
+        """Requested column names in order (all when empty); ValueError names unknown ones"""
+        names = [name.strip() for name in (columns or []) if name and name.strip()]
+        if not names:
+            return list(EXPORT_COLUMNS)
+        unknown = [name for name in names if name not in EXPORT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+        return names
+
+    def query(self, columns: List[str], video_ids: Optional[Iterable[int]] = None):
+        """Only the requested columns are selected; the joins stay so row counts do not depend on them"""
+        query = select(*(EXPORT_COLUMNS[name].label(name) for name in columns))\
+            .select_from(Video)\
+            .outerjoin(Style, Style.VideoID == Video.VideoID)\
+            .outerjoin(Music, Music.MusicID == Style.MusicID)\
+            .outerjoin(Work, Work.WorkID == Music.WorkID)\
+            .order_by(Video.VideoID, Style.ID)\
+            .execution_options(stream_results=True, yield_per=self.batch_size)
+        if video_ids is not None:
+            query = query.where(Video.VideoID.in_([int(v) for v in video_ids]))
+        return query
+
+    def iter_batches(self, columns: List[str], video_ids: Optional[Iterable[int]] = None) -> Iterator[list]:
+        """Lists of up to batch_size row tuples, read lazily from a server-side cursor"""
+        session = self.db_service.get_session()
+        try:
+            for rows in session.execute(self.query(columns, video_ids)).partitions():
+                yield rows
+        finally:
+            session.close()
+
+    def iter_ndjson(self, columns: List[str], video_ids: Optional[Iterable[int]] = None) -> Iterator[str]:
+        for rows in self.iter_batches(columns, video_ids):
+            yield ''.join(
+                json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default) + '\n'
+                for row in rows
+            )
+
+    def iter_csv(self, columns: List[str], video_ids: Optional[Iterable[int]] = None) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for rows in self.iter_batches(columns, video_ids):
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    @staticmethod
+    def csv_header(columns: List[str]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(columns)
+        return buffer.getvalue()
+
+    def iter_export(self, fmt: str, columns: List[str], video_ids: Optional[Iterable[int]] = None) -> Iterator[str]:
+        """Chunks of the export in `fmt` ('ndjson' or 'csv')"""
+        if fmt == 'csv':
+            # The header goes out before the query runs
+            yield self.csv_header(columns)
+            yield from self.iter_csv(columns, video_ids)
+        else:
+            yield from self.iter_ndjson(columns, video_ids)
@@ -0,0 +1,193 @@
+"""
+HTTP Cache Service
+Conditional GETs (ETag / Last-Modified -> 304) and compressed bodies for pages rendered from the catalog
+"""
+import asyncio
+import gzip
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without the brotli package pages are served gzip-compressed
+    brotli = None
+
+
+def make_etag(*parts) -> str:
+    """Weak validator (the body differs per Content-Encoding) from the page version parts"""
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _http_date(value: datetime) -> str:
+    # Catalog times are naive UTC (datetime.utcnow)
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """RFC 9110 evaluation: If-None-Match when present (weak comparison), else If-Modified-Since"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        opaque = etag.removeprefix('W/')
+        return '*' in tags or any(tag.removeprefix('W/') == opaque for tag in tags)
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """'br' or 'gzip' when the client accepts it (q=0 excluded), brotli first; None for identity"""
+    accepted = set()
+    for item in accept_encoding.lower().split(','):
+        name, _, params = item.strip().partition(';')
+        if name and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(name)
+    if brotli is not None and ('br' in accepted or '*' in accepted):
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def _file_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class BuildVersion:
+    """Version of the files every page is built from, as (ETag part, time of the newest change)
+
+    App code only changes with a restart, so it is hashed once. Templates (including the ones a page
+    extends) and static assets are re-stat'ed per call and re-hashed only when a file changed, so an
+    edit invalidates cached pages without a restart. Content hashes keep the ETag equal across hosts.
+    """
+
+    def __init__(self, code_paths: Iterable[str], asset_dirs: Iterable[str]):
+        self.asset_dirs = tuple(asset_dirs)
+        code_paths = sorted(code_paths)
+        self.code_hash = hashlib.sha1(
+            ''.join(_file_digest(path) for path in code_paths).encode('ascii')
+        ).hexdigest()
+        self.code_mtime = max((os.path.getmtime(path) for path in code_paths), default=0.0)
+        self._digests: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def _asset_digest(self, path: str, stat: os.stat_result) -> str:
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digest = _file_digest(path)
+        with self._lock:
+            self._digests[path] = (key, digest)
+        return digest
+
+    def current(self) -> Tuple[str, datetime]:
+        digests, newest = [], self.code_mtime
+        for directory in self.asset_dirs:
+            for root, dirs, files in os.walk(directory):
+                dirs.sort()
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    digests.append(f'{path}:{self._asset_digest(path, stat)}')
+                    newest = max(newest, stat.st_mtime)
+        version = hashlib.sha1('\n'.join([self.code_hash, *digests]).encode('utf-8')).hexdigest()
+        # Naive UTC like the catalog times
+        return version, datetime.utcfromtimestamp(newest)
+
+
+class PageCache:
+    """Rendered body of each page for its latest version, with compressed variants made on first request
+
+    A repeated visit with a matching validator costs one version query (304, no template work); a new
+    client gets the cached body, compressed once per version and encoding. Rendering and compression run
+    in a worker thread, one at a time per page, so concurrent misses wait for a single render.
+    """
+
+    def __init__(self, min_compress_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.min_compress_size = min_compress_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._pages: Dict[str, Tuple[str, Dict[Optional[str], bytes]]] = {}
+        self._lock = threading.Lock()
+        self._render_locks: Dict[str, asyncio.Lock] = {}
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    def _get(self, page: str, etag: str, encoding: Optional[str]) -> Optional[bytes]:
+        with self._lock:
+            cached = self._pages.get(page)
+            if cached is None or cached[0] != etag:
+                return None
+            return cached[1].get(encoding)
+
+    def _put(self, page: str, etag: str, encoding: Optional[str], body: bytes):
+        with self._lock:
+            cached = self._pages.get(page)
+            if cached is None or cached[0] != etag:
+                # A new version replaces the old bodies of the page
+                cached = self._pages[page] = (etag, {})
+            cached[1][encoding] = body
+
+    async def _fill(self, page: str, etag: str, encoding: Optional[str],
+                    render: Callable[[], bytes]) -> Tuple[bytes, Optional[str]]:
+        """Render (and compress) a missing body; the lock makes waiting requests reuse the first one's work"""
+        lock = self._render_locks.setdefault(page, asyncio.Lock())
+        async with lock:
+            body = self._get(page, etag, encoding)
+            if body is not None:
+                return body, encoding
+            identity = self._get(page, etag, None)
+            if identity is None:
+                identity = await asyncio.to_thread(render)
+                self._put(page, etag, None, identity)
+            if encoding is None or len(identity) < self.min_compress_size:
+                return identity, None
+            body = await asyncio.to_thread(self._compress, identity, encoding)
+            self._put(page, etag, encoding, body)
+            return body, encoding
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    async def respond(self, request: Request, page: str, version: Tuple[str, Optional[datetime]],
+                      render: Callable[[], bytes], media_type: str = 'text/html; charset=utf-8') -> Response:
+        """304 when the client's copy is current, else the (cached, possibly compressed) rendered page"""
+        etag, last_modified = version
+        # no-cache: browsers may store the page but revalidate it on every visit
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if last_modified is not None:
+            headers['Last-Modified'] = _http_date(last_modified)
+        if is_not_modified(request, etag, last_modified):
+            return Response(status_code=304, headers=headers)
+
+        encoding = choose_encoding(request.headers.get('accept-encoding', ''))
+        body = self._get(page, etag, encoding)
+        if body is None:
+            body, encoding = await self._fill(page, etag, encoding, render)
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+        return Response(body, media_type=media_type, headers=headers)
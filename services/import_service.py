@@ -0,0 +1,226 @@
+"""
+Import Service
+Streaming bulk import of Work/Music/Video/Style rows from CSV or NDJSON, with per-row error reporting
+"""
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import insert, or_, select, Integer, DateTime, String
+from sqlalchemy.exc import DBAPIError
+
+from models import Work, Music, Video, Style, SyncOutbox
+from services.database_service import DatabaseService
+from services.catalog_version_service import CatalogVersionService
+
+
+# Insert order inside a chunk, so rows can reference Works/Music created earlier in the same chunk
+IMPORT_MODELS = {'Work': Work, 'Music': Music, 'Video': Video, 'Style': Style}
+NAME_FIELDS = ('ZhHantName', 'JaName', 'EnName')
+
+# Rows = (line number, parsed row or parse error)
+ParsedRow = Tuple[int, object]
+
+
+def iter_rows(stream: TextIO, fmt: str) -> Iterator[ParsedRow]:
+    """Parse a CSV (header row) or NDJSON stream lazily, one row at a time"""
+    if fmt == 'csv':
+        # Line 1 is the header
+        for line, row in enumerate(csv.DictReader(stream), start=2):
+            yield line, row
+        return
+
+    for line, text in enumerate(stream, start=1):
+        text = text.strip()
+        if not text:
+            continue
+        try:
+            row = json.loads(text)
+            yield line, row if isinstance(row, dict) else ValueError("Expected a JSON object")
+        except ValueError as e:
+            yield line, ValueError(f"Invalid JSON: {e}")
+
+
+def detect_format(filename: str) -> str:
+    """'csv' or 'ndjson' from a file name"""
+    return 'csv' if filename.lower().endswith('.csv') else 'ndjson'
+
+
+class ImportService:
+    """Inserts rows with executemany, one transaction per chunk
+
+    Each row names its table in a `table` field (or uses the default table). Music rows may give
+    `Work` (a Work name) instead of WorkID, Style rows `Music` (a Music name, optionally qualified with
+    `Work`) instead of MusicID. Invalid rows are reported and skipped; when a chunk's bulk insert fails
+    (duplicate key, missing video, ...) its rows are retried one by one to find the offending ones.
+    """
+
+    def __init__(self, engine, chunk_size: int = 1000, max_errors: int = 1000):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        # Errors kept for the report; the count covers all of them
+        self.max_errors = max_errors
+
+    def run(self, rows: Iterable[ParsedRow], default_table: Optional[str] = None) -> Dict:
+        """Import every row; returns {'inserted': {table: n}, 'error_count': n, 'errors': [...]}"""
+        report = {'rows': 0, 'inserted': {table: 0 for table in IMPORT_MODELS}, 'error_count': 0, 'errors': []}
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return report
+            report['rows'] += len(chunk)
+            self._import_chunk(chunk, default_table, report)
+
+    def _error(self, report: Dict, line: int, table: Optional[str], message: str):
+        report['error_count'] += 1
+        if len(report['errors']) < self.max_errors:
+            report['errors'].append({'line': line, 'table': table, 'error': message})
+
+    def _import_chunk(self, chunk: List[ParsedRow], default_table: Optional[str], report: Dict):
+        by_table: Dict[str, List[Tuple[int, Dict]]] = {table: [] for table in IMPORT_MODELS}
+        for line, row in chunk:
+            if isinstance(row, Exception):
+                self._error(report, line, None, str(row))
+                continue
+            table = str(row.get('table') or default_table or '').strip()
+            table = next((name for name in IMPORT_MODELS if name.lower() == table.lower()), None)
+            if table is None:
+                self._error(report, line, None, f"Unknown table {row.get('table') or default_table!r}")
+                continue
+            by_table[table].append((line, row))
+
+        with self.engine.begin() as connection:
+            for table, table_rows in by_table.items():
+                if not table_rows:
+                    continue
+                model = IMPORT_MODELS[table]
+                resolver = _NameResolver(connection, table, table_rows)
+                valid = []
+                for line, row in table_rows:
+                    try:
+                        valid.append((line, self._values(model, resolver.resolve(row))))
+                    except ValueError as e:
+                        self._error(report, line, table, str(e))
+                inserted = self._insert(connection, model, valid, report)
+                report['inserted'][table] += len(inserted)
+
+                # Same bookkeeping ChangeTrackingService and the read model do for ORM inserts
+                if table in ('Video', 'Style') and inserted:
+                    reason = 'video' if table == 'Video' else 'style'
+                    video_ids = sorted({values['VideoID'] for values in inserted if 'VideoID' in values})
+                    if video_ids:
+                        connection.execute(insert(SyncOutbox), [{'VideoID': v, 'Reason': reason} for v in video_ids])
+                        DatabaseService.refresh_read_model(connection, video_ids)
+            if any(report['inserted'].values()):
+                CatalogVersionService.record(connection)
+
+    @staticmethod
+    def _values(model, row: Dict) -> Dict:
+        """Column values of a row, converted to the column types; ValueError describes the first problem"""
+        values = {}
+        for column in model.__table__.columns:
+            raw = row.get(column.name)
+            if isinstance(raw, str):
+                raw = raw.strip()
+            if raw is None or raw == '':
+                if not column.nullable and not (column.primary_key and column.autoincrement):
+                    raise ValueError(f"{column.name} is required")
+                continue
+            try:
+                if isinstance(column.type, Integer):
+                    value = int(raw)
+                elif isinstance(column.type, DateTime):
+                    value = raw if isinstance(raw, datetime) else datetime.fromisoformat(str(raw))
+                else:
+                    value = str(raw)
+            except (TypeError, ValueError):
+                raise ValueError(f"{column.name}: invalid value {raw!r}")
+            if isinstance(column.type, String) and column.type.length and len(value) > column.type.length:
+                raise ValueError(f"{column.name} is longer than {column.type.length} characters")
+            values[column.name] = value
+        return values
+
+    def _insert(self, connection, model, rows: List[Tuple[int, Dict]], report: Dict) -> List[Dict]:
+        """executemany the rows; on failure retry them one by one and report the rejected ones"""
+        if not rows:
+            return []
+        # Rows with different column sets go in separate statements (executemany needs uniform keys)
+        groups: Dict[Tuple[str, ...], List[Tuple[int, Dict]]] = {}
+        for line, values in rows:
+            groups.setdefault(tuple(sorted(values)), []).append((line, values))
+
+        inserted = []
+        for group in groups.values():
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(model), [values for _, values in group])
+                inserted.extend(values for _, values in group)
+                continue
+            except DBAPIError:
+                pass
+            for line, values in group:
+                try:
+                    with connection.begin_nested():
+                        connection.execute(insert(model), values)
+                    inserted.append(values)
+                except DBAPIError as e:
+                    self._error(report, line, model.__tablename__, str(e.orig))
+        return inserted
+
+
+class _NameResolver:
+    """Maps the Work/Music names used by one chunk to their IDs with one query per referenced table"""
+
+    def __init__(self, connection, table: str, rows: List[Tuple[int, Dict]]):
+        self.table = table
+        self.works: Dict[str, List[int]] = {}
+        self.music: Dict[str, List[Tuple[int, int]]] = {}
+
+        def names(field: str):
+            return {str(row[field]).strip() for _, row in rows if row.get(field) not in (None, '')}
+
+        work_names = names('Work')
+        if work_names:
+            self.works = self._lookup(connection, Work, Work.WorkID, work_names)
+        music_names = names('Music') if table == 'Style' else set()
+        if music_names:
+            self.music = self._lookup(connection, Music, (Music.MusicID, Music.WorkID), music_names)
+
+    @staticmethod
+    def _lookup(connection, model, key, names):
+        keys = key if isinstance(key, tuple) else (key,)
+        name_columns = [getattr(model, field) for field in NAME_FIELDS]
+        query = select(*keys, *name_columns).where(or_(*(column.in_(names) for column in name_columns)))
+        found: Dict[str, list] = {}
+        for row in connection.execute(query):
+            ids = tuple(row[:len(keys)]) if len(keys) > 1 else row[0]
+            for name in set(row[len(keys):]):
+                if name in names:
+                    found.setdefault(name, []).append(ids)
+        return found
+
+    @staticmethod
+    def _unique(matches: list, kind: str, name: str):
+        if not matches:
+            raise ValueError(f"{kind} {name!r} not found")
+        if len(set(matches)) > 1:
+            raise ValueError(f"{kind} {name!r} is ambiguous ({len(set(matches))} matches)")
+        return matches[0]
+
+    def resolve(self, row: Dict) -> Dict:
+        """Row with name references replaced by IDs (explicit IDs win)"""
+        row = dict(row)
+        work_name = str(row.get('Work') or '').strip()
+        if self.table == 'Music' and work_name and not row.get('WorkID'):
+            row['WorkID'] = self._unique(self.works.get(work_name, []), 'Work', work_name)
+        music_name = str(row.get('Music') or '').strip()
+        if self.table == 'Style' and music_name and not row.get('MusicID'):
+            matches = self.music.get(music_name, [])
+            if work_name:
+                work_id = self._unique(self.works.get(work_name, []), 'Work', work_name)
+                matches = [match for match in matches if match[1] == work_id]
+            row['MusicID'] = self._unique(matches, 'Music', music_name)[0]
+        return row
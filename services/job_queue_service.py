@@ -0,0 +1,158 @@
+"""
+Job Queue Service
+Database-backed queue of video syncs, shared by worker processes on any number of hosts
+"""
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, or_, select, update
+
+from models import SyncJob
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# Manifest row fields a job carries besides its VideoID
+JOB_FIELDS = ('YouTubeLink', 'SubtitleFolder', 'TagReference', 'Tags', 'UploadID', 'Resume')
+
+
+class JobQueue:
+    """SyncJob rows moved through queued -> running -> done/failed
+
+    Workers claim with SELECT ... FOR UPDATE SKIP LOCKED (MariaDB 10.6+, MySQL 8), so concurrent
+    claims skip rows another worker is locking instead of queueing behind it. The claiming UPDATE is
+    also guarded by Status, so backends that ignore the lock clause (SQLite) never hand a job out twice.
+    """
+
+    def __init__(self, engine, max_attempts: int = 3, stale_seconds: float = 120):
+        self.engine = engine
+        self.max_attempts = max_attempts
+        # Running jobs whose heartbeat is older than this belong to a dead worker
+        self.stale_seconds = stale_seconds
+
+    def enqueue(self, items: Iterable[Dict]) -> List[int]:
+        """Queue manifest rows ({'VideoID', ...JOB_FIELDS}); a video already waiting keeps its job"""
+        items = list(items)
+        with self.engine.begin() as connection:
+            waiting = dict(connection.execute(
+                select(SyncJob.VideoID, func.min(SyncJob.ID))
+                .where(SyncJob.Status == QUEUED, SyncJob.VideoID.in_([int(item['VideoID']) for item in items]))
+                .group_by(SyncJob.VideoID)
+            ).all()) if items else {}
+
+            job_ids = []
+            for item in items:
+                video_id = int(item['VideoID'])
+                if video_id not in waiting:
+                    payload = {field: item[field] for field in JOB_FIELDS if item.get(field)}
+                    result = connection.execute(SyncJob.__table__.insert().values(
+                        VideoID=video_id, Status=QUEUED, Payload=json.dumps(payload), Attempts=0,
+                        CreatedAt=datetime.utcnow()
+                    ))
+                    waiting[video_id] = result.inserted_primary_key[0]
+                job_ids.append(waiting[video_id])
+            return job_ids
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """Oldest runnable job, now running for this worker (None when the queue is empty)"""
+        # A lost race (only possible without SKIP LOCKED) moves on to the next row
+        for _ in range(5):
+            now = datetime.utcnow()
+            with self.engine.begin() as connection:
+                row = connection.execute(
+                    select(SyncJob.ID, SyncJob.VideoID, SyncJob.Payload, SyncJob.Attempts)
+                    .where(SyncJob.Status == QUEUED, or_(SyncJob.RunAfter.is_(None), SyncJob.RunAfter <= now))
+                    .order_by(SyncJob.ID)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                ).first()
+                if row is None:
+                    return None
+                claimed = connection.execute(
+                    update(SyncJob)
+                    .where(SyncJob.ID == row.ID, SyncJob.Status == QUEUED)
+                    .values(Status=RUNNING, WorkerID=worker_id, Attempts=SyncJob.Attempts + 1,
+                            StartedAt=now, HeartbeatAt=now, RunAfter=None)
+                ).rowcount
+            if claimed:
+                job = {field: None for field in JOB_FIELDS}
+                job.update(json.loads(row.Payload or '{}'))
+                job.update({'ID': row.ID, 'VideoID': row.VideoID, 'Attempts': row.Attempts + 1})
+                return job
+        return None
+
+    def heartbeat(self, worker_id: str, job_ids: Iterable[int]) -> int:
+        """Mark this worker's running jobs alive; returns how many it still owns"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        with self.engine.begin() as connection:
+            return connection.execute(
+                update(SyncJob)
+                .where(SyncJob.ID.in_(job_ids), SyncJob.WorkerID == worker_id, SyncJob.Status == RUNNING)
+                .values(HeartbeatAt=datetime.utcnow())
+            ).rowcount
+
+    def finish(self, job_id: int, worker_id: str, result: Dict, retry_after: float = 0) -> bool:
+        """Record a BatchService result: success -> done, skipped (circuit open) -> queued again after
+        retry_after seconds, anything else -> failed. False when the job was requeued meanwhile."""
+        now = datetime.utcnow()
+        if result['status'] == 'success':
+            values = {'Status': DONE, 'FinishedAt': now, 'Error': None}
+        elif result['status'] == 'skipped':
+            # Never started: does not count as an attempt
+            values = {'Status': QUEUED, 'WorkerID': None, 'Attempts': SyncJob.Attempts - 1,
+                      'RunAfter': now + timedelta(seconds=retry_after), 'Error': result.get('error')}
+        else:
+            values = {'Status': FAILED, 'FinishedAt': now, 'Error': result.get('error')}
+        values['Result'] = json.dumps(result, default=str)
+
+        with self.engine.begin() as connection:
+            return bool(connection.execute(
+                update(SyncJob)
+                .where(SyncJob.ID == job_id, SyncJob.WorkerID == worker_id, SyncJob.Status == RUNNING)
+                .values(**values)
+            ).rowcount)
+
+    def requeue_stale(self) -> Dict[str, int]:
+        """Give jobs of workers that stopped sending heartbeats to another worker (or fail them after
+        max_attempts); workers run retries with resume, skipping the YouTube writes already completed"""
+        now = datetime.utcnow()
+        stale = [SyncJob.Status == RUNNING, SyncJob.HeartbeatAt < now - timedelta(seconds=self.stale_seconds)]
+        with self.engine.begin() as connection:
+            failed = connection.execute(
+                update(SyncJob)
+                .where(*stale, SyncJob.Attempts >= self.max_attempts)
+                .values(Status=FAILED, FinishedAt=now, Error="Worker stopped sending heartbeats")
+            ).rowcount
+            requeued = connection.execute(
+                update(SyncJob)
+                .where(*stale)
+                .values(Status=QUEUED, WorkerID=None, Error="Requeued after worker stopped sending heartbeats")
+            ).rowcount
+        if failed or requeued:
+            print(f"⚠ Stale sync jobs: {requeued} requeued, {failed} failed after {self.max_attempts} attempts")
+        return {'requeued': requeued, 'failed': failed}
+
+    def counts(self) -> Dict[str, int]:
+        """{status: number of jobs}"""
+        with self.engine.connect() as connection:
+            counts = dict(connection.execute(
+                select(SyncJob.Status, func.count()).group_by(SyncJob.Status)
+            ).all())
+        return {status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)}
+
+    def get(self, job_ids: Iterable[int]) -> List[Dict]:
+        """Status of some jobs, JSON-ready for polling clients"""
+        columns = (SyncJob.ID, SyncJob.VideoID, SyncJob.Status, SyncJob.Attempts, SyncJob.WorkerID,
+                   SyncJob.CreatedAt, SyncJob.StartedAt, SyncJob.FinishedAt, SyncJob.Error)
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(*columns).where(SyncJob.ID.in_([int(j) for j in job_ids])).order_by(SyncJob.ID)
+            ).all()
+        return [{key: value.isoformat() if isinstance(value, datetime) else value
+                 for key, value in row._mapping.items()} for row in rows]
@@ -0,0 +1,239 @@
+"""
+Metrics Service
+Minimal in-process metrics registry rendered in the Prometheus text exposition format
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ''
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    type_name = 'gauge'
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track(self, **labels):
+        """Increment while the block runs (e.g. in-flight syncs)"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series: Dict[Tuple, Dict] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, dict(series, counts=list(series['counts']))) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, {'le': _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ['method', 'route', 'status']
+)
+SYNC_STAGE_SECONDS = REGISTRY.histogram(
+    'sync_stage_duration_seconds', 'Duration of each video sync stage', ['stage']
+)
+SYNC_SECONDS = REGISTRY.histogram(
+    'sync_duration_seconds', 'Total duration of a video sync', ['outcome']
+)
+SYNC_IN_FLIGHT = REGISTRY.gauge(
+    'sync_in_flight', 'Video syncs currently running'
+)
+SYNC_IN_FLIGHT.set(0)
+SYNC_YOUTUBE_CALLS = REGISTRY.histogram(
+    'sync_youtube_calls', 'YouTube API calls made by one video sync', buckets=COUNT_BUCKETS
+)
+SYNC_DB_QUERIES = REGISTRY.histogram(
+    'sync_db_queries', 'Database queries made by one video sync', buckets=COUNT_BUCKETS
+)
+YOUTUBE_CALLS = REGISTRY.counter(
+    'youtube_api_calls_total', 'YouTube API call attempts by method and outcome', ['method', 'outcome']
+)
+SNAPSHOT_LOOKUPS = REGISTRY.counter(
+    'youtube_snapshot_lookups_total', 'Video snapshot reads by result (hit, not_modified, fetched)', ['result']
+)
+DB_QUERIES = REGISTRY.counter(
+    'db_queries_total', 'SQL statements executed'
+)
+
+
+class SyncCounts:
+    """YouTube requests sent and SQL statements executed by one video sync"""
+
+    def __init__(self):
+        self.youtube_calls = 0
+        self.db_queries = 0
+
+
+# Context-local, so concurrent syncs (and their asyncio.to_thread work) each count only their own calls
+_current_sync: ContextVar[Optional[SyncCounts]] = ContextVar('sync_counts', default=None)
+
+
+@contextmanager
+def track_sync():
+    """Count the enclosed sync's calls and observe them in SYNC_YOUTUBE_CALLS / SYNC_DB_QUERIES"""
+    counts = SyncCounts()
+    token = _current_sync.set(counts)
+    try:
+        yield counts
+    finally:
+        _current_sync.reset(token)
+        SYNC_YOUTUBE_CALLS.observe(counts.youtube_calls)
+        SYNC_DB_QUERIES.observe(counts.db_queries)
+
+
+def count_youtube_request():
+    """A YouTube request is about to be sent (short-circuited calls are not counted)"""
+    counts = _current_sync.get()
+    if counts is not None:
+        counts.youtube_calls += 1
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERIES.inc()
+    counts = _current_sync.get()
+    if counts is not None:
+        counts.db_queries += 1
+
+
+def instrument_engines():
+    """Count SQL statements from every engine (app, DatabaseService, SQLAdmin)"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    if not event.contains(Engine, 'after_cursor_execute', _count_query):
+        event.listen(Engine, 'after_cursor_execute', _count_query)
@@ -0,0 +1,219 @@
+"""
+Name Index Service
+In-memory substring index over name columns, used by the admin relationship pickers instead of LIKE queries
+"""
+import heapq
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+
+# Grams up to this length are indexed; longer terms intersect their trigrams and verify the match
+MAX_GRAM = 3
+
+
+def _normalize(value) -> str:
+    return str(value).casefold() if value is not None else ''
+
+
+def _grams(text: str) -> Set[str]:
+    grams = set()
+    for size in range(1, MAX_GRAM + 1):
+        for start in range(len(text) - size + 1):
+            grams.add(text[start:start + size])
+    return grams
+
+
+class NameIndex:
+    """Case-insensitive substring index (same matches as `ILIKE '%term%'`) over some columns of one model"""
+
+    def __init__(self, model, fields: Tuple[str, ...]):
+        self.model = model
+        self.fields = tuple(fields)
+        self.pk_name = inspect(model).primary_key[0].name
+        self.ready = False
+        self._texts: Dict[int, Tuple[str, ...]] = {}
+        self._labels: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        # Committed changes seen while a build reads the table, replayed onto its result (None: no build)
+        self._replay: Optional[List[Tuple[str, object]]] = None
+        self._lock = threading.Lock()
+
+    def _add(self, pk: int, texts: Tuple[str, ...], label: str):
+        self._texts[pk] = texts
+        self._labels[pk] = label
+        for gram in set().union(*(_grams(text) for text in texts)):
+            self._postings.setdefault(gram, set()).add(pk)
+
+    def _remove(self, pk: int):
+        texts = self._texts.pop(pk, None)
+        self._labels.pop(pk, None)
+        if texts is None:
+            return
+        for gram in set().union(*(_grams(text) for text in texts)):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(pk)
+                if not postings:
+                    del self._postings[gram]
+
+    def entry(self, obj) -> Tuple[int, Tuple[str, ...], str]:
+        """(pk, normalized field texts, label) for one model instance"""
+        pk = getattr(obj, self.pk_name)
+        return pk, tuple(_normalize(getattr(obj, field)) for field in self.fields), str(obj)
+
+    def build(self, session: Session, batch_size: int = 1000):
+        """Load every row once; labels are the model's repr, as SQLAdmin shows them"""
+        start = time.perf_counter()
+        with self._lock:
+            self._replay = []
+        texts, labels = {}, {}
+        try:
+            for obj in session.execute(select(self.model).execution_options(yield_per=batch_size)).scalars():
+                pk, row_texts, label = self.entry(obj)
+                texts[pk], labels[pk] = row_texts, label
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+
+        with self._lock:
+            self._texts, self._labels, self._postings = {}, {}, {}
+            for pk in texts:
+                self._add(pk, texts[pk], labels[pk])
+            # Edits committed during the read may be missing from it (or older than it): apply them again
+            for action, value in self._replay:
+                self._apply(action, value)
+            self._replay = None
+            self.ready = True
+        print(f"✓ Name index {self.model.__name__}{self.fields}: {len(texts)} rows, "
+              f"{len(self._postings)} grams in {time.perf_counter() - start:.2f}s")
+
+    def _apply(self, action: str, value):
+        if action == 'upsert':
+            pk, texts, label = value
+            self._remove(pk)
+            self._add(pk, texts, label)
+        else:
+            self._remove(value)
+
+    def _change(self, action: str, value):
+        with self._lock:
+            self._apply(action, value)
+            if self._replay is not None:
+                self._replay.append((action, value))
+
+    def upsert(self, entry: Tuple[int, Tuple[str, ...], str]):
+        self._change('upsert', entry)
+
+    def delete(self, pk: int):
+        self._change('delete', pk)
+
+    def search(self, term: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """[(pk, label)] of the lowest primary keys whose fields contain `term`"""
+        term = _normalize(term)
+        if not term:
+            return []
+        with self._lock:
+            if len(term) <= MAX_GRAM:
+                matches: Iterable[int] = self._postings.get(term, ())
+            else:
+                grams = [term[i:i + MAX_GRAM] for i in range(len(term) - MAX_GRAM + 1)]
+                postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+                candidates = set.intersection(*postings) if postings[0] else set()
+                matches = [pk for pk in candidates if any(term in text for text in self._texts[pk])]
+            return [(pk, self._labels[pk]) for pk in heapq.nsmallest(limit, matches)]
+
+
+class NameIndexService:
+    """Owns the picker indexes and keeps them in sync with committed ORM writes"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._indexes: Dict[Tuple, NameIndex] = {}
+        # Indexes with a build thread running, and those whose build must run once more when it ends
+        self._building: Set[NameIndex] = set()
+        self._rebuild: Set[NameIndex] = set()
+        self._lock = threading.Lock()
+
+    def index_for(self, model, fields: Iterable[str]) -> NameIndex:
+        """Index for (model, fields); a new one starts building in the background"""
+        key = (model, tuple(fields))
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                return index
+            index = self._indexes[key] = NameIndex(model, key[1])
+        self._start_build(index)
+        return index
+
+    def _start_build(self, index: NameIndex):
+        """Build in the background; while a build runs, ask it for one more pass instead of starting another"""
+        with self._lock:
+            if index in self._building:
+                self._rebuild.add(index)
+                return
+            self._building.add(index)
+        threading.Thread(target=self._build, args=(index,), name="name-index", daemon=True).start()
+
+    def _build(self, index: NameIndex):
+        while True:
+            with self._lock:
+                self._rebuild.discard(index)
+            session = Session(self.engine)
+            try:
+                index.build(session)
+            except Exception as e:
+                print(f"✗ Failed to build name index for {index.model.__name__}: {e}")
+            finally:
+                session.close()
+            with self._lock:
+                if index not in self._rebuild:
+                    self._building.discard(index)
+                    return
+
+    def refresh(self, models: Iterable = ()):
+        """Rebuild the indexes of these models in the background (after writes that bypass the ORM)"""
+        models = tuple(models)
+        for (model, _), index in list(self._indexes.items()):
+            if model in models:
+                self._start_build(index)
+
+    def warm(self, specs: Iterable[Tuple]):
+        """Start building indexes for (model, fields) pairs, e.g. at startup"""
+        for model, fields in specs:
+            self.index_for(model, fields)
+
+    def register(self):
+        """Apply inserts, edits and deletes to the indexes once their transaction commits"""
+        if not event.contains(Session, 'after_flush', self._after_flush):
+            event.listen(Session, 'after_flush', self._after_flush)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+
+    def _indexes_of(self, obj) -> List[NameIndex]:
+        return [index for (model, _), index in list(self._indexes.items()) if isinstance(obj, model)]
+
+    def _after_flush(self, session, flush_context):
+        # Entries are computed now: after commit the instances are expired
+        pending = session.info.setdefault('name_index_pending', [])
+        for obj in list(session.new) + list(session.dirty):
+            for index in self._indexes_of(obj):
+                pending.append((index, 'upsert', index.entry(obj)))
+        for obj in session.deleted:
+            for index in self._indexes_of(obj):
+                pending.append((index, 'delete', getattr(obj, index.pk_name)))
+
+    def _after_commit(self, session):
+        for index, action, value in session.info.pop('name_index_pending', []):
+            if action == 'upsert':
+                index.upsert(value)
+            else:
+                index.delete(value)
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop('name_index_pending', None)
@@ -0,0 +1,260 @@
+"""
+Profiling Service
+Opt-in profiling of single requests or CLI runs, saved as pstats or collapsed stacks (flamegraph input)
+"""
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+PROFILE_MODES = ('cprofile', 'sample')
+
+
+class SamplingProfiler:
+    """Samples the stacks of a set of threads at a fixed interval and aggregates collapsed stacks
+
+    `include(thread_id)` may veto a sample, e.g. of an event loop busy with another request's task.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005, include: Optional[Callable[[int], bool]] = None):
+        self.thread_ids = Counter({thread_id: 1})
+        self.interval = interval
+        self.include = include
+        self.samples = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def add_thread(self, thread_id: int):
+        with self._lock:
+            self.thread_ids[thread_id] += 1
+
+    def remove_thread(self, thread_id: int):
+        with self._lock:
+            self.thread_ids[thread_id] -= 1
+            if self.thread_ids[thread_id] <= 0:
+                del self.thread_ids[thread_id]
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                thread_ids = list(self.thread_ids)
+            for thread_id in thread_ids:
+                if self.include is not None and not self.include(thread_id):
+                    continue
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}")
+                    frame = frame.f_back
+                if stack:
+                    self.samples[';'.join(reversed(stack))] += 1
+
+    def write_folded(self, path: Path):
+        """Write `frame;frame;frame count` lines for flamegraph.pl / speedscope"""
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileSession:
+    """A profile in progress: the profiled thread plus the worker-thread calls made from its context"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.closed = False
+        # Event loop tasks of the profiled request (see ProfilingService.install)
+        self.tasks = weakref.WeakSet()
+        self.sampler: Optional[SamplingProfiler] = None
+        self.thread_profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """Call fn in this (worker) thread, profiled as part of the session"""
+        if self.closed:
+            return fn(*args, **kwargs)
+        if self.mode == 'sample':
+            thread_id = threading.get_ident()
+            self.sampler.add_thread(thread_id)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.sampler.remove_thread(thread_id)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with self._lock:
+                self.thread_profilers.append(profiler)
+
+
+# Session of the request (or CLI run) being profiled; copied into tasks and asyncio.to_thread calls
+_active_session: ContextVar[Optional[ProfileSession]] = ContextVar('profile_session', default=None)
+
+
+class ProfilingExecutor(ThreadPoolExecutor):
+    """Default executor (asyncio.to_thread) that profiles calls submitted from a profiled request"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        # submit() runs in the caller's context, so the session is the one of the awaiting request
+        session = _active_session.get()
+        if session is not None and not session.closed:
+            return super().submit(session.run, fn, *args, **kwargs)
+        return super().submit(fn, *args, **kwargs)
+
+
+class ProfilingService:
+    def __init__(self, directory: str = 'profiles', enabled: bool = False, default_mode: str = 'cprofile'):
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.default_mode = default_mode if default_mode in PROFILE_MODES else 'cprofile'
+        # Only one profiler can be active per process
+        self._lock = threading.Lock()
+
+    def install(self, loop: asyncio.AbstractEventLoop):
+        """Follow profiled requests into the loop's worker threads and tasks (call from the app's lifespan)
+
+        Work offloaded with asyncio.to_thread is profiled with its request; in sample mode the loop thread
+        is only sampled while one of the request's tasks runs. Other thread pools (e.g. Starlette's for sync
+        endpoints and iterators) are not followed.
+        """
+        loop.set_default_executor(ProfilingExecutor(thread_name_prefix='asyncio'))
+        previous_factory = loop.get_task_factory()
+
+        def task_factory(loop, coro, context=None):
+            kwargs = {} if context is None else {'context': context}
+            if previous_factory is not None:
+                task = previous_factory(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            session = context.get(_active_session) if context is not None else _active_session.get()
+            if session is not None and not session.closed:
+                session.tasks.add(task)
+            return task
+
+        loop.set_task_factory(task_factory)
+
+    def resolve_mode(self, flag: Optional[str]) -> Optional[str]:
+        """Map a header/query flag value to a profiler mode, or None when not profiling"""
+        if not self.enabled or not flag or flag.lower() in ('0', 'false', 'off'):
+            return None
+        flag = flag.lower()
+        return flag if flag in PROFILE_MODES else self.default_mode
+
+    @contextmanager
+    def profile(self, label: str, mode: Optional[str] = None):
+        """Profile the enclosed block and save the dump; yields the output path (None if busy)"""
+        mode = mode or self.default_mode
+        if not self._lock.acquire(blocking=False):
+            yield None
+            return
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+            safe_label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_')[:80]
+            base = self.directory / f"{stamp}_{safe_label}"
+            start = time.perf_counter()
+            session = ProfileSession(mode)
+            token = _active_session.set(session)
+
+            if mode == 'sample':
+                session.sampler = SamplingProfiler(threading.get_ident(), include=self._loop_filter(session))
+                path = base.with_name(base.name + '.folded')
+                session.sampler.start()
+                try:
+                    yield path
+                finally:
+                    session.closed = True
+                    session.sampler.stop()
+                    session.sampler.write_folded(path)
+            else:
+                profiler = cProfile.Profile()
+                path = base.with_name(base.name + '.pstats')
+                profiler.enable()
+                try:
+                    yield path
+                finally:
+                    profiler.disable()
+                    session.closed = True
+                    stats = pstats.Stats(profiler)
+                    with session._lock:
+                        if session.thread_profilers:
+                            stats.add(*session.thread_profilers)
+                    stats.dump_stats(str(path))
+                    self._write_summary(stats, base.with_name(base.name + '.txt'))
+
+            # A streamed response finishes the profile from another context; that one ends with its request
+            with suppress(ValueError):
+                _active_session.reset(token)
+            print(f"⏱ Profile saved: {path} ({time.perf_counter() - start:.3f}s)")
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _loop_filter(session: ProfileSession) -> Optional[Callable[[int], bool]]:
+        """Inside an event loop: sample the loop thread only while it runs one of the session's tasks"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        loop_thread_id = threading.get_ident()
+        task = asyncio.current_task(loop)
+        if task is not None:
+            session.tasks.add(task)
+        return lambda thread_id: thread_id != loop_thread_id or asyncio.current_task(loop) in session.tasks
+
+    @staticmethod
+    def _write_summary(stats: pstats.Stats, path: Path, limit: int = 40):
+        """Human-readable top functions by cumulative time next to the pstats dump"""
+        buffer = io.StringIO()
+        stats.stream = buffer
+        stats.sort_stats('cumulative').print_stats(limit)
+        path.write_text(buffer.getvalue())
+
+    def list_profiles(self) -> List[Dict]:
+        if not self.directory.exists():
+            return []
+        profiles = []
+        for path in sorted(self.directory.iterdir(), reverse=True):
+            if path.suffix in ('.pstats', '.folded', '.txt'):
+                stat = path.stat()
+                profiles.append({
+                    'name': path.name,
+                    'size': stat.st_size,
+                    'created': datetime.fromtimestamp(stat.st_mtime).isoformat()
+                })
+        return profiles
+
+    def get_path(self, name: str) -> Optional[Path]:
+        """Resolve a profile file name without allowing path traversal"""
+        path = (self.directory / name).resolve()
+        if path.parent != self.directory.resolve() or not path.is_file():
+            return None
+        return path
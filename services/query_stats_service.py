@@ -0,0 +1,78 @@
+"""
+Query Stats Service
+Per-request SQL query counts and timings, slow-query logging and repeated-statement (N+1) detection
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """SQL statistics collected while one request (or CLI command) runs"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Identical statements executed at least `threshold` times (typical N+1 lazy loads)"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+
+class QueryStatsService:
+    def __init__(self, slow_query_ms: float = 200, repeat_threshold: int = 5):
+        self.slow_query_ms = slow_query_ms
+        self.repeat_threshold = repeat_threshold
+
+    def install(self):
+        """Hook cursor execution on every engine"""
+        if not event.contains(Engine, 'before_cursor_execute', self._before_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_execute)
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        # On the statement's execution context, so a failed statement leaves nothing behind
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_query_start', None)
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+
+        if duration * 1000 >= self.slow_query_ms:
+            where = f" [{stats.label}]" if stats is not None else ""
+            print(f"🐢 Slow query ({duration * 1000:.1f} ms){where}: {' '.join(statement.split())} -- params: {parameters!r}")
+
+    @contextmanager
+    def track(self, label: str):
+        """Collect query stats for the enclosed block and report repeated statements afterwards"""
+        stats = QueryStats(label)
+        token = _current_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            _current_stats.reset(token)
+            for statement, count in stats.repeated(self.repeat_threshold):
+                print(f"⚠ Possible N+1 in {label}: statement ran {count}x: {' '.join(statement.split())[:200]}")
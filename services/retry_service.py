@@ -0,0 +1,210 @@
+"""
+Retry Service
+Classified retries with jittered exponential backoff and a circuit breaker for YouTube API calls
+"""
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from services.metrics_service import YOUTUBE_CALLS, count_youtube_request
+
+
+RETRYABLE = 'retryable'
+QUOTA = 'quota'
+FATAL = 'fatal'
+
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"YouTube API circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class QuotaExceededError(Exception):
+    """Raised instead of sending a call whose quota cost no longer fits today's remaining units"""
+
+    def __init__(self, method: str, remaining: int):
+        super().__init__(f"YouTube API quota: {method} does not fit the {remaining} units left today")
+        self.method = method
+        self.remaining = remaining
+
+
+def _status_and_reason(error: Exception) -> Tuple[Optional[int], Optional[str]]:
+    """Extract HTTP status and Google error reason from googleapiclient or requests errors"""
+    status, content = None, None
+
+    resp = getattr(error, 'resp', None)  # googleapiclient.errors.HttpError
+    if resp is not None:
+        status = getattr(resp, 'status', None)
+        content = getattr(error, 'content', None)
+
+    response = getattr(error, 'response', None)  # requests.HTTPError
+    if status is None and response is not None:
+        status = getattr(response, 'status_code', None)
+        content = getattr(response, 'content', None)
+
+    reason = None
+    details = getattr(error, 'error_details', None)
+    if isinstance(details, list) and details and isinstance(details[0], dict):
+        reason = details[0].get('reason')
+    if reason is None and content:
+        try:
+            payload = json.loads(content)
+            reason = payload['error']['errors'][0]['reason']
+        except (ValueError, KeyError, IndexError, TypeError):
+            pass
+
+    return (int(status) if status is not None else None), reason
+
+
+def classify_error(error: Exception) -> str:
+    """Classify an API error as retryable, quota (stop everything) or fatal (do not retry)"""
+    status, reason = _status_and_reason(error)
+    if status is None:
+        # Connection resets, timeouts, DNS failures
+        return RETRYABLE if isinstance(error, OSError) else FATAL
+    if reason in QUOTA_REASONS:
+        return QUOTA
+    if status == 429 or reason in RATE_LIMIT_REASONS or status >= 500:
+        return RETRYABLE
+    return FATAL
+
+
+class CircuitBreaker:
+    """Opens after repeated 5xx/quota failures so batch work stops hammering a failing API"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0,
+                 quota_reset_timeout: float = 3600.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.quota_reset_timeout = quota_reset_timeout
+        self._failures = 0
+        self._opened_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.retry_after() > 0
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe call through (0 when closed)"""
+        with self._lock:
+            return max(0.0, self._opened_until - time.monotonic())
+
+    def before_call(self):
+        remaining = self.retry_after()
+        if remaining > 0:
+            raise CircuitOpenError(remaining)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_until = 0.0
+
+    def record_failure(self, kind: str):
+        with self._lock:
+            if kind == QUOTA:
+                self._opened_until = time.monotonic() + self.quota_reset_timeout
+                return
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_until = time.monotonic() + self.reset_timeout
+
+    def open_for(self, seconds: float):
+        """Open the breaker for a known cooldown (e.g. until the daily quota resets)"""
+        with self._lock:
+            self._opened_until = max(self._opened_until, time.monotonic() + seconds)
+
+    def state(self) -> Dict:
+        remaining = self.retry_after()
+        return {'open': remaining > 0, 'retry_after': round(remaining, 1), 'failures': self._failures}
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 32.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class ApiCaller:
+    """Runs API calls through the retry policy and circuit breaker, remembering the last outcome
+
+    With a quota ledger (see account_service.QuotaLedger) every attempt is charged up front. A call that
+    would overrun the daily quota fails on its own (cheaper calls may still fit); once not even a 1-unit
+    call fits, the breaker opens until the quota resets.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 sleep: Callable[[float], None] = time.sleep, ledger=None):
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self.ledger = ledger
+        self._local = threading.local()
+
+    @property
+    def last_outcome(self) -> Optional[Dict]:
+        return getattr(self._local, 'last_outcome', None)
+
+    def call(self, fn: Callable, method: str):
+        """Call fn() with retries; raises the final error after recording the outcome"""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as e:
+                self._record(method, 'circuit_open', attempt - 1, e)
+                raise
+
+            if self.ledger is not None and not self.ledger.charge(method):
+                remaining = self.ledger.state()['remaining']
+                if remaining < 1:
+                    self.breaker.open_for(self.ledger.seconds_until_reset())
+                    error = CircuitOpenError(self.breaker.retry_after())
+                else:
+                    error = QuotaExceededError(method, remaining)
+                self._record(method, 'quota_exceeded', attempt - 1, error)
+                raise error
+
+            count_youtube_request()
+            try:
+                result = fn()
+            except Exception as e:
+                kind = classify_error(e)
+                if kind == RETRYABLE and attempt < self.policy.max_attempts:
+                    YOUTUBE_CALLS.inc(method=method, outcome='retried')
+                    delay = self.policy.delay(attempt - 1)
+                    print(f"⚠ {method} failed ({e.__class__.__name__}), retry {attempt}/{self.policy.max_attempts - 1} in {delay:.1f}s")
+                    self.sleep(delay)
+                    continue
+                if kind in (RETRYABLE, QUOTA):
+                    self.breaker.record_failure(kind)
+                self._record(method, 'quota_exceeded' if kind == QUOTA else 'failed', attempt, e)
+                raise
+
+            self.breaker.record_success()
+            self._record(method, 'ok', attempt)
+            return result
+
+    def _record(self, method: str, status: str, attempts: int, error: Optional[Exception] = None):
+        YOUTUBE_CALLS.inc(method=method, outcome=status)
+        self._local.last_outcome = {
+            'method': method,
+            'status': status,
+            'attempts': attempts,
+            'error': str(error) if error else None
+        }
@@ -0,0 +1,75 @@
+"""
+Snapshot Service
+Last known remote state (snippet, localizations, status, contentDetails) per YouTube video, with ETags
+"""
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class SnapshotStore:
+    """In-memory snapshot cache, optionally persisted as one JSON file per YouTube id"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory) if directory else None
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, video_id: str) -> Optional[Path]:
+        if self.directory is None or not re.fullmatch(r'[A-Za-z0-9_-]+', video_id or ''):
+            return None
+        return self.directory / f"{video_id}.json"
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        """Entry {'etag', 'item', 'fetched_at', 'source'} or None"""
+        with self._lock:
+            entry = self._entries.get(video_id)
+        if entry is not None:
+            return entry
+
+        path = self._path(video_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._entries[video_id] = entry
+        return entry
+
+    def put(self, video_id: str, item: Dict, etag: Optional[str], source: str = 'list') -> Dict:
+        """Store a full video resource; source is 'list' (revalidate by ETag) or 'update' (our own write)"""
+        entry = {'etag': etag, 'item': item, 'fetched_at': time.time(), 'source': source}
+        with self._lock:
+            self._entries[video_id] = entry
+
+        path = self._path(video_id)
+        if path is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+            tmp_path.write_text(json.dumps(entry, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, path)
+        return entry
+
+    def merge(self, video_id: str, resource: Dict, parts) -> Optional[Dict]:
+        """Write the parts returned by videos.update back into the snapshot (the list ETag no longer applies)"""
+        entry = self.get(video_id)
+        if entry is None:
+            return None
+        item = dict(entry['item'])
+        for part in parts:
+            if part in resource:
+                item[part] = resource[part]
+        return self.put(video_id, item, None, source='update')
+
+    def invalidate(self, video_id: str):
+        with self._lock:
+            self._entries.pop(video_id, None)
+        path = self._path(video_id)
+        if path is not None and path.exists():
+            path.unlink()
@@ -0,0 +1,208 @@
+"""
+Subtitle Store Service
+Content-addressed storage for uploaded subtitle files, shared by every app worker
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class SubtitleStore(ABC):
+    """Uploads are manifests {filename: sha256} pointing at immutable blobs
+
+    Backends implement the abstract blob/manifest primitives below; a shared filesystem works with
+    LocalSubtitleStore, an object store (S3, GCS) needs one subclass with the same methods.
+    """
+
+    def __init__(self, ttl_seconds: float = 24 * 3600):
+        self.ttl_seconds = ttl_seconds
+
+    # Backend primitives
+
+    @abstractmethod
+    def _write_blob(self, digest: str, data: bytes):
+        """Store immutable content under its sha256 (idempotent)"""
+
+    @abstractmethod
+    def _read_blob(self, digest: str) -> bytes:
+        """Content of a stored blob"""
+
+    @abstractmethod
+    def _list_blobs(self) -> List[Tuple[str, float]]:
+        """[(digest, modified timestamp)]"""
+
+    @abstractmethod
+    def _delete_blob(self, digest: str):
+        """Remove a blob; missing blobs are ignored"""
+
+    @abstractmethod
+    def _write_manifest(self, upload_id: str, manifest: Dict):
+        """Store an upload's manifest atomically"""
+
+    @abstractmethod
+    def _read_manifest(self, upload_id: str) -> Optional[Dict]:
+        """Manifest of an upload, or None when missing/unreadable"""
+
+    @abstractmethod
+    def _list_manifests(self) -> List[str]:
+        """Ids of every stored upload"""
+
+    @abstractmethod
+    def _delete_manifest(self, upload_id: str):
+        """Remove an upload's manifest; missing manifests are ignored"""
+
+    # Shared behaviour
+
+    @staticmethod
+    def _valid_upload_id(upload_id: str) -> bool:
+        return bool(upload_id) and len(upload_id) == 32 and all(c in '0123456789abcdef' for c in upload_id)
+
+    def save_upload(self, video_id: int, files: Dict[str, bytes]) -> str:
+        """Store files (filename -> content) and return the upload id referencing them"""
+        manifest_files = {}
+        for filename, data in files.items():
+            digest = hashlib.sha256(data).hexdigest()
+            self._write_blob(digest, data)
+            manifest_files[os.path.basename(filename)] = digest
+
+        upload_id = uuid.uuid4().hex
+        self._write_manifest(upload_id, {
+            'video_id': int(video_id),
+            'files': manifest_files,
+            'created_at': time.time()
+        })
+        return upload_id
+
+    def get_upload(self, upload_id: str) -> Optional[Dict]:
+        """Manifest of an upload, or None when unknown or expired"""
+        if not self._valid_upload_id(upload_id):
+            return None
+        manifest = self._read_manifest(upload_id)
+        if manifest is None or time.time() - manifest['created_at'] > self.ttl_seconds:
+            return None
+        return manifest
+
+    def latest_upload(self, video_id: int) -> Optional[str]:
+        """Newest live upload for a video (for clients that do not pass an upload id)"""
+        return self.latest_uploads().get(int(video_id))
+
+    def latest_uploads(self) -> Dict[int, str]:
+        """Newest live upload of every video that has one, in a single pass over the manifests"""
+        latest: Dict[int, Tuple[float, str]] = {}
+        for upload_id in self._list_manifests():
+            manifest = self.get_upload(upload_id)
+            if manifest and manifest['created_at'] > latest.get(manifest['video_id'], (0.0, None))[0]:
+                latest[manifest['video_id']] = (manifest['created_at'], upload_id)
+        return {video_id: upload_id for video_id, (_, upload_id) in latest.items()}
+
+    @contextmanager
+    def open_local(self, digest: str) -> Iterator[str]:
+        """Path of a local copy of a blob, for APIs that need a file name (MediaFileUpload)"""
+        with tempfile.NamedTemporaryFile(suffix='.srt', delete=False) as f:
+            f.write(self._read_blob(digest))
+        try:
+            yield f.name
+        finally:
+            os.unlink(f.name)
+
+    def delete_upload(self, upload_id: str):
+        """Forget an upload; its blobs are removed by collect_garbage once unreferenced"""
+        if self._valid_upload_id(upload_id):
+            self._delete_manifest(upload_id)
+
+    def collect_garbage(self) -> Dict[str, int]:
+        """Drop expired uploads and blobs older than the TTL that no live upload references"""
+        now = time.time()
+        referenced, expired = set(), 0
+        for upload_id in self._list_manifests():
+            manifest = self._read_manifest(upload_id)
+            if manifest is None or now - manifest['created_at'] > self.ttl_seconds:
+                self._delete_manifest(upload_id)
+                expired += 1
+            else:
+                referenced.update(manifest['files'].values())
+
+        removed = 0
+        for digest, modified in self._list_blobs():
+            # Blobs younger than the TTL may belong to an upload whose manifest is still being written
+            if digest not in referenced and now - modified > self.ttl_seconds:
+                self._delete_blob(digest)
+                removed += 1
+        return {'expired_uploads': expired, 'removed_blobs': removed}
+
+
+class LocalSubtitleStore(SubtitleStore):
+    """Directory backend; point every worker/host at the same (shared) directory"""
+
+    def __init__(self, root: str, ttl_seconds: float = 24 * 3600):
+        super().__init__(ttl_seconds)
+        self.root = Path(root)
+        self.blob_dir = self.root / 'blobs'
+        self.upload_dir = self.root / 'uploads'
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _write_blob(self, digest: str, data: bytes):
+        path = self._blob_path(digest)
+        if path.exists():
+            # Same content already stored; refresh its age so GC keeps it
+            os.utime(path)
+            return
+        self._atomic_write(path, data)
+
+    def _read_blob(self, digest: str) -> bytes:
+        return self._blob_path(digest).read_bytes()
+
+    def _list_blobs(self) -> List[Tuple[str, float]]:
+        if not self.blob_dir.exists():
+            return []
+        return [(path.name, path.stat().st_mtime) for path in self.blob_dir.glob('*/*') if not path.name.startswith('.')]
+
+    def _delete_blob(self, digest: str):
+        self._blob_path(digest).unlink(missing_ok=True)
+
+    def _write_manifest(self, upload_id: str, manifest: Dict):
+        self._atomic_write(self.upload_dir / f"{upload_id}.json", json.dumps(manifest).encode('utf-8'))
+
+    def _read_manifest(self, upload_id: str) -> Optional[Dict]:
+        try:
+            return json.loads((self.upload_dir / f"{upload_id}.json").read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def _list_manifests(self) -> List[str]:
+        if not self.upload_dir.exists():
+            return []
+        return [path.stem for path in self.upload_dir.glob('*.json')]
+
+    def _delete_manifest(self, upload_id: str):
+        (self.upload_dir / f"{upload_id}.json").unlink(missing_ok=True)
+
+    @contextmanager
+    def open_local(self, digest: str) -> Iterator[str]:
+        # Blobs are immutable files already, no copy needed
+        yield str(self._blob_path(digest))
+
+
+def create_subtitle_store(location: str, ttl_seconds: float = 24 * 3600) -> SubtitleStore:
+    """Store for SUBTITLE_STORE: a directory path or file:// URL (other schemes need their own backend)"""
+    if location.startswith('file://'):
+        location = location[len('file://'):]
+    elif '://' in location:
+        raise ValueError(f"Unsupported subtitle store: {location}")
+    return LocalSubtitleStore(location, ttl_seconds)
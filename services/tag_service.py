@@ -4,13 +4,22 @@ Handles tag grabbing and replacement from reference videos
 """
 import os
 import csv
-import requests
 from typing import Optional, List, Dict
 
+from services.retry_service import ApiCaller
+
+
+# YouTube limits a video's tags to 500 characters in total
+TAG_CHARACTER_LIMIT = 500
+
+# videos.list accepts at most 50 ids per call
+MAX_IDS_PER_REQUEST = 50
+
 
 class TagService:
-    def __init__(self, api_key: str, replacement_csv_path: str):
+    def __init__(self, api_key: str, replacement_csv_path: str, caller: Optional[ApiCaller] = None):
         self.api_key = api_key
+        self.caller = caller or ApiCaller()
         self.replacement_csv_path = replacement_csv_path
         self.replacement_dict = self._load_replacement_dict()
     
@@ -28,9 +37,20 @@ class TagService:
     
     def get_video_tags(self, video_id: str) -> Optional[List[str]]:
         """Get tags from a YouTube video"""
+        import requests
+        
         url = f"https://www.googleapis.com/youtube/v3/videos?part=snippet&id={video_id}&key={self.api_key}"
-        response = requests.get(url)
-        data = response.json()
+        
+        def fetch():
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        
+        try:
+            data = self.caller.call(fetch, 'videos.list')
+        except Exception as e:
+            print(f"✗ Error fetching reference tags: {e}")
+            return None
         
         if "items" in data and len(data["items"]) > 0:
             tags = data["items"][0]["snippet"].get("tags", [])
@@ -38,6 +58,31 @@ class TagService:
         
         return None
     
+    def get_tags_for_videos(self, video_ids: List[str]) -> Dict[str, List[str]]:
+        """Get tags of many YouTube videos, 50 ids per request"""
+        import requests
+        
+        unique_ids = list(dict.fromkeys(video_ids))
+        tags_by_video = {}
+        for start in range(0, len(unique_ids), MAX_IDS_PER_REQUEST):
+            chunk = unique_ids[start:start + MAX_IDS_PER_REQUEST]
+            
+            def fetch():
+                response = requests.get("https://www.googleapis.com/youtube/v3/videos", params={
+                    'part': 'snippet', 'id': ','.join(chunk), 'key': self.api_key
+                }, timeout=30)
+                response.raise_for_status()
+                return response.json()
+            
+            try:
+                data = self.caller.call(fetch, 'videos.list')
+            except Exception as e:
+                print(f"✗ Error fetching reference tags: {e}")
+                continue
+            for item in data.get("items", []):
+                tags_by_video[item["id"]] = item["snippet"].get("tags", [])
+        return tags_by_video
+    
     def replace_tags(self, tags: List[str]) -> List[str]:
         """Replace tag words based on replacement dictionary"""
         replaced_tags = []
@@ -61,6 +106,40 @@ class TagService:
         
         return None
     
+    def grab_tags_bulk(self, reference_video_links: List[str]) -> Dict[str, List[str]]:
+        """Replaced tags for many reference videos, keyed by link (links without tags are left out)"""
+        ids = {link: self._extract_video_id(link) for link in reference_video_links}
+        tags_by_video = self.get_tags_for_videos(list(ids.values()))
+        return {
+            link: self.replace_tags(tags_by_video[video_id])
+            for link, video_id in ids.items() if tags_by_video.get(video_id)
+        }
+    
+    @staticmethod
+    def tags_length(tags: List[str]) -> int:
+        """Characters counted against the limit: tags with spaces are quoted, tags are comma-separated"""
+        if not tags:
+            return 0
+        return sum(len(tag) + (2 if ' ' in tag else 0) for tag in tags) + len(tags) - 1
+    
+    @classmethod
+    def merge_tags(cls, existing: List[str], new: List[str], limit: int = TAG_CHARACTER_LIMIT) -> List[str]:
+        """Existing tags followed by new ones, deduplicated case-insensitively and kept within the limit
+        (tags that would overflow are dropped, shorter later tags can still fit)"""
+        merged, seen, used = [], set(), 0
+        for tag in list(existing) + list(new):
+            tag = tag.strip()
+            key = tag.casefold()
+            if not tag or key in seen:
+                continue
+            cost = len(tag) + (2 if ' ' in tag else 0) + (1 if merged else 0)
+            if used + cost > limit:
+                continue
+            merged.append(tag)
+            seen.add(key)
+            used += cost
+        return merged
+    
     @staticmethod
     def _extract_video_id(video_link: str) -> str:
         """Extract YouTube video ID from URL"""
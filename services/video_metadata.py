@@ -0,0 +1,36 @@
+"""
+Video Metadata
+Compact, typed record of the flattened metadata one sync/description/dry-run needs per video
+"""
+from collections import namedtuple
+from typing import Mapping
+
+# Columns flattened into the record, in query order
+VIDEO_METADATA_FIELDS = (
+    'VideoID', 'YouTubeLink', 'UploadTime', 'ZhHantTitle', 'JaTitle', 'EnTitle',
+    'ZhHantDescription', 'JaDescription', 'EnDescription',
+    'ZhHantSubSource', 'JaSubSource', 'EnSubSource',
+    'Instrumental', 'Sheet', 'InstrumentalType', 'SubtitleType', 'GumroadSheet', 'Length'
+)
+STYLE_METADATA_FIELDS = ('ID', 'MusicID', 'Style')
+MUSIC_METADATA_FIELDS = (
+    'WorkID', 'ZhHantName', 'JaName', 'EnName', 'ThemeType', 'SpotifyID', 'MV', 'OfficialArtist'
+)
+# Read-model extras: Work columns (prefixed, Music already uses the plain names) and Role/Creator credits
+WORK_METADATA_FIELDS = {'WorkType': 'Type', 'WorkZhHantName': 'ZhHantName',
+                        'WorkJaName': 'JaName', 'WorkEnName': 'EnName'}
+
+_FIELDS = VIDEO_METADATA_FIELDS + STYLE_METADATA_FIELDS + MUSIC_METADATA_FIELDS + tuple(WORK_METADATA_FIELDS) + ('Credits',)
+
+
+class VideoMetadata(namedtuple('VideoMetadata', _FIELDS, defaults=(None,) * len(WORK_METADATA_FIELDS) + ((),))):
+    """One video's Video + Style + Music (+ Work, Credits) columns as a tuple: no per-instance dict,
+    built straight from a column-projected row with VideoMetadata(*row)"""
+    __slots__ = ()
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> 'VideoMetadata':
+        """Record from a dict (e.g. the JSON read model); unknown keys are ignored"""
+        values = {field: data.get(field) for field in cls._fields}
+        values['Credits'] = tuple(values['Credits'] or ())
+        return cls(**values)
@@ -4,56 +4,64 @@ Handles fetching video metadata from YouTube and syncing to database
 """
 import isodate
 from datetime import datetime, timedelta
-from typing import Dict, Optional
-from googleapiclient.discovery import Resource
+from typing import Dict, Optional, TYPE_CHECKING
+
+from services.retry_service import ApiCaller
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
 
 
 class VideoSyncService:
     @staticmethod
-    def get_video_info(youtube: Resource, video_id: str) -> Optional[Dict]:
+    def get_video_info(youtube: 'Resource', video_id: str, caller: Optional[ApiCaller] = None) -> Optional[Dict]:
         """
         Fetch video information from YouTube API
         Returns: dict with duration (seconds) and scheduled publish time (datetime in UTC+8)
         """
         try:
-            response = youtube.videos().list(
+            request = youtube.videos().list(
                 part="contentDetails,snippet,status",
                 id=video_id
-            ).execute()
+            )
+            response = caller.call(request.execute, 'videos.list') if caller else request.execute()
             
             if "items" not in response or not response["items"]:
                 return None
             
-            video = response["items"][0]
-            
-            # Parse duration (ISO 8601 format like PT3M45S)
-            duration_iso = video["contentDetails"]["duration"]
-            duration_seconds = int(isodate.parse_duration(duration_iso).total_seconds())
-            
-            # Get publish time - prefer publishAt (scheduled) over publishedAt (first upload)
-            publish_time_str = None
-            if "status" in video and "publishAt" in video["status"]:
-                # This is the scheduled publish time
-                publish_time_str = video["status"]["publishAt"]
-            else:
-                # Fall back to publishedAt if no scheduled time
-                publish_time_str = video["snippet"]["publishedAt"]
-            
-            # Parse and convert to UTC+8 (Taipei Time)
-            publish_time_utc = datetime.strptime(publish_time_str, '%Y-%m-%dT%H:%M:%SZ')
-            publish_time_taipei = publish_time_utc + timedelta(hours=8)
-            
-            return {
-                "duration": duration_seconds,
-                "upload_time": publish_time_taipei,
-                "title": video["snippet"]["title"],
-                "description": video["snippet"]["description"]
-            }
+            return VideoSyncService.parse_video_info(response["items"][0])
             
         except Exception as e:
             print(f"Error fetching video info: {e}")
             return None
     
+    @staticmethod
+    def parse_video_info(video: Dict) -> Dict:
+        """Duration (seconds), publish time (UTC+8), title and description from a videos.list item"""
+        # Parse duration (ISO 8601 format like PT3M45S)
+        duration_iso = video["contentDetails"]["duration"]
+        duration_seconds = int(isodate.parse_duration(duration_iso).total_seconds())
+        
+        # Get publish time - prefer publishAt (scheduled) over publishedAt (first upload)
+        publish_time_str = None
+        if "status" in video and "publishAt" in video["status"]:
+            # This is the scheduled publish time
+            publish_time_str = video["status"]["publishAt"]
+        else:
+            # Fall back to publishedAt if no scheduled time
+            publish_time_str = video["snippet"]["publishedAt"]
+        
+        # Parse and convert to UTC+8 (Taipei Time)
+        publish_time_utc = datetime.strptime(publish_time_str, '%Y-%m-%dT%H:%M:%SZ')
+        publish_time_taipei = publish_time_utc + timedelta(hours=8)
+        
+        return {
+            "duration": duration_seconds,
+            "upload_time": publish_time_taipei,
+            "title": video["snippet"]["title"],
+            "description": video["snippet"]["description"]
+        }
+    
     @staticmethod
     def extract_video_id_from_link(youtube_link: str) -> str:
         """Extract YouTube video ID from various URL formats"""
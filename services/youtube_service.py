@@ -3,71 +3,234 @@ YouTube API Service
 Handles authentication, video updates, subtitle uploads, and tag management
 """
 import os
+import time
 from typing import Dict, List, Optional
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.oauth2.credentials import Credentials
+
+from services.retry_service import ApiCaller, CircuitOpenError, QuotaExceededError
+from services.snapshot_service import SnapshotStore
+from services.video_sync_service import VideoSyncService
+from services.tag_service import TagService, MAX_IDS_PER_REQUEST
+from services.metrics_service import SNAPSHOT_LOOKUPS
+
+# The Google client libraries are imported on first use: they dominate cold-start time
+# and most CLI/dashboard code paths never call YouTube.
+
+
+def api_errors() -> tuple:
+    """Exceptions a YouTube call can end with (evaluated lazily inside `except`)"""
+    from googleapiclient.errors import HttpError
+    return (HttpError, CircuitOpenError, QuotaExceededError, OSError)
+
+
+# Parts kept in the snapshot so metadata, tag and video-info reads share one videos.list
+SNAPSHOT_PARTS = 'snippet,localizations,status,contentDetails'
+
+# Snapshots written from our own videos.update responses are used without revalidating for this long
+WRITE_TRUST_SECONDS = 300
+
+NOT_MODIFIED = object()
 
 
 class YouTubeService:
-    def __init__(self, client_secrets_file: str):
+    def __init__(self, client_secrets_file: str, caller: Optional[ApiCaller] = None,
+                 snapshots: Optional[SnapshotStore] = None, token_file: str = 'token.json'):
         self.client_secrets_file = client_secrets_file
+        self.token_file = token_file
         self.youtube = None
+        self.credentials = None
+        self.caller = caller or ApiCaller()
+        self.snapshots = snapshots or SnapshotStore()
+        self.outcomes = {}
+        self.last_snapshot_result = None
+    
+    @property
+    def breaker(self):
+        return self.caller.breaker
+    
+    def reset_outcomes(self):
+        """Forget per-stage outcomes before starting a new sync"""
+        self.outcomes = {}
+    
+    def _execute(self, request, method: str):
+        """Execute an API request through the shared retry/circuit-breaker wrapper"""
+        return self.caller.call(request.execute, method)
+    
+    def _execute_conditional(self, request, method: str):
+        """Like _execute, but a 304 Not Modified returns NOT_MODIFIED instead of raising"""
+        from googleapiclient.errors import HttpError
+        
+        def execute():
+            try:
+                return request.execute()
+            except HttpError as e:
+                if e.resp.status == 304:
+                    return NOT_MODIFIED
+                raise
+        
+        return self.caller.call(execute, method)
+    
+    def _record_outcome(self, stage: str, error: Optional[Exception] = None):
+        """Store the final outcome of a stage so it can be reported in the sync response"""
+        outcome = dict(self.caller.last_outcome or {})
+        if error is not None and not outcome.get('error'):
+            outcome.update({'status': 'failed', 'error': str(error)})
+        self.outcomes[stage] = outcome
         
     def authenticate(self):
-        """Authenticate with YouTube API using OAuth2"""
-        flow = InstalledAppFlow.from_client_secrets_file(
-            self.client_secrets_file,
-            scopes=['https://www.googleapis.com/auth/youtube.force-ssl']
-        )
+        """Authenticate with YouTube API using OAuth2 (reuses the client while the token is valid)"""
+        if self.youtube is not None and self.credentials is not None and self.credentials.valid:
+            return self.youtube
+        
+        from googleapiclient.discovery import build
+        from google.oauth2.credentials import Credentials
 
         credentials = None
-        if os.path.exists('token.json'):
-            credentials = Credentials.from_authorized_user_file('token.json')
+        if os.path.exists(self.token_file):
+            credentials = Credentials.from_authorized_user_file(self.token_file)
 
         if not credentials or not credentials.valid:
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            flow = InstalledAppFlow.from_client_secrets_file(
+                self.client_secrets_file,
+                scopes=['https://www.googleapis.com/auth/youtube.force-ssl']
+            )
             credentials = flow.run_local_server(port=0)
             
-            with open('token.json', 'w') as token:
+            token_dir = os.path.dirname(self.token_file)
+            if token_dir:
+                os.makedirs(token_dir, exist_ok=True)
+            with open(self.token_file, 'w') as token:
                 token.write(credentials.to_json())
 
+        self.credentials = credentials
         self.youtube = build('youtube', 'v3', credentials=credentials)
         return self.youtube
+
+    def fork(self) -> 'YouTubeService':
+        """Copy for another thread: shares credentials and the retry/circuit breaker, owns its HTTP client
+        (the httplib2 transport behind googleapiclient is not thread-safe)"""
+        from googleapiclient.discovery import build
+
+        self.authenticate()
+        service = YouTubeService(self.client_secrets_file, caller=self.caller, snapshots=self.snapshots,
+                                 token_file=self.token_file)
+        service.credentials = self.credentials
+        service.youtube = build('youtube', 'v3', credentials=self.credentials)
+        return service
+
+    def get_video(self, video_id: str, refresh: bool = False) -> Optional[Dict]:
+        """Current video resource, read through the snapshot store with If-None-Match revalidation"""
+        entry = None if refresh else self.snapshots.get(video_id)
+        if self._is_trusted(entry):
+            self.last_snapshot_result = 'hit'
+            SNAPSHOT_LOOKUPS.inc(result='hit')
+            return entry['item']
+        
+        request = self.youtube.videos().list(part=SNAPSHOT_PARTS, id=video_id)
+        if entry and entry.get('etag'):
+            request.headers['If-None-Match'] = entry['etag']
+        response = self._execute_conditional(request, 'videos.list')
+        
+        if response is NOT_MODIFIED:
+            self.last_snapshot_result = 'not_modified'
+            SNAPSHOT_LOOKUPS.inc(result='not_modified')
+            return entry['item']
+        
+        self.last_snapshot_result = 'fetched'
+        SNAPSHOT_LOOKUPS.inc(result='fetched')
+        if not response.get('items'):
+            self.snapshots.invalidate(video_id)
+            return None
+        item = response['items'][0]
+        self.snapshots.put(video_id, item, response.get('etag'))
+        return item
+    
+    @staticmethod
+    def _is_trusted(entry: Optional[Dict]) -> bool:
+        """Snapshot written from our own recent update, usable without revalidation"""
+        return bool(entry) and entry['source'] == 'update' and time.time() - entry['fetched_at'] < WRITE_TRUST_SECONDS
     
-    def update_video_metadata(self, video_id: str, localized_metadata: Dict, category_id: int = 10):
-        """Update video title and localized metadata"""
+    def get_videos(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Video resources for many ids, listed 50 per call (trusted snapshots are reused)"""
+        videos, missing = {}, []
+        for video_id in dict.fromkeys(video_ids):
+            entry = self.snapshots.get(video_id)
+            if self._is_trusted(entry):
+                SNAPSHOT_LOOKUPS.inc(result='hit')
+                videos[video_id] = entry['item']
+            else:
+                missing.append(video_id)
+        
+        for start in range(0, len(missing), MAX_IDS_PER_REQUEST):
+            chunk = missing[start:start + MAX_IDS_PER_REQUEST]
+            response = self._execute(self.youtube.videos().list(
+                part=SNAPSHOT_PARTS,
+                id=','.join(chunk)
+            ), 'videos.list')
+            SNAPSHOT_LOOKUPS.inc(len(chunk), result='fetched')
+            for item in response.get('items', []):
+                # A multi-id list ETag cannot revalidate a single video later
+                self.snapshots.put(item['id'], item, None)
+                videos[item['id']] = item
+        return videos
+    
+    def get_video_info(self, video_id: str) -> Optional[Dict]:
+        """Duration and publish time (UTC+8) from the snapshot, see VideoSyncService.parse_video_info"""
         try:
-            video_response = self.youtube.videos().list(
-                part='snippet',
-                id=video_id
-            ).execute()
+            video = self.get_video(video_id)
+        except api_errors() as e:
+            print(f"Error fetching video info: {e}")
+            self._record_outcome('video_info', e)
+            return None
+        
+        if self.last_snapshot_result == 'hit':
+            self.outcomes['video_info'] = {'method': 'videos.list', 'status': 'ok', 'attempts': 0,
+                                           'error': None, 'snapshot': 'hit'}
+        else:
+            self._record_outcome('video_info')
+        if not video:
+            return None
+        try:
+            return VideoSyncService.parse_video_info(video)
+        except (KeyError, ValueError) as e:
+            print(f"Error parsing video info: {e}")
+            return None
+    
+    def update_video_snippet(self, video_id: str, localized_metadata: Dict, category_id: int = 10):
+        """Update the main-language (ja) title, description and category"""
+        try:
+            video = self.get_video(video_id)
+            
+            if not video:
+                print(f"✗ Video {video_id} not found on YouTube")
+                self._record_outcome('metadata', ValueError(f"Video {video_id} not found"))
+                return None
             
-            if 'items' in video_response and video_response['items']:
-                current_snippet = video_response['items'][0]['snippet']
-                current_snippet['defaultLanguage'] = "ja"
-                current_snippet['title'] = localized_metadata["ja"]["title"]
-                current_snippet['description'] = localized_metadata["ja"]["description"]
-                current_snippet['categoryId'] = category_id
-
-            response = self.youtube.videos().update(
+            current_snippet = dict(video['snippet'])
+            current_snippet['defaultLanguage'] = "ja"
+            current_snippet['title'] = localized_metadata["ja"]["title"]
+            current_snippet['description'] = localized_metadata["ja"]["description"]
+            current_snippet['categoryId'] = category_id
+
+            response = self._execute(self.youtube.videos().update(
                 part='snippet',
                 body={
                     'id': video_id,
                     'snippet': current_snippet
                 }
-            ).execute()
+            ), 'videos.update')
+            self.snapshots.merge(video_id, response, ['snippet'])
 
             print("✓ Main language metadata updated successfully")
-            self._update_localization(video_id, localized_metadata)
+            self._record_outcome('metadata')
             return response
 
-        except HttpError as e:
+        except api_errors() as e:
             print(f"✗ Error updating metadata: {e}")
+            self._record_outcome('metadata', e)
             return None
     
-    def _update_localization(self, video_id: str, localized_metadata: Dict):
+    def update_localization(self, video_id: str, localized_metadata: Dict):
         """Update localized titles and descriptions"""
         try:
             request = self.youtube.videos().update(
@@ -78,16 +241,20 @@ class YouTubeService:
                 }
             )
             
-            response = request.execute()
+            response = self._execute(request, 'videos.update')
+            self.snapshots.merge(video_id, response, ['localizations'])
             print("✓ Localized metadata updated successfully")
+            self._record_outcome('localization')
             return response
 
-        except HttpError as e:
+        except api_errors() as e:
             print(f"✗ Error updating localization: {e}")
+            self._record_outcome('localization', e)
             return None
     
     def upload_subtitle(self, video_id: str, language: str, subtitle_file: str, name: str):
         """Upload subtitle file to YouTube video"""
+        from googleapiclient.http import MediaFileUpload
         try:
             request = self.youtube.captions().insert(
                 part='snippet',
@@ -102,51 +269,84 @@ class YouTubeService:
                 media_body=MediaFileUpload(subtitle_file, mimetype='application/octet-stream')
             )
 
-            response = request.execute()
+            response = self._execute(request, 'captions.insert')
             print(f'✓ Subtitle uploaded for {language}')
+            self._record_outcome(f'subtitle:{language}')
             return response
 
         except Exception as e:
             print(f'✗ Error uploading subtitle for {language}: {e}')
+            self._record_outcome(f'subtitle:{language}', e)
             return None
     
+    def _write_tags(self, video_id: str, video: Dict, new_tags: List[str]) -> bool:
+        """Merge tags into the video's snippet and update it; False when the merged list is unchanged"""
+        current_snippet = dict(video['snippet'])
+        existing_tags = current_snippet.get('tags', [])
+        updated_tags = TagService.merge_tags(existing_tags, new_tags)
+        if updated_tags == existing_tags:
+            return False
+        
+        current_snippet['tags'] = updated_tags
+        response = self._execute(self.youtube.videos().update(
+            part='snippet',
+            body={
+                'id': video_id,
+                'snippet': current_snippet
+            }
+        ), 'videos.update')
+        self.snapshots.merge(video_id, response, ['snippet'])
+        return True
+    
     def update_tags(self, video_id: str, tag_string: str):
-        """Update video tags"""
+        """Add tags to a video (case-insensitive dedupe, kept within the 500-character limit)"""
         try:
-            video_response = self.youtube.videos().list(
-                part='snippet',
-                id=video_id
-            ).execute()
-
-            if 'items' in video_response and video_response['items']:
-                if 'snippet' in video_response['items'][0]:
-                    current_snippet = video_response['items'][0]['snippet']
-                    
-                    # Split and add new tags
-                    new_tags = [tag.strip() for tag in tag_string.split(',')]
-                    existing_tags = current_snippet.get('tags', [])
-                    updated_tags = existing_tags + new_tags
-                    
-                    current_snippet['tags'] = updated_tags
-
-                    self.youtube.videos().update(
-                        part='snippet',
-                        body={
-                            'id': video_id,
-                            'snippet': current_snippet
-                        }
-                    ).execute()
+            video = self.get_video(video_id)
 
+            if video and 'snippet' in video:
+                new_tags = [tag.strip() for tag in tag_string.split(',')]
+                if self._write_tags(video_id, video, new_tags):
                     print("✓ Tags updated successfully")
-                    return True
+                    self._record_outcome('tags')
+                else:
+                    print("✓ Tags already up to date")
+                    self.outcomes['tags'] = {'method': 'videos.update', 'status': 'ok', 'attempts': 0,
+                                             'error': None, 'skipped': 'unchanged'}
+                return True
                     
             print("✗ Failed to update tags")
+            self._record_outcome('tags', ValueError(f"Video {video_id} not found"))
             return False
 
-        except HttpError as e:
+        except api_errors() as e:
             print(f"✗ Error updating tags: {e}")
+            self._record_outcome('tags', e)
             return False
     
+    def bulk_update_tags(self, tags_by_video: Dict[str, List[str]]) -> Dict[str, str]:
+        """Add tags to many videos: snippets are listed 50 per call and only changed videos are updated
+        
+        Returns {YouTube id: 'updated' | 'unchanged' | 'not_found' | 'failed'}
+        """
+        try:
+            videos = self.get_videos(list(tags_by_video))
+        except api_errors() as e:
+            print(f"✗ Error fetching videos for tag update: {e}")
+            return {video_id: 'failed' for video_id in tags_by_video}
+        
+        results = {}
+        for video_id, new_tags in tags_by_video.items():
+            video = videos.get(video_id)
+            if not video or 'snippet' not in video:
+                results[video_id] = 'not_found'
+                continue
+            try:
+                results[video_id] = 'updated' if self._write_tags(video_id, video, new_tags) else 'unchanged'
+            except api_errors() as e:
+                print(f"✗ Error updating tags for {video_id}: {e}")
+                results[video_id] = 'failed'
+        return results
+    
     @staticmethod
     def extract_video_id(video_link: str) -> str:
         """Extract YouTube video ID from URL"""
@@ -0,0 +1,71 @@
+"""
+Page versions change with catalog writes and with the files the pages are built from
+"""
+import os
+
+import pytest
+from sqlalchemy import func, select
+
+from benchmarks.bench_metadata import build_catalog
+from models import Base, CatalogChange, Work
+from services.catalog_version_service import CatalogVersionService
+from services.database_service import DatabaseService
+from services.http_cache_service import BuildVersion
+
+
+@pytest.fixture
+def db_service(tmp_path):
+    service = DatabaseService(f"sqlite:///{tmp_path / 'catalog.db'}")
+    Base.metadata.create_all(service.engine)
+    service.ensure_support_tables()
+    build_catalog(service, 3)
+    yield service
+    service.engine.dispose()
+
+
+def test_update_appends_a_change_and_changes_the_version(db_service):
+    before, _ = CatalogVersionService.current(db_service.engine)
+
+    session = db_service.get_session()
+    try:
+        work = session.query(Work).first()
+        work.JaName = f"{work.JaName}!"
+        session.commit()
+    finally:
+        session.close()
+
+    after, changed_at = CatalogVersionService.current(db_service.engine)
+    assert after != before
+    assert changed_at is not None
+
+
+def test_prune_keeps_the_newest_change(db_service):
+    with db_service.engine.begin() as connection:
+        for _ in range(5):
+            CatalogVersionService.record(connection)
+    before, _ = CatalogVersionService.current(db_service.engine)
+
+    CatalogVersionService.prune(db_service.engine, keep=2)
+
+    with db_service.engine.connect() as connection:
+        assert connection.execute(select(func.count(CatalogChange.ID))).scalar() == 2
+    assert CatalogVersionService.current(db_service.engine)[0] == before
+
+
+def test_build_version_follows_template_edits(tmp_path):
+    code = tmp_path / 'app.py'
+    code.write_text('print(1)\n')
+    templates = tmp_path / 'templates'
+    (templates / 'partials').mkdir(parents=True)
+    base = templates / 'partials' / 'base.html'
+    base.write_text('<html>')
+    build = BuildVersion([str(code)], [str(templates)])
+
+    version, _ = build.current()
+    assert build.current()[0] == version
+
+    base.write_text('<html lang="ja">')
+    os.utime(base, (1e9, 2e9))
+    changed, built_at = build.current()
+    assert changed != version
+    assert built_at.year == 2033
@@ -0,0 +1,59 @@
+"""
+Resumed syncs skip the YouTube writes that already succeeded
+"""
+import pytest
+
+from models import Base
+from services.checkpoint_service import SyncCheckpoints
+from services.database_service import DatabaseService
+
+LOCALIZED = {language: {'title': f'{language} title', 'description': f'{language} description'}
+             for language in ('ja', 'en', 'zh-Hant')}
+
+
+class FakeYouTube:
+    """Records the writes; the localization update fails while `localization_ok` is False"""
+
+    def __init__(self):
+        self.calls = []
+        self.localization_ok = False
+
+    def update_video_snippet(self, video_id, localized_metadata, category_id=10):
+        self.calls.append('snippet')
+        return {'id': video_id}
+
+    def update_localization(self, video_id, localized_metadata):
+        self.calls.append('localization')
+        return {'id': video_id} if self.localization_ok else None
+
+
+@pytest.fixture
+def db_service(tmp_path):
+    service = DatabaseService(f"sqlite:///{tmp_path / 'catalog.db'}")
+    Base.metadata.create_all(service.engine)
+    yield service
+    service.engine.dispose()
+
+
+def test_failed_localization_does_not_resend_the_snippet(db_service):
+    youtube = FakeYouTube()
+    assert not SyncCheckpoints(db_service, 1).push_metadata(youtube, 'abc', LOCALIZED)
+    assert youtube.calls == ['snippet', 'localization']
+
+    youtube.calls.clear()
+    youtube.localization_ok = True
+    checkpoints = SyncCheckpoints(db_service, 1, resume=True)
+    assert checkpoints.push_metadata(youtube, 'abc', LOCALIZED)
+    assert youtube.calls == ['localization']
+    assert checkpoints.resumed == ['snippet']
+
+
+def test_changed_title_is_sent_again(db_service):
+    youtube = FakeYouTube()
+    youtube.localization_ok = True
+    assert SyncCheckpoints(db_service, 1).push_metadata(youtube, 'abc', LOCALIZED)
+
+    youtube.calls.clear()
+    edited = {**LOCALIZED, 'ja': {'title': 'new title', 'description': 'ja description'}}
+    assert SyncCheckpoints(db_service, 1, resume=True).push_metadata(youtube, 'abc', edited)
+    assert youtube.calls == ['snippet', 'localization']
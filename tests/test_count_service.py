@@ -0,0 +1,45 @@
+import asyncio
+
+from sqlalchemy import func, select, table
+
+from services.count_service import EstimatedCount
+
+
+def make_run(table_rows, exact):
+    calls = []
+
+    async def run(stmt):
+        is_estimate = 'TABLE_ROWS' in str(stmt)
+        calls.append('estimate' if is_estimate else 'count')
+        return [table_rows if is_estimate else exact]
+
+    return run, calls
+
+
+def count_many(strategy, run, times=3):
+    stmt = select(func.count()).select_from(table('Video'))
+
+    async def go():
+        return [await strategy.count(stmt, run, 'Video', 'mysql', False) for _ in range(times)]
+
+    return asyncio.run(go())
+
+
+def test_large_table_estimate_is_cached():
+    run, calls = make_run(table_rows=250000, exact=251234)
+    results = count_many(EstimatedCount(threshold=100000), run)
+    assert results == [(250000, True)] * 3
+    assert calls == ['estimate']
+
+
+def test_small_table_counts_exactly_without_requerying_statistics():
+    run, calls = make_run(table_rows=480, exact=512)
+    strategy = EstimatedCount(threshold=100000)
+    results = count_many(strategy, run)
+    assert results == [(512, False)] * 3
+    assert calls == ['estimate', 'count']
+
+    # A write drops the cached count but not the table statistics
+    strategy.invalidate()
+    assert count_many(strategy, run, times=1) == [(512, False)]
+    assert calls == ['estimate', 'count', 'count']
@@ -0,0 +1,56 @@
+"""
+Dry run plans resolve captions the way the real sync does
+"""
+import os
+
+import pytest
+
+from benchmarks.bench_metadata import build_catalog
+from models import Base
+from services.database_service import DatabaseService
+from services.dry_run_service import DryRunService
+from services.subtitle_store_service import LocalSubtitleStore
+
+
+@pytest.fixture
+def db_service(tmp_path):
+    service = DatabaseService(f"sqlite:///{tmp_path / 'catalog.db'}")
+    Base.metadata.create_all(service.engine)
+    build_catalog(service, 3)
+    yield service
+    service.engine.dispose()
+
+
+def captions_by_language(plan):
+    return {caption['language']: caption for caption in plan['captions']}
+
+
+def test_captions_come_from_the_latest_store_upload(db_service, tmp_path):
+    store = LocalSubtitleStore(str(tmp_path / 'store'))
+    store.save_upload(2, {'ja_subtitle.srt': b'old'})
+    upload_id = store.save_upload(2, {'ja_subtitle.srt': b'1\n', 'en_subtitle.srt': b'1\n'})
+    service = DryRunService(db_service, subtitle_dir=str(tmp_path / 'missing' / '{video_id}'), subtitle_store=store)
+
+    plans = {plan['VideoID']: plan for plan in service.iter_plans([1, 2])}
+
+    captions = captions_by_language(plans[2])
+    assert captions['ja'] == {'language': 'ja', 'name': captions['ja']['name'],
+                              'file': f"{upload_id}/ja_subtitle.srt", 'exists': True}
+    assert captions['en']['exists'] is True
+    assert captions['zh-Hant']['exists'] is False
+    # Without an upload the video falls back to the (empty) folder
+    assert not any(caption['exists'] for caption in plans[1]['captions'])
+    assert service.build_plan(db_service.get_video_metadata(2))['captions'] == plans[2]['captions']
+
+
+def test_folder_is_used_without_a_store(db_service, tmp_path):
+    folder = tmp_path / 'subtitles' / '3'
+    folder.mkdir(parents=True)
+    (folder / 'ja_subtitle.srt').write_text('1\n', encoding='utf-8')
+    service = DryRunService(db_service, subtitle_dir=str(tmp_path / 'subtitles' / '{video_id}'))
+
+    captions = captions_by_language(next(service.iter_plans([3])))
+
+    assert captions['ja']['file'] == os.path.join(str(folder), 'ja_subtitle.srt')
+    assert captions['ja']['exists'] is True
+    assert captions['en']['exists'] is False
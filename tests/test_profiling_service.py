@@ -0,0 +1,94 @@
+"""
+Request profiles cover the work a request hands to worker threads, and only that request's work
+"""
+import asyncio
+import importlib
+import os
+import pstats
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.bench_metadata import build_catalog
+from models import Base
+from services.database_service import DatabaseService
+from services.profiling_service import ProfilingService
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def profiled_worker_call():
+    busy(0.3)
+
+
+async def unrelated_request():
+    # Another request hogging the event loop while the profiled one waits on its thread
+    for _ in range(30):
+        busy(0.01)
+        await asyncio.sleep(0)
+
+
+def test_sample_mode_follows_to_thread_and_skips_other_tasks(tmp_path):
+    service = ProfilingService(str(tmp_path), enabled=True)
+
+    async def main():
+        service.install(asyncio.get_running_loop())
+        other = asyncio.create_task(unrelated_request())
+        with service.profile('worker', 'sample') as path:
+            await asyncio.to_thread(profiled_worker_call)
+        await other
+        return path
+
+    folded = asyncio.run(main()).read_text()
+    assert 'profiled_worker_call' in folded
+    assert 'unrelated_request' not in folded
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp('profiling_app')
+    db_service = DatabaseService(f"sqlite:///{tmp / 'catalog.db'}")
+    Base.metadata.create_all(db_service.engine)
+    build_catalog(db_service, 200)
+    db_service.engine.dispose()
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(REPO_ROOT)
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp / 'catalog.db'}")
+        monkeypatch.setenv('PROFILING_ENABLED', 'true')
+        monkeypatch.setenv('PROFILES_DIR', str(tmp / 'profiles'))
+        monkeypatch.setenv('SUBTITLE_STORE', str(tmp / 'subtitle_store'))
+        monkeypatch.setenv('YOUTUBE_ACCOUNTS_FILE', str(tmp / 'accounts.json'))
+        app = importlib.import_module('app')
+        with TestClient(app.app) as test_client:
+            yield test_client, Path(app.PROFILES_DIR)
+
+
+def profiled_functions(client, url: str):
+    test_client, profiles_dir = client
+    response = test_client.get(url, headers={'X-Profile': 'cprofile'})
+    assert response.status_code == 200
+    stats = pstats.Stats(str(profiles_dir / response.headers['X-Profile-File']))
+    return {(os.path.basename(filename), name) for filename, _, name in stats.stats}
+
+
+def test_page_render_in_the_threadpool_is_profiled(client):
+    # / renders its template in asyncio.to_thread
+    functions = profiled_functions(client, '/')
+    assert ('app.py', 'render') in functions
+    assert ('environment.py', 'render') in functions
+
+
+def test_streamed_body_is_profiled_until_sent(client):
+    # /api/export queries and formats rows in worker threads while the body streams
+    functions = profiled_functions(client, '/api/export?format=csv')
+    assert ('export_service.py', 'iter_csv') in functions
+    assert ('export_service.py', 'iter_batches') in functions
@@ -0,0 +1,198 @@
+"""
+Sync Worker - standalone process
+Claims queued SyncJob rows from the database and runs them through the batch sync pipeline.
+Run as many processes, on as many hosts, as the database and the YouTube quota allow.
+"""
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+import argparse
+from typing import Dict
+from dotenv import load_dotenv
+
+from services.account_service import AccountPool
+from services.snapshot_service import SnapshotStore
+from services.tag_service import TagService
+from services.subtitle_store_service import create_subtitle_store
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+CLIENT_SECRETS_FILE = os.getenv('CLIENT_SECRETS_FILE')
+TAG_REPLACEMENT_CSV = os.getenv('TAG_REPLACEMENT_CSV')
+API_KEY = os.getenv('YOUTUBE_API_KEY')
+
+DB_USER = os.getenv('DB_USER')
+DB_PASSWORD = os.getenv('DB_PASSWORD')
+DB_HOST = os.getenv('DB_HOST')
+DB_PORT = os.getenv('DB_PORT', '3306')
+DB_NAME = os.getenv('DB_NAME')
+
+# Any SQLAlchemy URL (e.g. sqlite:///catalog.db); defaults to MariaDB from the DB_* settings
+DATABASE_URL = os.getenv('DATABASE_URL') or f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshots')
+SUBTITLE_STORE = os.getenv('SUBTITLE_STORE', 'temp/subtitle_store')
+SUBTITLE_UPLOAD_TTL_HOURS = float(os.getenv('SUBTITLE_UPLOAD_TTL_HOURS', '24'))
+YOUTUBE_ACCOUNTS_FILE = os.getenv('YOUTUBE_ACCOUNTS_FILE', 'accounts.json')
+QUOTA_DIR = os.getenv('QUOTA_DIR', 'quota')
+YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
+
+# Queue timing: idle poll, heartbeat interval, heartbeat age after which a job is given to another worker
+JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '2'))
+JOB_HEARTBEAT_SECONDS = float(os.getenv('JOB_HEARTBEAT_SECONDS', '15'))
+JOB_STALE_SECONDS = float(os.getenv('JOB_STALE_SECONDS', '120'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+
+
+class Worker:
+    """Claim/sync/finish loops on `threads` threads plus one heartbeat thread for the claimed jobs
+
+    The heartbeat thread also rescues jobs of crashed workers every stale_seconds / 2, so they are picked
+    up again even while every worker is busy.
+    """
+
+    def __init__(self, queue, batch_service, threads: int = 1, poll_seconds: float = JOB_POLL_SECONDS,
+                 heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS):
+        self.queue = queue
+        self.batch_service = batch_service
+        self.accounts = batch_service.accounts
+        self.threads = max(1, threads)
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.requeue_seconds = queue.stale_seconds / 2
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.stopping = threading.Event()
+        self._running: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.processed = 0
+
+    def stop(self, *_):
+        if not self.stopping.is_set():
+            print("⏹ Stopping after the current job(s)...")
+        self.stopping.set()
+
+    def run(self, once: bool = False):
+        """Work until stopped (or, with once, until the queue is empty)"""
+        self._requeue_stale()
+        loops_done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(loops_done,), name="heartbeat", daemon=True)
+        heartbeat.start()
+        loops = [threading.Thread(target=self._loop, args=(once,), name=f"worker-{i}") for i in range(self.threads)]
+        for thread in loops:
+            thread.start()
+        for thread in loops:
+            thread.join()
+        loops_done.set()
+        heartbeat.join()
+
+    def _loop(self, once: bool):
+        while not self.stopping.is_set():
+            try:
+                job = self.queue.claim(self.worker_id)
+                if job is None:
+                    if once:
+                        return
+                    self.stopping.wait(self.poll_seconds)
+                    continue
+                self._run_job(job)
+            except Exception as e:
+                print(f"✗ Worker loop error: {e}")
+                self.stopping.wait(self.poll_seconds)
+
+    def _run_job(self, job: Dict):
+        with self._lock:
+            self._running[job['ID']] = job['VideoID']
+        start = time.perf_counter()
+        account = None
+        # A retry (after a crashed worker) skips the YouTube writes the earlier attempt completed
+        if job['Attempts'] > 1:
+            job['Resume'] = True
+        try:
+            account = self.accounts.route(self.batch_service.db_service, [job['VideoID']])[job['VideoID']]
+            result = self.batch_service.sync_item(job, account)
+        except Exception as e:
+            result = {'VideoID': job['VideoID'], 'account': account, 'status': 'failed', 'error': str(e)}
+        finally:
+            with self._lock:
+                self._running.pop(job['ID'], None)
+
+        retry_after = self.poll_seconds
+        if result['status'] == 'skipped' and account in self.accounts.accounts:
+            retry_after = max(retry_after, self.accounts.service(account).breaker.retry_after())
+        if not self.queue.finish(job['ID'], self.worker_id, result, retry_after):
+            print(f"⚠ Job {job['ID']} was requeued while running; its result was not recorded")
+        with self._lock:
+            self.processed += 1
+
+        symbol = {'success': '✓', 'skipped': '⏭'}.get(result['status'], '✗')
+        print(f"{symbol} Job {job['ID']} VideoID {job['VideoID']} ({account or '-'}, attempt {job['Attempts']}): "
+              f"{result['status']} in {time.perf_counter() - start:.1f}s"
+              + (f" - {result['error']}" if result.get('error') else ""))
+
+    def _heartbeat(self, loops_done: threading.Event):
+        # Keeps running until the loops finish, so a job completing after stop() is not requeued
+        next_requeue = time.monotonic() + self.requeue_seconds
+        while not loops_done.wait(min(self.heartbeat_seconds, self.requeue_seconds)):
+            if time.monotonic() >= next_requeue:
+                next_requeue = time.monotonic() + self.requeue_seconds
+                self._requeue_stale()
+            with self._lock:
+                job_ids = list(self._running)
+            if not job_ids:
+                continue
+            try:
+                owned = self.queue.heartbeat(self.worker_id, job_ids)
+                if owned < len(job_ids):
+                    print(f"⚠ {len(job_ids) - owned} running job(s) were requeued by another worker")
+            except Exception as e:
+                print(f"✗ Heartbeat failed: {e}")
+
+    def _requeue_stale(self):
+        """Rescue jobs of crashed workers"""
+        try:
+            self.queue.requeue_stale()
+        except Exception as e:
+            print(f"✗ Requeue of stale jobs failed: {e}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync worker: runs queued sync jobs (cli.py enqueue, POST /api/jobs)")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="Jobs run in parallel by this process (default 1; run more processes to use more cores)")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty instead of polling")
+    return parser.parse_args()
+
+
+def main():
+    from services.batch_service import BatchService
+    from services.database_service import DatabaseService
+    from services.job_queue_service import JobQueue
+
+    args = parse_args()
+    db_service = DatabaseService(DATABASE_URL)
+    db_service.ensure_support_tables()
+    accounts = AccountPool.from_config(YOUTUBE_ACCOUNTS_FILE, CLIENT_SECRETS_FILE, SnapshotStore(SNAPSHOT_DIR),
+                                       QUOTA_DIR, YOUTUBE_DAILY_QUOTA)
+    tag_service = TagService(API_KEY, TAG_REPLACEMENT_CSV, caller=accounts.service().caller)
+    subtitle_store = create_subtitle_store(SUBTITLE_STORE, SUBTITLE_UPLOAD_TTL_HOURS * 3600)
+    batch_service = BatchService(accounts, tag_service, db_service, args.threads, subtitle_store=subtitle_store)
+
+    # Authenticate every account up front: a missing token opens the OAuth consent flow, which needs a person
+    for name in accounts.names:
+        accounts.service(name).authenticate()
+
+    worker = Worker(JobQueue(db_service.engine, JOB_MAX_ATTEMPTS, JOB_STALE_SECONDS), batch_service, args.threads)
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    print(f"👷 Worker {worker.worker_id}: {args.threads} thread(s), accounts {', '.join(accounts.names)}")
+    worker.run(once=args.once)
+    print(f"✓ Worker {worker.worker_id} stopped after {worker.processed} job(s)")
+
+
+if __name__ == "__main__":
+    main()